@@ -0,0 +1,64 @@
+# Description: Benchmark — time to insert an N-layer model into DesignTab (bulk API vs one-by-one).
+# Usage: python benchmarks/bench_bulk_insert.py [--layers 1000] [--naive-layers 200]
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PyQt5 import QtWidgets, QtCore
+from ui.tabs.design_tab import DesignTab
+
+
+def make_layer_defs(n):
+    """Conv2d / BatchNorm2d / ReLU 반복으로 n개 레이어 정의 생성"""
+    pattern = [
+        {"type": "Conv2d", "params": {"in_channels": 64, "out_channels": 64, "kernel_size": 3, "padding": 1}},
+        {"type": "BatchNorm2d", "params": {"num_features": 64}},
+        {"type": "ReLU", "params": {}},
+    ]
+    return [dict(pattern[i % len(pattern)]) for i in range(n)]
+
+
+def bench_bulk(tab, defs):
+    tab.clear_canvas()
+    t0 = time.perf_counter()
+    tab.add_layers(defs)
+    return time.perf_counter() - t0
+
+
+def bench_one_by_one(tab, defs):
+    tab.clear_canvas()
+    t0 = time.perf_counter()
+    for d in defs:
+        tab.add_layer(d["type"], QtCore.QPointF(0, 0), d["params"])
+    tab.flush_pending_changes()
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--layers", type=int, default=1000)
+    ap.add_argument("--naive-layers", type=int, default=200,
+                    help="one-by-one 경로는 O(n^2)이라 작은 n으로 측정")
+    args = ap.parse_args()
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    tab = DesignTab()
+
+    t_bulk = bench_bulk(tab, make_layer_defs(args.layers))
+    print(f"bulk add_layers     : {args.layers:6d} layers  {t_bulk * 1000:9.1f} ms")
+    print(f"                      items={len(tab.layer_items)} edges={len(tab.edges)}")
+
+    if args.naive_layers > 0:
+        t_naive = bench_one_by_one(tab, make_layer_defs(args.naive_layers))
+        print(f"one-by-one add_layer: {args.naive_layers:6d} layers  {t_naive * 1000:9.1f} ms")
+
+    tab.clear_canvas()
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Description: Benchmark — design file size and save/load time, JSON vs compact binary (.nnd) formats.
+# Runs headless (no Qt). Usage: python benchmarks/bench_design_format.py [--layers 50000] [--repeat 3]
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from layers.network_graph import NetworkGraph
+from utils.design_io import save_json, save_design, load_design, graph_to_doc
+
+FORMATS = [
+    ("json", ".json", None),
+    ("nnd (none)", ".nnd", "none"),
+    ("nnd (gzip)", ".nnd", "gzip"),
+    ("nnd (lzma)", ".nnd", "lzma"),
+]
+
+
+def make_graph(n, seed=0):
+    """Conv2d / BatchNorm2d / ReLU 반복 + 가끔 skip 연결이 있는 n개 레이어 그래프"""
+    rnd = random.Random(seed)
+    g = NetworkGraph()
+    widths = [64, 128, 256, 512]
+    for i in range(n):
+        c = widths[(i // 30) % len(widths)]
+        kind = i % 3
+        if kind == 0:
+            g.add_node("Conv2d", {"in_channels": c, "out_channels": c, "kernel_size": 3, "padding": 1},
+                       pos=(50 + (i % 5) * 150, 50 + i * 100))
+        elif kind == 1:
+            g.add_node("BatchNorm2d", {"num_features": c}, pos=(50 + (i % 5) * 150, 50 + i * 100))
+        else:
+            g.add_node("ReLU", {}, pos=(50 + (i % 5) * 150, 50 + i * 100))
+    g.chain_sequence()
+    seq = g.sequence
+    for _ in range(n // 20):
+        i = rnd.randrange(0, n - 4)
+        g.connect(seq[i], seq[i + 3])
+    g.input_shape = (64, 56, 56)
+    return g
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--layers", type=int, default=50000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    graph = make_graph(args.layers)
+    reference = graph_to_doc(graph)
+    print(f"{args.layers} layers, {sum(1 for _ in graph.edges())} edges (best of {args.repeat})")
+    print(f"{'format':<12} {'size':>12} {'save ms':>10} {'load ms':>10}  round-trip")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, ext, compression in FORMATS:
+            path = os.path.join(tmp, "design" + ext)
+            if compression is None:
+                t_save, _ = timed(lambda: save_json(graph, path), args.repeat)
+            else:
+                t_save, _ = timed(lambda: save_design(graph, path, compression=compression), args.repeat)
+            t_load, loaded = timed(lambda: load_design(path), args.repeat)
+            ok = graph_to_doc(loaded) == reference
+            print(f"{name:<12} {os.path.getsize(path):>12,d} {t_save * 1000:>10.1f} {t_load * 1000:>10.1f}  "
+                  f"{'ok' if ok else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
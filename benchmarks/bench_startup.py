@@ -0,0 +1,133 @@
+# Description: Benchmark — GUI startup cost via `python -X importtime main.py --quit-after-init`.
+# Reports wall time, total import time and the slowest imports, fails if torch is on the startup path
+# or the budget is exceeded, and appends each run to a history file so regressions show up over time.
+# Usage: python benchmarks/bench_startup.py [--runs 3] [--budget-ms 1500] [--top 15] [--no-history]
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+DEFAULT_HISTORY = os.path.join(BENCH_DIR, "startup_history.jsonl")
+DEFAULT_BUDGET_MS = 1500.0
+FORBIDDEN_MODULES = ("torch",)  # startup 경로에 있으면 안 되는 무거운 패키지
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 -> [(module, self_us, cumulative_us, depth)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cum_us = int(parts[1])
+        except ValueError:
+            continue  # header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), self_us, cum_us, depth))
+    return rows
+
+
+def run_once(python, env):
+    """main.py를 한 번 띄웠다가 종료. (wall_ms, importtime rows, returncode)"""
+    cmd = [python, "-X", "importtime", os.path.join(ROOT, "main.py"), "--quit-after-init"]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    return wall_ms, parse_importtime(proc.stderr), proc.returncode, proc.stderr
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def last_history_entry(path):
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                last = json.loads(line)
+    return last
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3, help="반복 횟수 (최소값을 기록)")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                    help="wall time 예산 (초과하면 exit code 1)")
+    ap.add_argument("--top", type=int, default=15, help="출력할 느린 import 개수")
+    ap.add_argument("--history", default=DEFAULT_HISTORY)
+    ap.add_argument("--no-history", action="store_true")
+    args = ap.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    best = None
+    for _ in range(max(args.runs, 1)):
+        wall_ms, rows, code, stderr = run_once(sys.executable, env)
+        if code != 0:
+            print(stderr[-2000:], file=sys.stderr)
+            print(f"main.py exited with code {code}", file=sys.stderr)
+            return 2
+        if best is None or wall_ms < best[0]:
+            best = (wall_ms, rows)
+
+    wall_ms, rows = best
+    import_us = sum(cum for _, _, cum, depth in rows if depth == 0)
+    modules = {name for name, _, _, _ in rows}
+    forbidden = sorted(m for m in modules if m.split(".")[0] in FORBIDDEN_MODULES)
+
+    print(f"startup wall time : {wall_ms:9.1f} ms  (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    print(f"total import time : {import_us / 1000:9.1f} ms  ({len(rows)} modules)")
+    print(f"slowest imports (cumulative):")
+    for name, _, cum, depth in sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])[:args.top]:
+        print(f"  {cum / 1000:9.1f} ms  {name}")
+
+    prev = None if args.no_history else last_history_entry(args.history)
+    if prev is not None:
+        print(f"previous run      : {prev['wall_ms']:9.1f} ms  ({prev.get('revision') or '?'}, "
+              f"delta {wall_ms - prev['wall_ms']:+.1f} ms)")
+
+    if not args.no_history:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "wall_ms": round(wall_ms, 1),
+            "import_ms": round(import_us / 1000, 1),
+            "modules": len(rows),
+            "budget_ms": args.budget_ms,
+        }
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    failed = False
+    if forbidden:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(forbidden[:10])}")
+        failed = True
+    if wall_ms > args.budget_ms:
+        print(f"FAIL: startup {wall_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# Description: Benchmark — theme switching on a large scene.
+# "legacy" replays the previous behaviour (re-read .qss from disk, apply to the settings preview widgets,
+# the app and the footer one by one); "manager" uses the cached, app-level ThemeManager.apply().
+# Usage: python benchmarks/bench_theme_switch.py [--layers 2000] [--switches 6]
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PyQt5 import QtWidgets
+from designer_window import DesignerWindow
+from utils.theme_utils import ThemeManager, theme_manager
+from bench_bulk_insert import make_layer_defs
+
+THEMES = ["light", "gray", "dark"]
+
+
+def legacy_switch(app, win, name):
+    """이전 구현: 매번 파일을 읽고 위젯마다 setStyleSheet"""
+    path = ThemeManager().path_for(name)
+    settings = win.setting_tab
+    targets = [settings, settings.preview_label, settings.sample_btn, settings.sample_lineedit,
+               settings.sample_list, settings, app, win.status_bar]
+    for target in targets:
+        with open(path, "r", encoding="utf-8") as f:
+            target.setStyleSheet(f.read())
+
+
+def manager_switch(app, win, name):
+    theme_manager.apply(name, app)
+    win.status_bar.update_style(name)
+
+
+def run(app, win, switch, n):
+    # 이전 실행이 남긴 위젯별 stylesheet 제거 후 측정
+    for w in app.allWidgets():
+        if w.styleSheet():
+            w.setStyleSheet("")
+    app.processEvents()
+    t0 = time.perf_counter()
+    for i in range(n):
+        switch(app, win, THEMES[i % len(THEMES)])
+        app.processEvents()
+    return (time.perf_counter() - t0) / n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--layers", type=int, default=2000)
+    ap.add_argument("--switches", type=int, default=6)
+    args = ap.parse_args()
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    win = DesignerWindow()
+    win.show()
+    win.setting_tab  # legacy 경로가 쓰는 미리보기 위젯 생성
+    win.design_tab.add_layers(make_layer_defs(args.layers))
+    app.processEvents()
+
+    t_legacy = run(app, win, legacy_switch, args.switches)
+    print(f"legacy  (per-widget, disk read): {t_legacy * 1000:9.1f} ms / switch")
+    t_manager = run(app, win, manager_switch, args.switches)
+    print(f"manager (cached, app-level)    : {t_manager * 1000:9.1f} ms / switch")
+    if t_manager > 0:
+        print(f"speedup: {t_legacy / t_manager:.1f}x  ({args.layers} layers)")
+
+
+if __name__ == "__main__":
+    main()
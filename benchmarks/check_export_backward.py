@@ -0,0 +1,92 @@
+# Description: Check — generated training code survives a forward + backward pass.
+# Exports every predefined model, a Conv2d -> ResidualBlock -> ReLU chain (in-place ReLU after a block
+# whose last op is already an in-place ReLU) and any given design files, then runs each generated module's
+# __main__ (forward + loss.backward()) in a separate Python process. Needs torch in the target interpreter.
+# Predefined models get their original input sizes (PREDEFINED_INPUT_SHAPES); a case whose shapes do not
+# check out fails before anything is run.
+# Usage: python benchmarks/check_export_backward.py [design.json ...] [--python /path/to/python] [--timeout 300]
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from data.predefined_model import PREDEFINED_MODELS, PREDEFINED_INPUT_SHAPES
+from layers.network_graph import NetworkGraph
+from utils.design_io import load_design
+from utils.export_utils import generate_pytorch_code
+from utils.shape_inference import infer_shapes
+
+# in-place activation 회귀 사례 (ResidualBlock의 출력은 ReLU backward가 사용함)
+REGRESSION_CASES = {
+    "conv-residual-relu": [
+        {"type": "Conv2d", "params": {"in_channels": 3, "out_channels": 64, "kernel_size": 3, "padding": 1}},
+        {"type": "ResidualBlock", "params": {"in_channels": 64, "out_channels": 64, "stride": 1, "repeats": 2}},
+        {"type": "ReLU", "params": {"inplace": True}},
+    ],
+}
+
+
+def chain_graph(layer_defs, input_shape=None):
+    graph = NetworkGraph()
+    for d in layer_defs:
+        graph.add_node(d["type"], d.get("params", {}))
+    graph.chain_sequence()
+    graph.set_input_shape(input_shape)
+    return graph
+
+
+def cases(paths):
+    """(이름, graph) — 회귀 사례, predefined 모델, 지정한 design 파일"""
+    for name, defs in REGRESSION_CASES.items():
+        yield name, chain_graph(defs, (3, 32, 32))
+    for name, defs in PREDEFINED_MODELS.items():
+        yield name, chain_graph(defs, PREDEFINED_INPUT_SHAPES.get(name))
+    for path in paths:
+        yield path, load_design(path)
+
+
+def run_case(graph, python, timeout, tmp):
+    """(ok, 마지막 출력 줄)"""
+    errors = infer_shapes(graph).errors
+    if errors:
+        uid, msg = errors[0]
+        return False, f"shape error at #{uid}: {msg}"
+    try:
+        code = generate_pytorch_code(graph)
+    except ValueError as e:
+        return False, f"export failed: {e}"
+    path = os.path.join(tmp, "model.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(code + "\n")
+    try:
+        proc = subprocess.run([python, path], cwd=tmp, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              universal_newlines=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return False, f"timed out after {timeout}s"
+    lines = proc.stdout.strip().splitlines()
+    ok = proc.returncode == 0 and "backward ok" in lines
+    return ok, lines[-1] if lines else f"exit {proc.returncode}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("designs", nargs="*", help="추가로 확인할 design 파일 (.json / .nnd)")
+    ap.add_argument("--python", default=sys.executable, help="torch가 설치된 Python (기본: 현재 인터프리터)")
+    ap.add_argument("--timeout", type=float, default=300.0)
+    args = ap.parse_args()
+
+    failed = 0
+    with tempfile.TemporaryDirectory(prefix="nn_backward_") as tmp:
+        for name, graph in cases(args.designs):
+            ok, last = run_case(graph, args.python, args.timeout, tmp)
+            failed += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<24} {last}")
+    print(f"{failed} failed" if failed else "all passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
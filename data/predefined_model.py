@@ -142,4 +142,13 @@ PREDEFINED_MODELS={
         {"type": "Flatten", "params": {}},
         {"type": "Linear", "params": {"in_features": 1024, "out_features": 1000}}
     ],
-}
\ No newline at end of file
+}
+
+# 각 모델의 원래 입력 shape (batch 제외). Flatten 뒤 Linear의 in_features가 이 크기를 전제로 함
+PREDEFINED_INPUT_SHAPES = {
+    "LeNet-5": (1, 28, 28),
+    "AlexNet": (3, 227, 227),
+    "VGG16": (3, 224, 224),
+    "ResNet-18": (3, 224, 224),
+    "GoogLeNet": (3, 224, 224),
+}
@@ -1,12 +1,5 @@
 # Description: Main window for the PyTorch NN Designer application with tabbed interface.
-from PyQt5 import QtWidgets, QtCore
-from layers.layer_item import LayerItem
-from layers.edge_item import EdgeItem
-from layers.layers_config import LAYER_TEMPLATES
-from ui.canvas.canvas_view import CanvasView
-from ui.palette.palette_widget import PaletteListWidget
-from utils.export_utils import export_to_pytorch
-from utils.save_load_utils import save_design_json, load_design_json
+from PyQt5 import QtWidgets
 
 # tabs 모듈 임포트
 from ui.tabs.design_tab import DesignTab
@@ -14,6 +7,7 @@ from ui.tabs.dataset_tab import DatasetTab
 from ui.tabs.config_tab import ConfigTab 
 from ui.tabs.setting_tab import SettingsTab 
 from ui.components.footer import Footer
+from ui.components.lazy_tab import LazyTab
 
 # -------------------- 메인 윈도우 --------------------
 class DesignerWindow(QtWidgets.QMainWindow):
@@ -34,30 +28,18 @@ class DesignerWindow(QtWidgets.QMainWindow):
         self.design_tab = DesignTab(self)
         self.tabs.addTab(self.design_tab, "Network Design Tab")
 
-        # 2️⃣ Dataset 탭 (미리 자리만 만들어둠)
-        self.dataset_tab = DatasetTab(self)
-        self.tabs.addTab(self.dataset_tab, "Dataset Tab")
+        # 2️⃣~4 보조 탭: 자리만 만들고 처음 열릴 때 생성 (시작 시에는 Design 탭만 만듦)
+        self.dataset_tab_host = LazyTab(lambda: DatasetTab(self))
+        self.tabs.addTab(self.dataset_tab_host, "Dataset Tab")
 
-        # 3️⃣ Training Config 탭 (자리만)
-        self.config_tab = ConfigTab(self)
-        self.tabs.addTab(self.config_tab, "Config Tab")
+        self.config_tab_host = LazyTab(lambda: ConfigTab(self))
+        self.tabs.addTab(self.config_tab_host, "Config Tab")
+
+        self.setting_tab_host = LazyTab(lambda: SettingsTab(self))
+        self.tabs.addTab(self.setting_tab_host, "Setting Tab")
+
+        self.tabs.currentChanged.connect(self._on_tab_changed)
 
-        # 4 Setting 탭 (자리만)
-        self.setting_tab = SettingsTab(self)
-        self.tabs.addTab(self.setting_tab, "Setting Tab")
-        
-        # # 5 Setting 탭 (자리만)
-        # self.setting_tab = SettingsTab(self)
-        # self.tabs.addTab(self.setting_tab, "Setting Tab")
-        
-        # # 6 Setting 탭 (자리만)
-        # self.setting_tab = SettingsTab(self)
-        # self.tabs.addTab(self.setting_tab, "Setting Tab")        
-        
-        # # 7 Setting 탭 (자리만)
-        # self.setting_tab = SettingsTab(self)
-        # self.tabs.addTab(self.setting_tab, "Setting Tab")
-        
         # 참조를 DesignTab 내부 위젯과 연결
         self.scene = self.design_tab.scene
         self.sequence_list = self.design_tab.sequence_list
@@ -70,5 +52,25 @@ class DesignerWindow(QtWidgets.QMainWindow):
 
         # 메시지 출력
         self.status_bar.show_temp_message("UI loaded successfully!", 2000)
-        
-        
+
+    def closeEvent(self, event):
+        self.design_tab.shutdown()
+        super().closeEvent(event)
+
+    # ---------------- Lazy tabs ----------------
+    def _on_tab_changed(self, index):
+        host = self.tabs.widget(index)
+        if isinstance(host, LazyTab) and not host.is_built():
+            host.ensure_built()
+
+    @property
+    def dataset_tab(self):
+        return self.dataset_tab_host.ensure_built()
+
+    @property
+    def config_tab(self):
+        return self.config_tab_host.ensure_built()
+
+    @property
+    def setting_tab(self):
+        return self.setting_tab_host.ensure_built()
@@ -9,8 +9,23 @@ class EdgeItem(QtWidgets.QGraphicsLineItem):
         
         self.setZValue(-1)
 
+        # adjacency index 등록 (LayerItem 이동 시 자기 Edge만 갱신하도록)
+        source_item.out_edges.append(self)
+        target_item.in_edges.append(self)
+
         self.update_position()
 
+    def detach(self):
+        """source/target LayerItem의 adjacency index에서 이 Edge를 제거"""
+        try:
+            self.source_item.out_edges.remove(self)
+        except ValueError:
+            pass
+        try:
+            self.target_item.in_edges.remove(self)
+        except ValueError:
+            pass
+
     def update_position(self):
         src_center = self.source_item.sceneBoundingRect().center()
         tgt_center = self.target_item.sceneBoundingRect().center()
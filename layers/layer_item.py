@@ -4,6 +4,21 @@ from PyQt5.QtCore import Qt, QRectF, QPointF
 from PyQt5.QtGui import QPainterPath, QFontMetricsF, QFont
 import os
 import json
+from utils.shape_inference import format_shape
+from utils.cost_model import layer_cost_text
+from layers.network_graph import MODULE_TYPE
+
+class LayerLabelItem(QtWidgets.QGraphicsSimpleTextItem):
+    """LayerItem 텍스트 라벨 - 줌 아웃(LOD) 시에는 그리지 않음"""
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+        self.setCacheMode(QtWidgets.QGraphicsItem.DeviceCoordinateCache)
+
+    def paint(self, painter, option, widget):
+        if LayerItem.is_low_detail(option, painter):
+            return
+        super().paint(painter, option, widget)
+
 
 class LayerItem(QtWidgets.QGraphicsRectItem):
     WIDTH, HEIGHT = 180, 60
@@ -28,29 +43,39 @@ class LayerItem(QtWidgets.QGraphicsRectItem):
     #     "ResidualBlock": "#B6D7A8",
     # }
 
-    PLACEHOLDERS = ("Inception", "ResidualBlock", "ResBlock")
+    PLACEHOLDERS = ("Inception", "ResidualBlock", "ResBlock", MODULE_TYPE)
 
-    def __init__(self, layer_type, params, uid):
+    # level-of-detail: 화면상 배율이 이보다 작으면 단색 박스만 그림
+    LOD_THRESHOLD = 0.4
+    _paint_cache = None  # _paint_resources()에서 한 번만 생성
+
+    def __init__(self, node):
         super().__init__(0, 0, self.WIDTH, self.HEIGHT)
-        self.layer_type = layer_type
-        self.params = dict(params) if params is not None else {}
-        self.uid = uid
-        self.connections = []
-        self.expanded = False  # UI/logic에서 확장상태 관리용 플래그
+        # node: NetworkGraph의 LayerNode (type/params/uid/connections의 실제 저장소)
+        self.node = node
+
+        # adjacency index: 이 레이어에 붙어있는 EdgeItem 참조 (이동 시 해당 Edge만 갱신)
+        self.in_edges = []
+        self.out_edges = []
 
-        # 기본 flags
+        # 기본 flags (ItemSendsGeometryChanges가 있어야 ItemPositionChange 알림이 옴)
         self.setFlags(QtWidgets.QGraphicsItem.ItemIsMovable |
                       QtWidgets.QGraphicsItem.ItemIsSelectable |
+                      QtWidgets.QGraphicsItem.ItemSendsGeometryChanges |
                       QtWidgets.QGraphicsItem.ItemSendsScenePositionChanges)
         self.setAcceptHoverEvents(True)
+        # 정적인 박스는 device 좌표 pixmap으로 캐시 (이동/팬은 다시 그리지 않음)
+        self.setCacheMode(QtWidgets.QGraphicsItem.DeviceCoordinateCache)
 
         # appearance
-        color = self.COLOR_MAP.get(layer_type, "#CCCCCC")
+        color = self.COLOR_MAP.get(self.layer_type, "#CCCCCC")
         self.setBrush(QtGui.QBrush(QtGui.QColor(color)))
         self.setPen(QtGui.QPen(QtGui.QColor("#555555"), 2))
+        self.shape_error = None  # live validation 결과 (None이면 정상)
+        self.cost = None         # LayerCost (DesignTab이 비용 캐시에서 갱신)
 
         # text item (we still use a QGraphicsSimpleTextItem for accessibility)
-        self.text_item = QtWidgets.QGraphicsSimpleTextItem(self._display_text(), self)
+        self.text_item = LayerLabelItem(self._display_text(), self)
         self.text_item.setBrush(QtGui.QBrush(QtGui.QColor("#222222")))
         font = self.text_item.font()
         font.setPointSize(9)
@@ -58,16 +83,57 @@ class LayerItem(QtWidgets.QGraphicsRectItem):
         self.text_item.setFont(font)
         self._position_text()
 
+    # ---------- Graph node view ----------
+    @property
+    def uid(self):
+        return self.node.uid
+
+    @property
+    def layer_type(self):
+        return self.node.layer_type
+
+    @property
+    def params(self):
+        return self.node.params
+
+    @params.setter
+    def params(self, value):
+        self.node.params = dict(value) if value is not None else {}
+
+    @property
+    def connections(self):
+        """나가는 연결 uid 목록 (읽기 전용, 변경은 NetworkGraph를 통해)"""
+        return self.node.outputs
+
     # ---------- Display helpers ----------
     def _display_text(self):
         """메인에 표시할 텍스트: 'LayerType\\n요약'"""
         short = self._params_short()
+        title = self._title()
         if short:
-            return f"{self.layer_type}\n{short}"
-        return f"{self.layer_type}"
+            return f"{title}\n{short}"
+        return f"{title}"
+
+    def _title(self):
+        """사용자 정의 모듈 instance는 모듈 이름으로 표시"""
+        if self.layer_type == MODULE_TYPE:
+            return str(self.params.get("module", MODULE_TYPE))
+        return self.layer_type
 
     def _params_short(self):
-        """한두 줄로 요약할 문자열 생성 (플레이스홀더 포함)"""
+        """한두 줄로 요약할 문자열 생성 (플레이스홀더 포함) + 비용 요약 줄"""
+        short = self._params_summary()
+        if self.cost is not None:
+            cost = layer_cost_text(self.cost)
+            return f"{short}\n{cost}" if short else cost
+        return short
+
+    def _params_summary(self):
+        # 사용자 정의 모듈 instance: override 수만 (레이어 구성은 정의에 있음)
+        if self.layer_type == MODULE_TYPE:
+            n = sum(len(diff) for diff in (self.params.get("overrides") or {}).values())
+            return f"module, {n} overridden" if n else "module"
+
         # ResidualBlock 요약
         if self.layer_type in ("ResidualBlock", "ResBlock"):
             in_ch = self.params.get("in_channels", "?")
@@ -114,7 +180,7 @@ class LayerItem(QtWidgets.QGraphicsRectItem):
             font.setBold(True)
             self.text_item.setFont(font)
             fm = QFontMetricsF(font)
-            text = self.layer_type
+            text = self._title()
             w = fm.width(text)
             h = fm.height()
             rect = self.rect()
@@ -139,7 +205,13 @@ class LayerItem(QtWidgets.QGraphicsRectItem):
         collapse_action = None
         if self.layer_type in self.PLACEHOLDERS:
             expand_action = menu.addAction("Expand Module")
+        # 펼친 모듈의 자식이면 그 모듈로 다시 접기
+        owner = getattr(getattr(self.scene(), "parent_tab", None), "module_owner", None)
+        if callable(owner) and owner(self.uid) is not None:
             collapse_action = menu.addAction("Collapse Module")
+        definition_action = None
+        if self.layer_type == MODULE_TYPE:
+            definition_action = menu.addAction("Edit Module Definition")
         remove_action = menu.addAction("Remove Layer")
 
         action = menu.exec_(event.screenPos())
@@ -149,21 +221,23 @@ class LayerItem(QtWidgets.QGraphicsRectItem):
             self._request_expand()
         elif action == collapse_action:
             self._request_collapse()
+        elif action == definition_action:
+            parent = getattr(self.scene(), "parent_tab", None)
+            if parent is not None:
+                parent.edit_module_definition(self.params.get("module"))
         elif action == remove_action:
             if hasattr(self.scene(), "parent_tab"):
-                parent = self.scene().parent_tab
-                try:
-                    parent.scene.removeItem(self)
-                except Exception:
-                    pass
-                if self.uid in parent.layer_items:
-                    del parent.layer_items[self.uid]
-                parent.update_sequence_from_positions()
+                self.scene().parent_tab.remove_layer(self.uid)
 
     def edit_parameters(self):
         """파라미터 편집 다이얼로그"""
         from PyQt5.QtWidgets import QInputDialog
 
+        parent = getattr(self.scene(), "parent_tab", None)
+        if self.layer_type == MODULE_TYPE and parent is not None:
+            parent.edit_module_instance(self.uid)  # 정의와 다른 값만 override로
+            return
+
         new_params = {}
         for k, v in self.params.items():
             val, ok = QInputDialog.getText(None, f"Edit {self.layer_type}", f"{k}:", text=str(v))
@@ -202,8 +276,12 @@ class LayerItem(QtWidgets.QGraphicsRectItem):
             except Exception:
                 pass
 
-        self.params = new_params
-        self._refresh_display()
+        # graph를 통해 변경 (undo/journal 기록) + downstream 재검증 요청
+        if parent is not None and hasattr(parent, "set_layer_params"):
+            parent.set_layer_params(self.uid, new_params)
+        else:
+            self.params = new_params
+            self._refresh_display()
 
     def _refresh_display(self):
         """텍스트 갱신 및 시각 업데이트"""
@@ -211,192 +289,221 @@ class LayerItem(QtWidgets.QGraphicsRectItem):
         self._position_text()
         self.update()
 
+    def set_cost(self, cost):
+        """레이어 비용(params / MACs / activation 메모리) 표시 갱신"""
+        if cost == self.cost:
+            return
+        self.cost = cost
+        self._refresh_display()
+
+    def set_shape_status(self, layer_shape):
+        """shape 검증 결과 표시: 불일치면 빨간 테두리, 툴팁에 입력/출력 shape"""
+        error = layer_shape.error
+        if error != self.shape_error:
+            self.shape_error = error
+            if error:
+                self.setPen(QtGui.QPen(QtGui.QColor("#E53935"), 3))
+            else:
+                self.setPen(QtGui.QPen(QtGui.QColor("#555555"), 2))
+        tip = f"{self.layer_type} #{self.uid}\nin: {format_shape(layer_shape.in_shape)}\nout: {format_shape(layer_shape.out_shape)}"
+        if error:
+            tip += f"\n⚠ {error}"
+        self.setToolTip(tip)
+
     # ---------- Expand / Collapse request (delegate to parent tab) ----------
     def _request_expand(self):
-        """부모(DesignTab)에 확장 동작 요청"""
+        """부모(DesignTab)에 확장 요청 (펼칠 수 없으면 DesignTab이 이유를 보여줌)"""
         parent = getattr(self.scene(), "parent_tab", None)
-        if parent is None:
-            return
-        # try multiple possible method names for compatibility
-        for meth in ("expand_module_layer", "expand_layer", "expand_predefined_module", "expand_module"):
-            fn = getattr(parent, meth, None)
-            if callable(fn):
-                try:
-                    fn(self)
-                    return
-                except Exception:
-                    pass
-        # fallback: show information
-        QtWidgets.QMessageBox.information(None, "Expand", "Expand not implemented in parent tab.")
+        if parent is not None:
+            parent.expand_module_layer(self)
 
     def _request_collapse(self):
         parent = getattr(self.scene(), "parent_tab", None)
-        if parent is None:
-            return
-        for meth in ("collapse_module_layer", "collapse_layer", "collapse_predefined_module", "collapse_module"):
-            fn = getattr(parent, meth, None)
-            if callable(fn):
-                try:
-                    fn(self)
-                    return
-                except Exception:
-                    pass
-        QtWidgets.QMessageBox.information(None, "Collapse", "Collapse not implemented in parent tab.")
+        if parent is not None:
+            parent.collapse_module_layer(self)
 
     def mouseDoubleClickEvent(self, event):
-        """더블클릭: 플레이스홀더면 expand/collapse 시도, 아니면 파라미터 편집"""
-        if self.layer_type in self.PLACEHOLDERS:
-            # toggle: if parent supports inquiry for expanded state, try collapse/expand
-            # We try collapse first if it's expanded
-            parent = getattr(self.scene(), "parent_tab", None)
-            is_expanded = getattr(self, "expanded", False)
-            if is_expanded:
-                self._request_collapse()
-            else:
-                self._request_expand()
-            # don't swallow entirely — allow default selection behavior
-        else:
-            # default: open param editor
+        """더블클릭: composite면 펼치고 펼친 모듈의 레이어면 접음 (DesignTab이 graph 상태로 결정), 아니면 파라미터 편집"""
+        parent = getattr(self.scene(), "parent_tab", None)
+        if parent is None or not parent.toggle_module_layer(self):
             self.edit_parameters()
         super().mouseDoubleClickEvent(event)
 
     # ---------- Painting ----------
+    @classmethod
+    def _paint_resources(cls):
+        """
+        paint()에서 쓰는 QFont / QPen / QBrush / QPainterPath를 클래스 단위로 한 번만 만들어 재사용.
+        박스 크기(WIDTH, HEIGHT)가 고정이라 플레이스홀더 도형 좌표도 미리 계산해 둔다.
+        (QFont는 QApplication 생성 후에 만들어야 하므로 첫 paint 때 생성)
+        """
+        if cls._paint_cache is not None:
+            return cls._paint_cache
+
+        lw, lh = float(cls.WIDTH), float(cls.HEIGHT)
+        left, top = 0.0, 0.0
+
+        label_font = QFont()
+        label_font.setPointSize(10)
+        label_font.setBold(True)
+        fm = QFontMetricsF(label_font)
+
+        # Inception: 4 branches + merge arrow
+        base_color = QtGui.QColor(cls.COLOR_MAP.get("Inception", "#F6B26B"))
+        branch_w = lw * 0.22
+        gap = lw * 0.04
+        bx = left + lw * 0.06
+        by = top + lh * 0.28
+        h = lh * 0.4
+        r2 = QRectF(bx + (branch_w + gap), by, branch_w, h)
+        center_x = left + lw * 0.92
+        center_y = top + lh / 2
+        path = QPainterPath()
+        path.moveTo(center_x - 8, center_y - 6)
+        path.lineTo(center_x, center_y)
+        path.lineTo(center_x - 8, center_y + 6)
+        inception = {
+            "pen": QtGui.QPen(base_color.darker(140), 1),
+            "brush": QtGui.QBrush(base_color.darker(110)),
+            "rects": [
+                QRectF(bx, by, branch_w, h),
+                r2,
+                QRectF(bx + 2*(branch_w + gap), by, branch_w, h),
+                QRectF(bx + 3*(branch_w + gap), by + h*0.15, branch_w*0.9, h*0.7),
+            ],
+            "arrow_pen": QtGui.QPen(QtGui.QColor("#555555"), 1),
+            "lines": [QtCore.QLineF(int(r2.right()), int(center_y), int(center_x - 8), int(center_y))],
+            "path": path,
+            "label_y": int(top + fm.height() + 2),
+        }
+
+        # ResidualBlock: 2 blocks + skip connection
+        base_color = QtGui.QColor(cls.COLOR_MAP.get("ResidualBlock", "#B6D7A8"))
+        block_w = lw * 0.36
+        block_h = lh * 0.28
+        bx = left + lw * 0.08
+        by1 = top + lh * 0.18
+        by2 = by1 + block_h + lh * 0.06
+        start_x = bx + block_w + 6
+        mid_x = left + lw * 0.9
+        y_mid = top + lh * 0.5
+        path = QPainterPath()
+        path.moveTo(mid_x - 6, y_mid - 6)
+        path.lineTo(mid_x, y_mid)
+        path.lineTo(mid_x - 6, y_mid + 6)
+        residual = {
+            "pen": QtGui.QPen(base_color.darker(140), 1),
+            "brush": QtGui.QBrush(base_color.darker(105)),
+            "rects": [QRectF(bx, by1, block_w, block_h), QRectF(bx, by2, block_w, block_h)],
+            "arrow_pen": QtGui.QPen(QtGui.QColor("#555555"), 1.5),
+            "lines": [
+                QtCore.QLineF(int(start_x), int(by1 + block_h/2), int(mid_x), int(y_mid)),
+                QtCore.QLineF(int(start_x), int(by2 + block_h/2), int(mid_x), int(y_mid)),
+            ],
+            "path": path,
+            "label_y": int(top + 14),
+        }
+
+        decorations = {"Inception": inception, "ResidualBlock": residual, "ResBlock": residual}
+        # overlay label x position (center) per placeholder name
+        for name, deco in decorations.items():
+            deco = dict(deco)
+            deco["label_pos"] = QPointF(int(left + (lw - fm.width(name)) / 2), deco["label_y"])
+            decorations[name] = deco
+
+        cls._paint_cache = {
+            "selection_pen": QtGui.QPen(QtGui.QColor("#333333"), 3),
+            "text_pen": QtGui.QPen(QtGui.QColor("#222222")),
+            "label_font": label_font,
+            "decorations": decorations,
+        }
+        return cls._paint_cache
+
+    @classmethod
+    def is_low_detail(cls, option, painter):
+        """줌 아웃되어 박스가 작게 보이면 True (텍스트/아이콘 생략)"""
+        return option.levelOfDetailFromTransform(painter.worldTransform()) < cls.LOD_THRESHOLD
+
     def paint(self, painter, option, widget):
+        # level-of-detail: zoomed out -> plain coloured box only
+        if self.is_low_detail(option, painter):
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.brush())
+            painter.drawRect(self.rect())
+            return
+
         # base rect
         QGraphicsRectItem.paint(self, painter, option, widget)
+        res = self._paint_resources()
 
         # selection border
         if self.isSelected():
-            pen = QtGui.QPen(QtGui.QColor("#333333"), 3)
-            painter.setPen(pen)
+            painter.setPen(res["selection_pen"])
             painter.drawRect(self.rect())
 
-        rect = self.rect()
-        lw = rect.width(); lh = rect.height()
-        left = rect.left(); top = rect.top()
-
         # Placeholder visuals (Inception / Residual) - keep as recognizable iconography
-        if self.layer_type == "Inception":
-            branch_w = lw * 0.22
-            gap = lw * 0.04
-            bx = left + lw * 0.06
-            by = top + lh * 0.28
-            h = lh * 0.4
-
-            base_color = QtGui.QColor(self.COLOR_MAP.get("Inception", "#F6B26B"))
-            branch_brush = QtGui.QBrush(base_color.darker(110))
-            pen = QtGui.QPen(base_color.darker(140), 1)
-            painter.setPen(pen)
-            painter.setBrush(branch_brush)
-
-            # draw branches
-            r1 = QRectF(bx, by, branch_w, h)
-            r2 = QRectF(bx + (branch_w + gap), by, branch_w, h)
-            r3 = QRectF(bx + 2*(branch_w + gap), by, branch_w, h)
-            r4 = QRectF(bx + 3*(branch_w + gap), by + h*0.15, branch_w*0.9, h*0.7)
-            painter.drawRoundedRect(r1, 3, 3)
-            painter.drawRoundedRect(r2, 3, 3)
-            painter.drawRoundedRect(r3, 3, 3)
-            painter.drawRoundedRect(r4, 3, 3)
-
-            # merge arrow
-            arrow_pen = QtGui.QPen(QtGui.QColor("#555555"), 1)
-            painter.setPen(arrow_pen)
-            center_x = left + lw * 0.92
-            center_y = top + lh / 2
-            #painter.drawLine(r1.right(), center_y, center_x - 8, center_y)
-            painter.drawLine(int(r2.right()), int(center_y), int(center_x - 8), int(center_y))
-
-            path = QPainterPath()
-            path.moveTo(center_x - 8, center_y - 6)
-            path.lineTo(center_x, center_y)
-            path.lineTo(center_x - 8, center_y + 6)
-            painter.drawPath(path)
-
-            # overlay large label (center)
-            font = QFont()
-            font.setPointSize(10)
-            font.setBold(True)
-            painter.setFont(font)
-            fm = QFontMetricsF(font)
-            label = self.layer_type
-            tw = fm.width(label)
-            th = fm.height()
-            painter.setPen(QtGui.QPen(QtGui.QColor("#222222")))
-            painter.drawText(int(left + (lw - tw) / 2), int(top + th + 2), label)
-
-        elif self.layer_type in ("ResidualBlock", "ResBlock"):
-            block_w = lw * 0.36
-            block_h = lh * 0.28
-            bx = left + lw * 0.08
-            by1 = top + lh * 0.18
-            by2 = by1 + block_h + lh * 0.06
-
-            base_color = QtGui.QColor(self.COLOR_MAP.get("ResidualBlock", "#B6D7A8"))
-            block_brush = QtGui.QBrush(base_color.darker(105))
-            pen = QtGui.QPen(base_color.darker(140), 1)
-            painter.setPen(pen)
-            painter.setBrush(block_brush)
-
-            r1 = QRectF(bx, by1, block_w, block_h)
-            r2 = QRectF(bx, by2, block_w, block_h)
-            painter.drawRoundedRect(r1, 3, 3)
-            painter.drawRoundedRect(r2, 3, 3)
-
-            # skip connection lines
-            arrow_pen = QtGui.QPen(QtGui.QColor("#555555"), 1.5)
-            painter.setPen(arrow_pen)
-            start_x = bx + block_w + 6
-            mid_x = left + lw * 0.9
-            y_mid = top + lh * 0.5
-            #painter.drawLine(start_x, by1 + block_h/2, mid_x, y_mid)
-            painter.drawLine(int(start_x), int(by1 + block_h/2), int(mid_x), int(y_mid))
-            #painter.drawLine(start_x, by2 + block_h/2, mid_x, y_mid)
-            painter.drawLine(int(start_x), int(by2 + block_h/2), int(mid_x), int(y_mid))
-            path = QPainterPath()
-            path.moveTo(mid_x - 6, y_mid - 6)
-            path.lineTo(mid_x, y_mid)
-            path.lineTo(mid_x - 6, y_mid + 6)
-            painter.drawPath(path)
-
-            # overlay large label
-            font = QFont()
-            font.setPointSize(10)
-            font.setBold(True)
-            painter.setFont(font)
-            fm = QFontMetricsF(font)
-            label = self.layer_type
-            tw = fm.width(label)
-            painter.setPen(QtGui.QPen(QtGui.QColor("#222222")))
-            #painter.drawText(left + (lw - tw) / 2, top + 14, label)
-            painter.drawText(int(left + (lw - tw) / 2), int(top + 14), label)
+        deco = res["decorations"].get(self.layer_type)
+        if deco is None:
+            # default layers: nothing extra, text_item already handles label
+            return
 
+        painter.setPen(deco["pen"])
+        painter.setBrush(deco["brush"])
+        for r in deco["rects"]:
+            painter.drawRoundedRect(r, 3, 3)
 
-        else:
-            # default layers: nothing extra, text_item already handles label
-            pass
+        painter.setPen(deco["arrow_pen"])
+        for line in deco["lines"]:
+            painter.drawLine(line)
+        painter.drawPath(deco["path"])
+
+        # overlay large label
+        painter.setFont(res["label_font"])
+        painter.setPen(res["text_pen"])
+        painter.drawText(deco["label_pos"], self.layer_type)
 
     # ---------- Position change handling ----------
+    def update_edges(self):
+        """이 레이어에 연결된 Edge들만 위치 갱신 (전체 재생성 없음)"""
+        for e in self.in_edges:
+            e.update_position()
+        for e in self.out_edges:
+            e.update_position()
+
     def itemChange(self, change, value):
         try:
-            pos_change = QtWidgets.QGraphicsItem.ItemPositionChange
             pos_changed = QtWidgets.QGraphicsItem.ItemPositionHasChanged
         except Exception:
-            pos_change = QGraphicsRectItem.ItemPositionChange
             pos_changed = QGraphicsRectItem.ItemPositionHasChanged
 
-        if change == pos_change:
-            if hasattr(self.scene(), "parent_tab"):
-                try:
-                    # update edges live while dragging
-                    self.scene().parent_tab.update_connections()
-                except Exception:
-                    pass
-        elif change == pos_changed:
-            if hasattr(self.scene(), "parent_tab"):
+        if change == pos_changed:
+            # keep the graph node position in sync (graph is the source of truth)
+            node = getattr(self, "node", None)
+            parent = getattr(self.scene(), "parent_tab", None)
+            if node is not None:
+                p = self.pos()
+                if parent is not None and node.uid in parent.graph:
+                    parent.graph.set_pos(node.uid, p.x(), p.y())  # 변경 알림 (journal)
+                else:
+                    node.x = p.x()
+                    node.y = p.y()
+            if parent is not None and parent.is_bulk_updating():
+                # bulk 추가/배치 중에는 edge/sequence 갱신을 끝에서 한 번만 수행
+                return super().itemChange(change, value)
+            # update only the edges touching this item while dragging
+            if getattr(self, "in_edges", None) is not None:
+                self.update_edges()
+            if parent is not None:
                 try:
-                    # after moved, refresh sequence
-                    self.scene().parent_tab.update_sequence_from_positions()
+                    # after moved, refresh sequence (coalesced: once per event-loop turn)
+                    parent.schedule_sequence_update()
                 except Exception:
                     pass
         return super().itemChange(change, value)
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        # drag end: 보류 중인 sequence 재계산을 바로 반영
+        parent = getattr(self.scene(), "parent_tab", None)
+        if parent is not None and hasattr(parent, "flush_pending_changes"):
+            parent.flush_pending_changes()
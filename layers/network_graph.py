@@ -0,0 +1,446 @@
+# Description: Qt-free network graph model. DesignTab keeps one NetworkGraph as the source of truth;
+# LayerItem / EdgeItem are thin views synced from it, so validate/export/save can run headless.
+# User-defined modules (named layer runs) live in NetworkGraph.modules; an instance is a MODULE_TYPE node
+# whose params only name the definition and carry per-layer overrides (flyweight), so editing the
+# definition changes every instance at once.
+import keyword
+
+MODULE_TYPE = "Module"  # 사용자 정의 모듈 instance 노드의 layer_type
+
+
+class LayerNode:
+    """그래프의 레이어 노드 (Qt 의존 없음)"""
+    __slots__ = ("uid", "layer_type", "params", "x", "y", "outputs", "inputs")
+
+    def __init__(self, uid, layer_type, params=None, x=0.0, y=0.0):
+        self.uid = uid
+        self.layer_type = layer_type
+        self.params = dict(params) if params is not None else {}
+        self.x = float(x)
+        self.y = float(y)
+        self.outputs = []  # 나가는 연결 (target uid, 순서 유지)
+        self.inputs = []   # 들어오는 연결 (source uid)
+
+    @property
+    def connections(self):
+        """기존 JSON 스키마의 'connections' 이름과 호환"""
+        return self.outputs
+
+    def __repr__(self):
+        return f"LayerNode({self.layer_type} #{self.uid})"
+
+
+class ModuleDefinition:
+    """
+    사용자 정의 모듈: 직렬로 이어지는 레이어 (type, params) 목록.
+    모든 instance가 같은 객체를 공유하므로 만든 뒤에는 바꾸지 않음 (NetworkGraph.define_module로 교체)
+    """
+    __slots__ = ("name", "layers")
+
+    def __init__(self, name, layers):
+        self.name = name
+        self.layers = tuple((layer_type, dict(params or {})) for layer_type, params in layers)
+
+    def __len__(self):
+        return len(self.layers)
+
+    def resolve(self, overrides=None):
+        """
+        instance의 실제 레이어 목록 [(type, params)].
+        overrides: {"<index>": {key: value}} — 정의에 있는 키만 덮어씀 (정의가 바뀌어 사라진 키/레이어는 무시)
+        """
+        if not overrides:
+            return list(self.layers)
+        out = []
+        for i, (layer_type, params) in enumerate(self.layers):
+            diff = overrides.get(str(i))
+            if diff:
+                params = dict(params)
+                params.update((k, v) for k, v in diff.items() if k in params)
+            out.append((layer_type, params))
+        return out
+
+    def overrides_for(self, layers):
+        """resolve()의 역: 레이어 목록과 정의의 차이 (정의와 구조가 다르거나 없는 키를 바꾸면 ValueError)"""
+        if len(layers) != len(self.layers):
+            raise ValueError(f"모듈 {self.name}: 레이어 수가 정의와 다릅니다 ({len(layers)} != {len(self.layers)})")
+        overrides = {}
+        for i, ((layer_type, params), (def_type, def_params)) in enumerate(zip(layers, self.layers)):
+            if layer_type != def_type:
+                raise ValueError(f"모듈 {self.name}[{i}]: 타입이 정의와 다릅니다 ({layer_type} != {def_type})")
+            unknown = [k for k in params if k not in def_params]
+            if unknown:
+                raise ValueError(f"모듈 {self.name}[{i}] {layer_type}: 정의에 없는 파라미터 {unknown}")
+            diff = {k: v for k, v in params.items() if def_params[k] != v}
+            if diff:
+                overrides[str(i)] = diff
+        return overrides
+
+
+def instance_params(name, overrides=None):
+    """MODULE_TYPE 노드의 params (정의 이름 + override 차이만)"""
+    params = {"module": name}
+    if overrides:
+        params["overrides"] = overrides
+    return params
+
+
+class NetworkGraph:
+    """
+    레이어 그래프 (source of truth)
+    - _nodes: index -> LayerNode (삭제 시 마지막 노드를 빈 자리로 옮겨 배열을 조밀하게 유지)
+    - _index: uid -> index
+    - LayerNode.outputs / inputs: uid 기반 adjacency 배열
+    - sequence: 사용자에게 보이는 레이어 순서 (uid 목록)
+    - version: 구조(노드/연결/순서)가 바뀔 때마다 증가 -> 캐시 무효화 판단용
+    - modules: 이름 -> ModuleDefinition (MODULE_TYPE 노드가 params["module"]로 참조)
+    - observer: 변경 알림 callable(op, fields) (예: utils.design_journal.DesignJournal.record), None이면 알리지 않음
+    """
+    def __init__(self):
+        self._nodes = []
+        self._index = {}
+        self.sequence = []
+        self.last_uid = 0
+        self.version = 0
+        self.input_shape = None  # 배치 차원을 뺀 입력 shape (예: (3, 224, 224)), None이면 추정
+        self.modules = {}
+        self.observer = None
+
+    def _notify(self, op, **fields):
+        if self.observer is not None:
+            self.observer(op, fields)
+
+    # ---------------- Container helpers ----------------
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, uid):
+        return uid in self._index
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def node(self, uid):
+        """uid에 해당하는 노드 (없으면 KeyError)"""
+        return self._nodes[self._index[uid]]
+
+    def get(self, uid, default=None):
+        idx = self._index.get(uid)
+        return self._nodes[idx] if idx is not None else default
+
+    def index_of(self, uid):
+        return self._index[uid]
+
+    def uids(self):
+        return [n.uid for n in self._nodes]
+
+    def ordered_nodes(self):
+        """sequence 순서대로 노드 목록 (그래프에 없는 uid는 건너뜀)"""
+        return [self._nodes[self._index[uid]] for uid in self.sequence if uid in self._index]
+
+    # ---------------- Node add / remove / edit ----------------
+    def new_uid(self):
+        self.last_uid += 1
+        return self.last_uid
+
+    def add_node(self, layer_type, params=None, uid=None, pos=(0.0, 0.0), append_to_sequence=True):
+        if uid is None:
+            uid = self.new_uid()
+        elif uid in self._index:
+            raise ValueError(f"duplicate layer uid {uid}")
+        else:
+            self.last_uid = max(self.last_uid, uid)
+
+        node = LayerNode(uid, layer_type, params, pos[0], pos[1])
+        self._index[uid] = len(self._nodes)
+        self._nodes.append(node)
+        if append_to_sequence:
+            self.sequence.append(uid)
+        self.version += 1
+        if self.observer is not None:
+            self._notify("add", uid=uid, type=layer_type, params=node.params, pos=(node.x, node.y),
+                         seq=append_to_sequence)
+        return node
+
+    def remove_node(self, uid):
+        """노드와 그 노드에 붙은 연결을 모두 제거하고 제거된 노드를 반환"""
+        node = self.node(uid)
+        # 연결은 disconnect로 끊어서 변경 알림(undo/journal)에 남김
+        for tgt in list(node.outputs):
+            self.disconnect(uid, tgt)
+        for src in list(node.inputs):
+            self.disconnect(src, uid)
+
+        # swap-remove: 마지막 노드를 빈 자리로 옮김
+        idx = self._index.pop(uid)
+        last = self._nodes.pop()
+        if last is not node:
+            self._nodes[idx] = last
+            self._index[last.uid] = idx
+
+        seq_index = -1
+        if uid in self.sequence:
+            seq_index = self.sequence.index(uid)
+            del self.sequence[seq_index]
+        self.version += 1
+        self._notify("remove", uid=uid, type=node.layer_type, params=node.params, pos=(node.x, node.y),
+                     seq_index=seq_index)
+        return node
+
+    def restore_node(self, uid, layer_type, params, pos, seq_index=-1):
+        """remove_node의 역연산: 같은 uid로 다시 추가하고 sequence의 원래 위치에 넣음 (연결은 호출 측에서)"""
+        node = self.add_node(layer_type, params, uid=uid, pos=pos, append_to_sequence=False)
+        if seq_index >= 0:
+            seq = list(self.sequence)
+            seq.insert(min(seq_index, len(seq)), uid)
+            self.set_sequence(seq)
+        return node
+
+    def set_params(self, uid, params):
+        node = self.node(uid)
+        old = node.params
+        node.params = dict(params) if params is not None else {}
+        self._notify("params", uid=uid, params=node.params, old=old)
+
+    def set_pos(self, uid, x, y):
+        node = self.node(uid)
+        x, y = float(x), float(y)
+        if node.x != x or node.y != y:
+            old = (node.x, node.y)
+            node.x = x
+            node.y = y
+            self._notify("move", uid=uid, pos=(x, y), old=old)
+
+    def set_input_shape(self, shape):
+        old = self.input_shape
+        self.input_shape = tuple(shape) if shape is not None else None
+        if self.input_shape != old:
+            self._notify("input_shape", shape=self.input_shape, old=old)
+
+    def clear(self):
+        """노드/연결/순서/모듈 정의를 비움 (uid 카운터는 유지해서 재사용하지 않음)"""
+        old = self.contents()
+        self._nodes = []
+        self._index = {}
+        self.sequence = []
+        self.modules = {}
+        self.version += 1
+        self._notify("clear", old=old)
+
+    def contents(self):
+        """
+        (nodes, index, sequence, input_shape, modules) — clear/take_from 이후에도 그대로 남는 내부 상태 참조.
+        sequence / modules는 제자리에서 바뀌므로 복사해 둠 (modules는 정의 수만큼, 정의 자체는 공유)
+        """
+        return self._nodes, self._index, tuple(self.sequence), self.input_shape, dict(self.modules)
+
+    def restore_contents(self, contents):
+        """contents()로 얻은 상태로 통째로 교체 (sequence / modules 복사 외에는 O(1), undo/redo 용)"""
+        old = self.contents()
+        self._nodes, self._index, sequence, self.input_shape, modules = contents
+        self.sequence = list(sequence)
+        self.modules = dict(modules)
+        self.version += 1
+        self._notify("replace", old=old, new=contents)
+
+    def copy(self):
+        """노드/연결/순서를 복사한 독립 그래프 (params dict는 얕은 복사). 백그라운드 저장용 snapshot"""
+        g = NetworkGraph()
+        for node in self._nodes:
+            n = LayerNode(node.uid, node.layer_type, node.params, node.x, node.y)
+            n.outputs = list(node.outputs)
+            n.inputs = list(node.inputs)
+            g._index[n.uid] = len(g._nodes)
+            g._nodes.append(n)
+        g.sequence = list(self.sequence)
+        g.last_uid = self.last_uid
+        g.input_shape = self.input_shape
+        g.modules = dict(self.modules)  # 정의는 바뀌지 않으므로 공유
+        return g
+
+    def take_from(self, other):
+        """
+        other의 노드/연결/순서로 내용을 교체하고 other는 비움 (O(1)).
+        백그라운드 스레드에서 만든 그래프를 GUI 쪽 그래프에 붙일 때 사용
+        """
+        contents = other.contents()
+        self.last_uid = max(self.last_uid, other.last_uid)
+        other._nodes, other._index, other.sequence, other.modules = [], {}, [], {}
+        other.version += 1
+        self.restore_contents(contents)
+
+    # ---------------- User modules ----------------
+    @staticmethod
+    def check_module(name, layers):
+        """
+        define_module에 넘길 정의를 검사해서 ModuleDefinition으로 (layers가 None이면 이름만 검사, None 반환).
+        이름은 Python 식별자여야 함 (export 시 클래스 이름), 레이어가 없거나 모듈 안에 모듈이 있으면 -> ValueError
+        """
+        if not isinstance(name, str) or not name.isidentifier() or keyword.iskeyword(name):
+            raise ValueError(f"모듈 이름은 Python 식별자여야 합니다: {name!r}")
+        if layers is None:
+            return None
+        definition = ModuleDefinition(name, layers)
+        if not definition.layers:
+            raise ValueError(f"모듈 {name}: 레이어가 없습니다")
+        if any(layer_type == MODULE_TYPE for layer_type, _ in definition.layers):
+            raise ValueError(f"모듈 {name}: 모듈 안에 다른 모듈을 넣을 수 없습니다")
+        return definition
+
+    def define_module(self, name, layers):
+        """
+        모듈 정의 추가/교체 (layers: [(type, params)], None이면 삭제). 이 정의의 모든 instance에 바로 반영됨.
+        정의가 잘못되면 graph를 바꾸지 않고 ValueError (check_module)
+        """
+        new = self.check_module(name, layers)
+        old = self.modules.get(name)
+        if new is None:
+            if old is None:
+                return
+            del self.modules[name]
+        else:
+            self.modules[name] = new
+        self.version += 1
+        self._notify("define_module", name=name, layers=None if new is None else new.layers,
+                     old=None if old is None else old.layers)
+
+    def module_layers(self, node):
+        """MODULE_TYPE 노드의 실제 레이어 목록 [(type, params)] (정의가 없거나 모듈이 아니면 None)"""
+        if node.layer_type != MODULE_TYPE:
+            return None
+        definition = self.modules.get((node.params or {}).get("module"))
+        if definition is None:
+            return None
+        return definition.resolve((node.params or {}).get("overrides"))
+
+    def instances(self, name):
+        """정의 name을 쓰는 노드 uid 목록 (O(layers))"""
+        return [n.uid for n in self._nodes
+                if n.layer_type == MODULE_TYPE and (n.params or {}).get("module") == name]
+
+    # ---------------- Connections ----------------
+    def connect(self, src, tgt, out_index=None, in_index=None):
+        """src -> tgt 연결. out_index/in_index를 주면 그 위치에 넣음 (disconnect 되돌리기용, 기본은 끝)"""
+        s = self.node(src)
+        t = self.node(tgt)
+        if tgt not in s.outputs:
+            if out_index is None:
+                s.outputs.append(tgt)
+            else:
+                s.outputs.insert(out_index, tgt)
+            if in_index is None:
+                t.inputs.append(src)
+            else:
+                t.inputs.insert(in_index, src)
+            self.version += 1
+            # 실제로 들어간 위치를 알림 (journal replay / redo가 병합 입력 순서까지 같게 복원하도록)
+            self._notify("connect", src=src, tgt=tgt, out_index=s.outputs.index(tgt),
+                         in_index=t.inputs.index(src))
+
+    def disconnect(self, src, tgt):
+        s = self.node(src)
+        t = self.node(tgt)
+        if tgt in s.outputs:
+            out_index = s.outputs.index(tgt)
+            in_index = t.inputs.index(src)
+            del s.outputs[out_index]
+            del t.inputs[in_index]
+            self.version += 1
+            self._notify("disconnect", src=src, tgt=tgt, out_index=out_index, in_index=in_index)
+
+    def successors(self, uid):
+        return self.node(uid).outputs
+
+    def predecessors(self, uid):
+        return self.node(uid).inputs
+
+    def set_outputs(self, uid, targets):
+        """uid의 나가는 연결을 targets로 교체"""
+        node = self.node(uid)
+        for tgt in list(node.outputs):
+            self.disconnect(uid, tgt)
+        for tgt in targets:
+            if tgt in self._index:
+                self.connect(uid, tgt)
+
+    def clear_connections(self):
+        old = list(self.edges()) if self.observer is not None else None
+        for node in self._nodes:
+            node.outputs = []
+            node.inputs = []
+        self.version += 1
+        self._notify("clear_connections", edges=old)
+
+    def edges(self):
+        """(src_uid, tgt_uid) 쌍을 순회"""
+        for node in self._nodes:
+            for tgt in node.outputs:
+                yield node.uid, tgt
+
+    # ---------------- Sequence ----------------
+    def set_sequence(self, uids):
+        """sequence를 uids 순서로 교체 (그래프에 없는 uid, 중복은 무시)"""
+        seen = set()
+        seq = []
+        for uid in uids:
+            if uid in self._index and uid not in seen:
+                seen.add(uid)
+                seq.append(uid)
+        if seq != self.sequence:
+            old = self.sequence
+            self.sequence = seq
+            self.version += 1
+            self._notify("sequence", uids=seq, old=old)
+
+    def link_into_sequence(self, uid):
+        """
+        uid를 sequence의 앞/뒤 레이어 사이에 연결 (바뀌는 연결은 최대 3개).
+        앞 -> 뒤 연결이 있으면 그 자리에 끼우고, 없으면 앞 레이어 출력에 붙임 (앞이 없으면 뒤 레이어의 입력으로).
+        직렬 design은 직렬로 남고, branch / merge 연결은 건드리지 않음
+        """
+        seq = [u for u in self.sequence if u in self._index]
+        i = seq.index(uid)
+        prev = seq[i - 1] if i > 0 else None
+        nxt = seq[i + 1] if i + 1 < len(seq) else None
+        if prev is not None and nxt is not None and nxt in self.node(prev).outputs:
+            out_index = self.node(prev).outputs.index(nxt)
+            in_index = self.node(nxt).inputs.index(prev)
+            self.disconnect(prev, nxt)
+            self.connect(prev, uid, out_index)
+            self.connect(uid, nxt, None, in_index)
+        elif prev is not None:
+            self.connect(prev, uid)
+        elif nxt is not None:
+            self.connect(uid, nxt)
+
+    def is_chained(self):
+        """현재 연결이 정확히 sequence 순서의 직렬 연결인지. 레이어와 연결을 모두 훑으므로 O(레이어 + 연결)"""
+        seq = [uid for uid in self.sequence if uid in self._index]
+        # sequence 밖의 노드에 연결이 있으면 전체 연결 수가 맞지 않음
+        if sum(len(n.outputs) for n in self._nodes) != max(len(seq) - 1, 0):
+            return False
+        last = len(seq) - 1
+        for i, uid in enumerate(seq):
+            node = self._nodes[self._index[uid]]
+            if node.outputs != ([seq[i + 1]] if i < last else []):
+                return False
+            if node.inputs != ([seq[i - 1]] if i > 0 else []):
+                return False
+        return True
+
+    def chain_sequence(self):
+        """
+        연결을 sequence 순서의 직렬 연결 (seq[i] -> seq[i+1])로 맞춤.
+        호출마다 is_chained 확인과 비교에 O(레이어 + 연결)이 들고, 실제로 끊고/잇는 연결(= journal / undo 기록)은
+        바뀐 것뿐이다. 레이어 하나를 넣거나 뺄 때는 link_into_sequence가 앞/뒤 연결만 바꾼다.
+        """
+        if self.is_chained():
+            return
+        seq = [uid for uid in self.sequence if uid in self._index]
+        wanted = set(zip(seq, seq[1:]))
+        for node in self._nodes:
+            for tgt in list(node.outputs):
+                if (node.uid, tgt) not in wanted:
+                    self.disconnect(node.uid, tgt)
+        for src, tgt in zip(seq, seq[1:]):
+            self.connect(src, tgt)
@@ -1,18 +1,49 @@
 # Description: Main application file to run the PyQt5 GUI with theming support.
-from PyQt5 import QtWidgets
-from designer_window import DesignerWindow
+# Usage: python main.py [--quit-after-init]            GUI
+#        python main.py validate design.json           headless (utils/cli.py, Qt is not imported)
+#        python main.py export design.json -o model.py
+import sys
+import argparse
+
+from utils.cli import add_commands, run_command
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="PyTorch NN Designer")
+    ap.add_argument("--quit-after-init", action="store_true",
+                    help="창을 띄운 뒤 첫 이벤트 루프에서 바로 종료 (startup 벤치마크용)")
+    add_commands(ap)
+    return ap.parse_args(argv)
 
-from utils.theme_utils import apply_theme_to_window
 
 # -------------------- 메인 애플리케이션 --------------------
-def main():
-    app = QtWidgets.QApplication([])
+def run_gui(args):
+    from PyQt5 import QtWidgets, QtCore
+    from designer_window import DesignerWindow
+    from utils.theme_utils import theme_manager
+    from ui.tabs.setting_tab import SettingsTab
+
+    app = QtWidgets.QApplication(sys.argv[:1])
     
-    apply_theme_to_window(app, "dark")  # Apply the desired theme here
+    # 저장된 테마를 한 번만 적용 (Settings 탭은 처음 열릴 때 만들어지므로 여기서 적용)
+    theme = theme_manager.apply(SettingsTab.saved_theme_name("dark"), app)
 
     win = DesignerWindow()
+    win.status_bar.update_style(theme)
     win.show()
-    app.exec_()
+    if args.quit_after_init:
+        QtCore.QTimer.singleShot(0, app.quit)
+    else:
+        # 창이 뜬 뒤 이전 세션 복구 여부 확인 + autosave 시작
+        QtCore.QTimer.singleShot(0, win.design_tab.offer_session_recovery)
+    return app.exec_()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command:
+        return run_command(args)
+    return run_gui(args)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
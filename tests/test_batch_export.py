@@ -0,0 +1,114 @@
+import json
+import os
+
+import pytest
+
+from layers.network_graph import NetworkGraph
+from utils.batch_export import ERROR, INVALID, OK, SKIPPED, format_summary, run_batch
+from utils.design_io import save_design
+
+
+def design(out_channels=8):
+    graph = NetworkGraph()
+    graph.add_node("Conv2d", {"in_channels": 3, "out_channels": out_channels, "kernel_size": 3})
+    graph.add_node("ReLU", {})
+    graph.chain_sequence()
+    graph.set_input_shape((3, 32, 32))
+    return graph
+
+
+def invalid_design():
+    graph = design()
+    graph.add_node("Linear", {"in_features": 5, "out_features": 2})
+    graph.chain_sequence()
+    return graph
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "designs"
+    (src / "sub").mkdir(parents=True)
+    save_design(design(), str(src / "a.json"))
+    save_design(design(4), str(src / "sub" / "b.nnd"), compression="gzip")
+    save_design(invalid_design(), str(src / "bad.json"))
+    (src / "broken.json").write_text("{not json", encoding="utf-8")
+    return src, tmp_path / "out"
+
+
+def statuses(report):
+    return {entry["path"]: entry["status"] for entry in report["files"]}
+
+
+def run(src, out, **kwargs):
+    return run_batch(str(src), str(out), jobs=kwargs.pop("jobs", 1), **kwargs)
+
+
+def test_first_run_exports_and_reports(tree):
+    src, out = tree
+    report = run(src, out)
+    assert statuses(report) == {"a.json": OK, "bad.json": INVALID, "broken.json": ERROR,
+                                os.path.join("sub", "b.nnd"): OK}
+    assert (out / "a.py").exists() and (out / "sub" / "b.py").exists() and not (out / "bad.py").exists()
+    with open(out / "batch_report.json", encoding="utf-8") as f:
+        assert json.load(f)["summary"] == {OK: 2, SKIPPED: 0, INVALID: 1, ERROR: 1}
+    assert "2 exported, 0 unchanged, 1 invalid, 1 errors" in format_summary(report)
+
+
+def test_unchanged_files_are_skipped_without_parsing(tree):
+    src, out = tree
+    run(src, out)
+    report = run(src, out)
+    by_path = {entry["path"]: entry for entry in report["files"]}
+    assert by_path["a.json"]["status"] == SKIPPED and by_path["a.json"]["cached"]
+    assert by_path["bad.json"]["status"] == INVALID and by_path["bad.json"]["cached"]
+    assert by_path["broken.json"]["status"] == ERROR  # 오류는 매번 다시 시도
+    assert "cached" not in by_path["broken.json"]
+
+
+def test_touched_but_identical_file_is_hashed_not_regenerated(tree):
+    src, out = tree
+    run(src, out)
+    generated = out / "a.py"
+    generated.write_text("# 손대지 않아야 함\n", encoding="utf-8")
+    save_design(design(), str(src / "a.json"))
+    os.utime(src / "a.json", (1, 1))
+    entry = {e["path"]: e for e in run(src, out)["files"]}["a.json"]
+    assert entry["status"] == SKIPPED and "cached" not in entry
+    assert generated.read_text(encoding="utf-8") == "# 손대지 않아야 함\n"
+
+
+def test_changed_design_missing_output_and_force_are_regenerated(tree):
+    src, out = tree
+    run(src, out)
+    save_design(design(16), str(src / "a.json"))
+    os.utime(src / "a.json", (2, 2))
+    os.remove(out / "sub" / "b.py")
+    report = run(src, out)
+    assert statuses(report)["a.json"] == OK and statuses(report)[os.path.join("sub", "b.nnd")] == OK
+    assert "out_channels=16" in (out / "a.py").read_text(encoding="utf-8")
+    assert statuses(run(src, out, force=True))["a.json"] == OK
+
+
+def test_inference_flag_invalidates_the_cache(tree):
+    src, out = tree
+    run(src, out)
+    report = run(src, out, inference=True)
+    assert statuses(report)["a.json"] == OK
+    assert "inference_mode" in (out / "a.py").read_text(encoding="utf-8")
+
+
+def test_removed_designs_leave_the_cache(tree):
+    src, out = tree
+    run(src, out)
+    os.remove(src / "a.json")
+    run(src, out)
+    with open(out / ".export_cache.json", encoding="utf-8") as f:
+        assert "a.json" not in json.load(f)["files"]
+
+
+def test_process_pool_matches_sequential_run(tree, tmp_path):
+    src, out = tree
+    sequential = statuses(run(src, out))
+    parallel = statuses(run(src, tmp_path / "parallel", jobs=2))
+    assert parallel == sequential
+    assert (tmp_path / "parallel" / "a.py").read_text() == (out / "a.py").read_text()
@@ -0,0 +1,154 @@
+import pytest
+
+from layers.network_graph import MODULE_TYPE, NetworkGraph
+from utils.composite_modules import (ExpandedModules, collapse_nodes, expand_children, expand_node,
+                                     is_expandable)
+from utils.shape_inference import infer_shapes
+
+
+def build(defs, input_shape=(3, 32, 32)):
+    graph = NetworkGraph()
+    for i, (layer_type, params) in enumerate(defs):
+        graph.add_node(layer_type, params, pos=(0.0, 100.0 * i))
+    graph.chain_sequence()
+    graph.set_input_shape(input_shape)
+    return graph
+
+
+def residual(in_ch, out_ch, stride=1, repeats=1):
+    return "ResidualBlock", {"in_channels": in_ch, "out_channels": out_ch, "stride": stride, "repeats": repeats}
+
+
+def snapshot(graph):
+    """uid 재배치와 무관한 비교: sequence 순서의 (type, params, 입력 위치)"""
+    index = {uid: i for i, uid in enumerate(graph.sequence)}
+    return [(graph.node(uid).layer_type, graph.node(uid).params,
+             [index[src] for src in graph.node(uid).inputs]) for uid in graph.sequence]
+
+
+def expand(graph, uid, expanded):
+    node = graph.node(uid)
+    children = expand_node(graph, uid)
+    expanded.add(uid, node.layer_type, node.params, children)
+    return children
+
+
+def collapse(graph, expanded, uid):
+    owner, layer_type, params, leaves, lossless = expanded.collapse_plan(graph, uid)
+    return collapse_nodes(graph, leaves, layer_type, params, uid=owner), lossless
+
+
+@pytest.mark.parametrize("block", [residual(8, 8), residual(8, 16, stride=2)])
+def test_residual_expand_collapse_round_trip(block):
+    graph = build([("Conv2d", {"in_channels": 3, "out_channels": 8, "kernel_size": 3, "padding": 1}),
+                   block, ("ReLU", {})])
+    before, shape = snapshot(graph), infer_shapes(graph).output_shape
+    expanded = ExpandedModules()
+    children = expand(graph, 2, expanded)
+    assert len(children) == (6 if block[1]["stride"] == 1 else 8)
+    merge = graph.node(children[-1])
+    skip = 1 if block[1]["stride"] == 1 else children[6]  # 블록 앞 레이어 또는 downsample BN
+    assert merge.inputs == [children[4], skip]
+    assert infer_shapes(graph).output_shape == shape
+    _, lossless = collapse(graph, expanded, children[0])
+    assert lossless and snapshot(graph) == before
+
+
+def test_first_layer_block_gets_an_identity_entry():
+    graph = build([residual(3, 3), ("ReLU", {})])
+    expanded = ExpandedModules()
+    children = expand(graph, 1, expanded)
+    entry = graph.node(children[0])
+    assert entry.layer_type == "Identity" and not entry.inputs
+    assert graph.node(children[-1]).inputs == [children[5], children[0]]  # 본류 + skip
+    _, lossless = collapse(graph, expanded, children[3])
+    assert lossless and snapshot(graph) == [("ResidualBlock", residual(3, 3)[1], []), ("ReLU", {}, [0])]
+
+
+def test_expand_moves_the_layers_below_and_collapse_moves_them_back():
+    graph = build([residual(8, 8), ("ReLU", {})])
+    expanded = ExpandedModules()
+    children = expand(graph, 1, expanded)
+    assert graph.node(2).y == 100.0 + 6 * 100  # 진입점 포함 7줄 -> 6칸 아래로
+    collapse(graph, expanded, children[-1])
+    assert graph.node(2).y == 100.0
+
+
+def test_repeated_residual_expands_one_level_at_a_time():
+    graph = build([("Conv2d", {"in_channels": 3, "out_channels": 8, "kernel_size": 1}), residual(8, 16, 2, repeats=3)])
+    expanded = ExpandedModules()
+    blocks = expand(graph, 2, expanded)
+    assert [graph.node(u).params for u in blocks] == [residual(8, 16, 2)[1], residual(16, 16)[1], residual(16, 16)[1]]
+    inner = expand(graph, blocks[1], expanded)
+    # 중첩된 자식을 골라도 바로 위 모듈만 접히고, 원래 uid로 돌아와 바깥 모듈도 다시 접을 수 있음
+    uid, lossless = collapse(graph, expanded, inner[0])
+    assert uid == blocks[1] and lossless and graph.node(uid).params == residual(16, 16)[1]
+    uid, lossless = collapse(graph, expanded, blocks[0])
+    assert uid == 2 and lossless and graph.node(uid).params == residual(8, 16, 2, repeats=3)[1]
+    assert graph.uids() == [1, 2] and graph.node(1).outputs == [2]
+
+
+def test_edited_children_collapse_with_rederived_params():
+    graph = build([("Conv2d", {"in_channels": 3, "out_channels": 8, "kernel_size": 1}), residual(8, 8)])
+    expanded = ExpandedModules()
+    children = expand(graph, 2, expanded)
+    conv = graph.node(children[0])
+    graph.set_params(conv.uid, dict(conv.params, out_channels=16))
+    graph.set_params(children[3], dict(graph.node(children[3]).params, in_channels=16, out_channels=16))
+    owner, _, params, _, lossless = expanded.collapse_plan(graph, children[0])
+    assert owner == 2 and params["out_channels"] == 16 and not lossless  # BN 등은 옛 channel 그대로
+    graph.set_params(children[3], dict(graph.node(children[3]).params, kernel_size=5))
+    graph.set_params(conv.uid, dict(conv.params, out_channels=8))
+    assert not expanded.collapse_plan(graph, children[0])[4]
+
+
+def test_collapse_plan_errors():
+    graph = build([("Conv2d", {"in_channels": 3, "out_channels": 8, "kernel_size": 1}), residual(8, 8)])
+    expanded = ExpandedModules()
+    with pytest.raises(ValueError):
+        expanded.collapse_plan(graph, 1)  # 펼친 모듈의 자식이 아님
+    children = expand(graph, 2, expanded)
+    graph.remove_node(children[0])
+    with pytest.raises(ValueError):
+        expanded.collapse_plan(graph, children[1])  # 자식이 사라져 기록이 깨짐
+
+
+def test_changed_child_types_cannot_collapse():
+    graph = build([("Conv2d", {"in_channels": 3, "out_channels": 8, "kernel_size": 1}), residual(8, 8)])
+    expanded = ExpandedModules()
+    children = expand(graph, 2, expanded)
+    graph.remove_node(children[0])
+    graph.restore_node(children[0], "Linear", {"in_features": 8, "out_features": 8}, (0.0, 100.0))
+    with pytest.raises(ValueError):
+        expanded.collapse_plan(graph, children[0])
+
+
+def test_inception_and_plain_layers_are_not_expandable():
+    graph = build([("Inception", {"in_channels": 3}), ("ReLU", {})])
+    with pytest.raises(ValueError, match="concat"):
+        expand_node(graph, 1)
+    assert len(graph) == 2 and not is_expandable(graph, 1) and not is_expandable(graph, 2)
+    with pytest.raises(ValueError):
+        expand_children(graph, 2)
+
+
+def test_module_instance_expands_to_its_definition_and_collapses_to_overrides():
+    graph = NetworkGraph()
+    graph.define_module("Block", [("Conv2d", {"in_channels": 8, "out_channels": 8, "kernel_size": 3}),
+                                  ("ReLU", {})])
+    graph.add_node("Conv2d", {"in_channels": 3, "out_channels": 8, "kernel_size": 1})
+    graph.add_node(MODULE_TYPE, {"module": "Block"}, pos=(0.0, 100.0))
+    graph.chain_sequence()
+    expanded = ExpandedModules()
+    children = expand(graph, 2, expanded)
+    assert [graph.node(u).layer_type for u in children] == ["Conv2d", "ReLU"]
+    graph.set_params(children[0], dict(graph.node(children[0]).params, kernel_size=1))
+    uid, lossless = collapse(graph, expanded, children[1])
+    assert lossless and graph.node(uid).params == {"module": "Block", "overrides": {"0": {"kernel_size": 1}}}
+
+
+def test_undefined_module_is_not_expandable():
+    graph = NetworkGraph()
+    graph.add_node(MODULE_TYPE, {"module": "Missing"})
+    with pytest.raises(ValueError, match="Missing"):
+        expand_children(graph, 1)
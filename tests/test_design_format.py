@@ -0,0 +1,73 @@
+import pytest
+
+from data.predefined_model import PREDEFINED_MODELS
+from layers.network_graph import MODULE_TYPE, NetworkGraph
+from utils.design_binary import is_binary_file, load_binary, read_binary, save_binary
+from utils.design_io import design_hash, graph_to_doc, load_design, save_design
+
+
+def sample_graph():
+    graph = NetworkGraph()
+    for i, d in enumerate(PREDEFINED_MODELS["GoogLeNet"]):
+        graph.add_node(d["type"], d.get("params", {}), pos=(50.0 + i % 3, 50.0 + 100 * i))
+    graph.chain_sequence()
+    graph.connect(2, 5)  # branch + merge
+    graph.define_module("Block", [("Conv2d", {"in_channels": 3, "out_channels": 8}), ("ReLU", {"이름": "값"})])
+    graph.add_node(MODULE_TYPE, {"module": "Block", "overrides": {"0": {"out_channels": 4}}},
+                   append_to_sequence=False)  # sequence 밖의 레이어
+    graph.set_input_shape((3, None, 224))
+    graph.remove_node(3)  # uid에 빈 자리
+    return graph
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip", "lzma"])
+def test_binary_round_trip(tmp_path, compression):
+    graph = sample_graph()
+    path = str(tmp_path / "design.nnd")
+    save_binary(graph, path, compression=compression)
+    assert is_binary_file(path)
+    assert read_binary(path).compression == compression
+    loaded = load_binary(path)
+    assert graph_to_doc(loaded) == graph_to_doc(graph)
+    assert design_hash(loaded) == design_hash(graph)
+
+
+def test_json_to_binary_to_json_is_byte_identical(tmp_path):
+    first, binary, second = (str(tmp_path / name) for name in ("a.json", "b.nnd", "c.json"))
+    save_design(sample_graph(), first)
+    save_design(load_design(first), binary, compression="gzip")
+    save_design(load_design(binary), second)
+    with open(first, "rb") as a, open(second, "rb") as c:
+        assert a.read() == c.read()
+
+
+@pytest.mark.parametrize("name", ["design.json", "design.nnd"])
+def test_loading_into_a_non_empty_graph_remaps_uids(tmp_path, name):
+    path = str(tmp_path / name)
+    save_design(sample_graph(), path)
+    graph = NetworkGraph()
+    graph.add_node("ReLU", {}, uid=1)
+    load_design(path, graph)
+    original = sample_graph()
+    assert len(graph) == len(original) + 1
+    # uid 1은 새 uid로: 연결과 sequence가 같은 노드를 가리켜야 함
+    loaded_first = graph.node(graph.sequence[1])
+    assert loaded_first.layer_type == original.node(1).layer_type and loaded_first.uid != 1
+    assert len(list(graph.edges())) == len(list(original.edges()))
+    assert graph.node(graph.sequence[2]).inputs == [loaded_first.uid]
+
+
+def test_rejects_foreign_and_future_files(tmp_path):
+    path = tmp_path / "x.nnd"
+    path.write_bytes(b"NOPE\x01\x00\x00\x00")
+    assert not is_binary_file(str(path))
+    with pytest.raises(ValueError):
+        read_binary(str(path))
+    path.write_bytes(b"NNDB\x63\x00\x00\x00")
+    with pytest.raises(ValueError):
+        read_binary(str(path))
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        save_binary(sample_graph(), str(tmp_path / "x.nnd"), compression="zip")
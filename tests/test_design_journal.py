@@ -0,0 +1,128 @@
+import json
+import os
+
+from layers.network_graph import MODULE_TYPE, NetworkGraph
+from utils.design_io import graph_to_doc
+from utils.design_journal import JOURNAL_NAME, DesignJournal
+
+
+def session(tmp_path, **kwargs):
+    graph = NetworkGraph()
+    journal = DesignJournal(str(tmp_path), **kwargs)
+    graph.observer = journal.record
+    journal.flush(graph)  # 첫 flush는 snapshot
+    return graph, journal
+
+
+def edit(graph):
+    a = graph.add_node("Conv2d", {"in_channels": 3, "out_channels": 8}, pos=(0, 0)).uid
+    b = graph.add_node("ReLU", {}, pos=(0, 100)).uid
+    c = graph.add_node("Linear", {"in_features": 8, "out_features": 2}, pos=(0, 200)).uid
+    graph.chain_sequence()
+    graph.set_pos(b, 10, 110)
+    graph.set_pos(b, 20, 120)
+    graph.set_params(a, {"in_channels": 3, "out_channels": 16})
+    graph.connect(a, c)
+    graph.set_input_shape((3, None, None))
+    graph.define_module("Block", [("ReLU", {})])
+    graph.add_node(MODULE_TYPE, {"module": "Block"}, append_to_sequence=False)
+    graph.remove_node(b)
+
+
+def test_recover_after_crash_matches_the_graph(tmp_path):
+    graph, journal = session(tmp_path)
+    edit(graph)
+    journal.flush(graph)
+    # crash: close()/discard() 없이 새 프로세스에서 복구
+    recovered = DesignJournal(str(tmp_path)).recover()
+    assert graph_to_doc(recovered) == graph_to_doc(graph)
+
+
+def test_moves_and_params_are_coalesced(tmp_path):
+    graph, journal = session(tmp_path)
+    uid = graph.add_node("ReLU", {}).uid
+    for i in range(50):
+        graph.set_pos(uid, i, i)
+    assert journal.pending_count() == 2  # add + 마지막 move
+
+
+def test_unflushed_operations_are_lost_but_flushed_ones_survive(tmp_path):
+    graph, journal = session(tmp_path)
+    graph.add_node("ReLU", {})
+    journal.flush(graph)
+    graph.add_node("Linear", {})  # flush 전에 crash
+    recovered = DesignJournal(str(tmp_path)).recover()
+    assert [n.layer_type for n in recovered] == ["ReLU"]
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    graph, journal = session(tmp_path)
+    graph.add_node("ReLU", {})
+    journal.flush(graph)
+    journal.close()
+    with open(os.path.join(str(tmp_path), JOURNAL_NAME), "a", encoding="utf-8") as f:
+        f.write('{"op":"add","uid":9,"ty')
+    recovered = DesignJournal(str(tmp_path)).recover()
+    assert graph_to_doc(recovered) == graph_to_doc(graph)
+
+
+def test_journal_of_an_older_generation_is_not_replayed(tmp_path):
+    graph, journal = session(tmp_path)
+    graph.add_node("ReLU", {})
+    journal.flush(graph)
+    journal.close()
+    # compaction 도중 crash: 새 snapshot은 썼지만 journal은 이전 generation 그대로
+    path = os.path.join(str(tmp_path), JOURNAL_NAME)
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    lines[0] = json.dumps({"op": "begin", "generation": journal.generation - 1})
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    assert len(DesignJournal(str(tmp_path)).recover()) == 0
+
+
+def test_compaction_rolls_the_generation(tmp_path):
+    graph, journal = session(tmp_path, compact_min_bytes=0)
+    first = journal.generation
+    for _ in range(20):
+        graph.add_node("ReLU", {})
+        journal.flush(graph)
+    assert journal.generation > first
+    snapshots = [name for name in os.listdir(str(tmp_path)) if name.startswith("snapshot-")]
+    assert snapshots == [f"snapshot-{journal.generation}.nnd"]
+    assert graph_to_doc(DesignJournal(str(tmp_path)).recover()) == graph_to_doc(graph)
+
+
+def test_clear_forces_a_snapshot(tmp_path):
+    graph, journal = session(tmp_path)
+    graph.add_node("ReLU", {})
+    journal.flush(graph)
+    graph.clear()
+    graph.add_node("Linear", {})
+    assert journal.needs_snapshot()
+    journal.flush(graph)
+    assert graph_to_doc(DesignJournal(str(tmp_path)).recover()) == graph_to_doc(graph)
+
+
+def test_discard_removes_the_session(tmp_path):
+    graph, journal = session(tmp_path)
+    assert journal.has_session()
+    journal.discard()
+    assert not journal.has_session() and DesignJournal(str(tmp_path)).recover() is None
+
+
+def test_connection_order_survives_recovery(tmp_path):
+    graph, journal = session(tmp_path)
+    for layer_type in ("Conv2d", "ReLU", "ReLU", "Identity"):
+        graph.add_node(layer_type, {})
+    graph.connect(1, 2)
+    graph.connect(1, 3)
+    graph.connect(2, 4)
+    graph.connect(3, 4)
+    graph.disconnect(1, 2)
+    graph.connect(1, 2, 0, 0)  # undo 방식의 제자리 복원
+    graph.disconnect(2, 4)
+    graph.connect(2, 4, None, 0)
+    journal.flush(graph)
+    recovered = DesignJournal(str(tmp_path)).recover()
+    assert recovered.node(1).outputs == [2, 3] and recovered.node(4).inputs == [2, 3]
@@ -0,0 +1,118 @@
+import ast
+
+from layers.network_graph import NetworkGraph
+from utils.export_passes import optimize_for_inference
+from utils.export_utils import generate_pytorch_code
+
+
+def build(defs):
+    graph = NetworkGraph()
+    for layer_type, params in defs:
+        graph.add_node(layer_type, params)
+    graph.chain_sequence()
+    return graph
+
+
+def conv(cin, cout, **extra):
+    return "Conv2d", dict({"in_channels": cin, "out_channels": cout, "kernel_size": 3, "padding": 1}, **extra)
+
+
+def chain_types(graph):
+    return [graph.node(uid).layer_type for uid in graph.sequence]
+
+
+def test_dropout_is_bypassed():
+    graph = build([("Linear", {"in_features": 8, "out_features": 8}), ("Dropout", {"p": 0.5}),
+                   ("Linear", {"in_features": 8, "out_features": 4})])
+    optimized, plan = optimize_for_inference(graph)
+    assert plan.dropped == [2]
+    assert 2 not in optimized and optimized.node(1).outputs == [3]
+
+
+def test_dropout_is_kept_when_its_input_already_feeds_the_merge():
+    graph = build([conv(3, 8), ("Dropout", {}), ("ReLU", {})])
+    graph.connect(1, 3)  # l3 입력: [l2, l1] -> Dropout을 빼면 같은 연결이 두 번 필요
+    optimized, plan = optimize_for_inference(graph)
+    assert plan.dropped == []
+    assert optimized.node(3).inputs == [2, 1]
+
+
+def test_dropout_bypass_keeps_the_merge_order():
+    graph = build([conv(3, 8), ("Dropout", {}), conv(8, 8), ("ReLU", {})])
+    graph.disconnect(3, 4)
+    graph.connect(1, 4)
+    graph.connect(3, 4)
+    graph.connect(2, 4, in_index=0)  # l4 입력: [l2, l1, l3]
+    optimized, plan = optimize_for_inference(graph)
+    assert plan.dropped == []  # l1 -> l4가 이미 있으므로 병합 입력 수가 바뀜
+    graph.disconnect(1, 4)
+    optimized, plan = optimize_for_inference(graph)
+    assert plan.dropped == [2]
+    assert optimized.node(4).inputs == [1, 3]
+    assert optimized.node(1).outputs == [3, 4]
+
+
+def test_conv_bn_fold():
+    graph = build([conv(3, 8, bias=False), ("BatchNorm2d", {"num_features": 8, "eps": 1e-3}), ("ReLU", {})])
+    optimized, plan = optimize_for_inference(graph)
+    assert plan.folded == {1: (2, 1e-3)}
+    assert optimized.node(1).params["bias"] is True and optimized.node(1).outputs == [3]
+
+
+def test_bn_is_not_folded_when_conv_output_is_shared_or_mismatched():
+    shared = build([conv(3, 8), ("BatchNorm2d", {"num_features": 8}), ("ReLU", {})])
+    shared.connect(1, 3)
+    assert optimize_for_inference(shared)[1].folded == {}
+    mismatched = build([conv(3, 8), ("BatchNorm2d", {"num_features": 4})])
+    assert optimize_for_inference(mismatched)[1].folded == {}
+
+
+def test_duplicate_activation_is_merged_and_made_inplace():
+    graph = build([conv(3, 8), ("ReLU", {}), ("ReLU", {"inplace": True}), ("LeakyReLU", {})])
+    optimized, plan = optimize_for_inference(graph)
+    assert plan.merged == [3]
+    assert chain_types(optimized) == ["Conv2d", "ReLU", "LeakyReLU"]
+    # LeakyReLU의 입력(ReLU 출력)도 LeakyReLU만 읽으므로 in-place
+    assert sorted(plan.inplace) == [2, 4]
+    assert optimized.node(2).params["inplace"] and optimized.node(4).params["inplace"]
+
+
+def test_different_activation_params_are_not_merged():
+    graph = build([conv(3, 8), ("Hardtanh", {"min_val": -1.0}), ("Hardtanh", {"min_val": 0.0})])
+    assert optimize_for_inference(graph)[1].merged == []
+
+
+def test_inplace_is_not_set_on_the_model_input_views_or_shared_tensors():
+    graph = build([("ReLU", {}), conv(3, 8), ("Flatten", {}), ("ReLU", {}), ("Identity", {})])
+    graph.connect(3, 5)
+    graph.disconnect(4, 5)
+    optimized, plan = optimize_for_inference(graph)
+    assert plan.inplace == []
+    graph = build([conv(3, 8), ("ReLU", {}), ("Identity", {})])
+    graph.connect(1, 3)  # conv 출력을 ReLU 외에도 읽음
+    assert optimize_for_inference(graph)[1].inplace == []
+
+
+def test_original_design_is_untouched():
+    graph = build([conv(3, 8), ("BatchNorm2d", {"num_features": 8}), ("ReLU", {}), ("Dropout", {})])
+    before = graph.contents()
+    optimize_for_inference(graph)
+    assert graph.contents() == before
+
+
+def test_sequence_limits_the_optimised_layers():
+    graph = build([conv(3, 8), ("BatchNorm2d", {"num_features": 8}), ("ReLU", {})])
+    optimized, plan = optimize_for_inference(graph, [1, 2])
+    assert optimized.uids() == [1] and plan.folded == {1: (2, 1e-5)}
+
+
+def test_inference_export_records_the_plan():
+    graph = build([conv(3, 8, bias=False), ("BatchNorm2d", {"num_features": 8}), ("ReLU", {}), ("Dropout", {}),
+                   ("Flatten", {}), ("Linear", {"in_features": 8 * 32 * 32, "out_features": 10})])
+    graph.set_input_shape((3, 32, 32))
+    code = generate_pytorch_code(graph, inference=True)
+    ast.parse(code)
+    assert code.startswith("# Inference export: 1 BatchNorm folded, 1 Dropout removed, 0 activations merged, 1 in-place")
+    assert "TRAINING_KEYS = {'l1': 'b1.0', 'l3': 'b1.1', 'l5': 'b1.2', 'l6': 'b1.3'}" in code
+    assert "FOLDED_BN = {'l1': ('l2', 1e-05)}" in code
+    assert "nn.ReLU(inplace=True)" in code and "nn.Dropout" not in code
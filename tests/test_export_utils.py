@@ -0,0 +1,129 @@
+import ast
+
+import pytest
+
+from data.predefined_model import PREDEFINED_INPUT_SHAPES, PREDEFINED_MODELS
+from layers.network_graph import MODULE_TYPE, NetworkGraph
+from utils.export_utils import generate_pytorch_code, plan_forward, topological_order
+
+
+def build(defs, input_shape=None):
+    graph = NetworkGraph()
+    for d in defs:
+        graph.add_node(d["type"], d.get("params", {}))
+    graph.chain_sequence()
+    graph.set_input_shape(input_shape)
+    return graph
+
+
+def conv(cin, cout):
+    return {"type": "Conv2d", "params": {"in_channels": cin, "out_channels": cout, "kernel_size": 3, "padding": 1}}
+
+
+def forward_lines(code):
+    lines = code.splitlines()
+    start = next(i for i, line in enumerate(lines) if "def forward(self, x):" in line)
+    end = next(i for i in range(start, len(lines)) if lines[i].strip().startswith("return"))
+    return [line.strip() for line in lines[start + 1:end + 1]]
+
+
+def plan(graph, autograd=True):
+    steps, outputs = plan_forward(graph, topological_order(graph, graph.sequence), autograd)
+    return {step.uid: step for step in steps}, outputs
+
+
+@pytest.mark.parametrize("inference", [False, True])
+@pytest.mark.parametrize("name", sorted(PREDEFINED_MODELS))
+def test_predefined_models_generate_valid_python(name, inference):
+    code = generate_pytorch_code(build(PREDEFINED_MODELS[name], PREDEFINED_INPUT_SHAPES[name]), inference=inference)
+    ast.parse(code)
+    shape = ", ".join(str(d) for d in PREDEFINED_INPUT_SHAPES[name])
+    assert f"torch.randn({1 if inference else 2}, {shape})" in code
+
+
+def test_chain_reuses_a_single_name():
+    graph = build([conv(3, 8), {"type": "ReLU"}, conv(8, 8), {"type": "ReLU"}])
+    assert forward_lines(generate_pytorch_code(graph)) == [
+        "x = self.l1(x)", "x = self.l2(x)", "x = self.l3(x)", "x = self.l4(x)", "return x"]
+
+
+def test_skip_connection_keeps_the_input_alive_until_the_merge():
+    graph = build([conv(3, 8), conv(8, 8), {"type": "BatchNorm2d", "params": {"num_features": 8}}, {"type": "ReLU"}])
+    graph.connect(1, 4)  # l1 출력이 l4에서 합쳐짐
+    assert forward_lines(generate_pytorch_code(graph)) == [
+        "x = self.l1(x)", "x1 = self.l2(x)", "x1 = self.l3(x1)",
+        "x1 = self.l4(x1 + x)  # merge: elementwise add", "del x", "return x1"]
+
+
+def test_inplace_rules_in_training():
+    graph = build([conv(3, 8), {"type": "ReLU"}, {"type": "Flatten"}, {"type": "ReLU"},
+                   {"type": "ResidualBlock", "params": {"in_channels": 8, "out_channels": 8}}])
+    resid = graph.add_node("ReLU", {}, append_to_sequence=False).uid
+    graph.set_sequence([1, 2, 5, resid, 3, 4])
+    graph.chain_sequence()
+    steps, _ = plan(graph)
+    assert steps[2].inplace_ok             # Conv2d 출력: backward에 안 쓰임
+    assert not steps[resid].inplace_ok     # ResidualBlock 끝의 ReLU 출력은 backward에 쓰임
+    assert not steps[4].inplace_ok         # Flatten 출력은 입력의 view
+    steps, _ = plan(graph, autograd=False)
+    assert steps[resid].inplace_ok and not steps[4].inplace_ok
+
+
+def test_no_inplace_on_the_model_input_or_a_live_tensor():
+    graph = build([{"type": "ReLU"}, conv(3, 8), {"type": "ReLU"}, {"type": "ReLU"}])
+    graph.connect(2, 4)  # l2 출력을 l3, l4가 모두 읽음
+    steps, _ = plan(graph, autograd=False)
+    assert not steps[1].inplace_ok  # 호출 측 입력
+    assert not steps[3].inplace_ok  # l4가 아직 l2 출력을 읽음
+    assert steps[4].inplace_ok       # 합은 새 텐서
+    code = generate_pytorch_code(graph)
+    assert "self.l1 = nn.ReLU()" in code and "self.l3 = nn.ReLU()" in code
+
+
+def test_user_inplace_is_cleared_when_unsafe():
+    graph = build([{"type": "ReLU", "params": {"inplace": True}}, conv(3, 8)])
+    assert "self.l1 = nn.ReLU(inplace=False)" in generate_pytorch_code(graph)
+
+
+def test_several_outputs_are_returned_together():
+    graph = build([conv(3, 8), {"type": "ReLU"}, {"type": "Identity"}])
+    graph.disconnect(2, 3)
+    graph.connect(1, 3)
+    code = generate_pytorch_code(graph)
+    assert forward_lines(code)[-1] in ("return x1, x", "return x, x1")
+    assert "print([t.shape for t in y])" in code
+
+
+def test_cycle_is_rejected():
+    graph = build([{"type": "ReLU"}, {"type": "ReLU"}])
+    graph.connect(2, 1)
+    with pytest.raises(ValueError):
+        generate_pytorch_code(graph)
+
+
+def test_empty_design_is_rejected():
+    with pytest.raises(ValueError):
+        generate_pytorch_code(NetworkGraph())
+
+
+def test_module_definition_is_emitted_once_with_override_arguments():
+    graph = NetworkGraph()
+    graph.define_module("Block", [("Conv2d", {"in_channels": 8, "out_channels": 8, "kernel_size": 3}),
+                                  ("ReLU", {})])
+    graph.add_node(MODULE_TYPE, {"module": "Block"})
+    graph.add_node(MODULE_TYPE, {"module": "Block", "overrides": {"0": {"kernel_size": 1}}})
+    graph.chain_sequence()
+    graph.set_input_shape((8, 16, 16))
+    code = generate_pytorch_code(graph)
+    ast.parse(code)
+    assert code.count("class Block(nn.Sequential):") == 1
+    assert "def __init__(self, l0_kernel_size=3):" in code
+    assert "self.l1 = Block()" in code and "self.l2 = Block(l0_kernel_size=1)" in code
+
+
+def test_reserved_module_names_are_rejected():
+    graph = NetworkGraph()
+    graph.define_module("Net", [("ReLU", {})])
+    graph.add_node(MODULE_TYPE, {"module": "Net"})
+    with pytest.raises(ValueError):
+        generate_pytorch_code(graph)
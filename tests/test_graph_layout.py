@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from data.predefined_model import PREDEFINED_MODELS
+from layers.network_graph import NetworkGraph
+from utils.graph_layout import X_GAP, Y_GAP, _crossings, _isotonic, layered_layout, layout_snapshot
+
+
+def rows(layout):
+    out = {}
+    for uid, (x, y) in layout.items():
+        out.setdefault(y, []).append(x)
+    return out
+
+
+def test_chain_is_a_single_column():
+    layout = layered_layout([1, 2, 3, 4], [(1, 2), (2, 3), (3, 4)], start_x=50.0, start_y=50.0)
+    assert layout == {uid: (50.0, 50.0 + i * Y_GAP) for i, uid in enumerate([1, 2, 3, 4])}
+
+
+def test_ranks_increase_along_edges_and_skips_do_not_overlap():
+    edges = [(1, 2), (2, 3), (3, 4), (1, 4), (2, 5), (5, 4)]
+    layout = layered_layout([1, 2, 3, 4, 5], edges)
+    for src, tgt in edges:
+        assert layout[tgt][1] > layout[src][1]
+    assert layout[3][1] == layout[5][1] and abs(layout[3][0] - layout[5][0]) >= X_GAP - 1e-9
+
+
+def test_isolated_layers_are_stacked_below_in_sequence_order():
+    layout = layered_layout([7, 1, 2, 9, 3], [(1, 2), (2, 3)])
+    bottom = layout[3][1]
+    assert layout[7][1] == bottom + Y_GAP and layout[9][1] == bottom + 2 * Y_GAP
+
+
+def test_cycles_are_laid_out():
+    layout = layered_layout([1, 2, 3], [(1, 2), (2, 3), (3, 1), (2, 2)])
+    assert sorted(y for _, y in layout.values()) == [50.0, 50.0 + Y_GAP, 50.0 + 2 * Y_GAP]
+
+
+def test_crossings_count_inversions():
+    succ = {0: [3], 1: [2], 2: [], 3: []}
+    pos = {0: 0, 1: 1, 2: 0, 3: 1}
+    assert _crossings([0, 1], [2, 3], succ, pos) == 1
+    pos = {0: 0, 1: 1, 2: 1, 3: 0}
+    assert _crossings([0, 1], [3, 2], succ, pos) == 0
+    succ = {0: [2, 3], 1: [2, 3], 2: [], 3: []}
+    pos = {0: 0, 1: 1, 2: 0, 3: 1}
+    assert _crossings([0, 1], [2, 3], succ, pos) == 1
+
+
+def test_isotonic_keeps_order_and_minimum_gap():
+    x = _isotonic([0.0, 0.0, 0.0, 5.0], [1.0, 1.0, 1.0, 1.0])
+    assert x == [-1.0, 0.0, 1.0, 5.0]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_dags_keep_a_minimum_gap_within_each_rank(seed):
+    rng = random.Random(seed)
+    uids = list(range(1, 41))
+    edges = {(rng.choice(uids[:i]), uid) for i, uid in enumerate(uids) if i for _ in range(rng.randint(0, 2))}
+    layout = layered_layout(uids, sorted(edges))
+    assert set(layout) == set(uids)
+    for src, tgt in edges:
+        assert layout[tgt][1] > layout[src][1]
+    for xs in rows(layout).values():
+        xs.sort()
+        assert all(b - a >= X_GAP - 1e-6 for a, b in zip(xs, xs[1:]))
+    assert min(x for x, _ in layout.values()) == 50.0
+
+
+def test_snapshot_puts_the_sequence_first():
+    graph = NetworkGraph()
+    for d in PREDEFINED_MODELS["GoogLeNet"]:
+        graph.add_node(d["type"], d.get("params", {}))
+    graph.chain_sequence()
+    graph.add_node("ReLU", {}, append_to_sequence=False)
+    version, uids, edges = layout_snapshot(graph)
+    assert version == graph.version and uids == graph.sequence + [len(graph)]
+    layout = layered_layout(uids, edges)
+    assert [layout[uid][0] for uid in graph.sequence] == [50.0] * len(graph.sequence)
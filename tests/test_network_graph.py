@@ -0,0 +1,148 @@
+import pytest
+
+from layers.network_graph import MODULE_TYPE, NetworkGraph
+
+
+def chain(*types):
+    graph = NetworkGraph()
+    for layer_type in types:
+        graph.add_node(layer_type, {})
+    graph.chain_sequence()
+    return graph
+
+
+def test_uid_index_after_swap_remove():
+    graph = chain("Conv2d", "ReLU", "Linear", "ReLU")
+    graph.remove_node(2)
+    # 마지막 노드가 빈 자리로 옮겨져도 uid -> index가 맞아야 함
+    assert sorted(graph.uids()) == [1, 3, 4]
+    for uid in graph.uids():
+        assert graph.node(uid).uid == uid
+        assert graph.uids()[graph.index_of(uid)] == uid
+    assert 2 not in graph and graph.get(2) is None
+    with pytest.raises(KeyError):
+        graph.node(2)
+    assert graph.sequence == [1, 3, 4]
+
+
+def test_remove_node_drops_its_connections():
+    graph = chain("Conv2d", "ReLU", "Linear")
+    graph.remove_node(2)
+    assert list(graph.edges()) == []
+    assert graph.node(1).outputs == [] and graph.node(3).inputs == []
+
+
+def test_uids_are_never_reused():
+    graph = chain("ReLU", "ReLU")
+    graph.remove_node(2)
+    graph.clear()
+    assert graph.add_node("ReLU").uid == 3
+    with pytest.raises(ValueError):
+        graph.add_node("ReLU", uid=3)
+
+
+def test_connect_is_idempotent_and_keeps_positions():
+    graph = chain("Conv2d", "ReLU")
+    version = graph.version
+    graph.connect(1, 2)
+    assert graph.version == version and graph.node(1).outputs == [2]
+    graph.add_node("Linear", {})
+    graph.connect(3, 2, in_index=0)
+    assert graph.node(2).inputs == [3, 1]
+
+
+def test_is_chained():
+    graph = chain("Conv2d", "ReLU", "Linear")
+    assert graph.is_chained()
+    graph.connect(1, 3)  # skip 연결
+    assert not graph.is_chained()
+    graph.disconnect(1, 3)
+    graph.set_sequence([1, 3, 2])
+    assert not graph.is_chained()
+    graph.chain_sequence()
+    assert graph.is_chained()
+    assert sorted(graph.edges()) == [(1, 3), (3, 2)]
+
+
+def test_is_chained_counts_edges_outside_the_sequence():
+    graph = chain("Conv2d", "ReLU")
+    extra = graph.add_node("Linear", {}, append_to_sequence=False).uid
+    graph.connect(2, extra)
+    assert not graph.is_chained()
+
+
+def test_chain_sequence_only_records_changed_edges():
+    graph = chain("A", "B", "C", "D")
+    ops = []
+    graph.observer = lambda op, fields: ops.append((op, fields.get("src"), fields.get("tgt")))
+    graph.set_sequence([1, 2, 4, 3])
+    graph.chain_sequence()
+    assert sorted(ops[1:]) == [("connect", 2, 4), ("connect", 4, 3),
+                               ("disconnect", 2, 3), ("disconnect", 3, 4)]
+
+
+def test_link_into_sequence_splices_between_neighbours():
+    graph = chain("Conv2d", "ReLU", "Linear")
+    uid = graph.add_node("Dropout", {}, append_to_sequence=False).uid
+    graph.set_sequence([1, 2, uid, 3])
+    graph.link_into_sequence(uid)
+    assert graph.is_chained()
+
+
+def test_link_into_sequence_at_the_ends():
+    graph = chain("Conv2d", "ReLU")
+    head = graph.add_node("Identity", {}, append_to_sequence=False).uid
+    graph.set_sequence([head, 1, 2])
+    graph.link_into_sequence(head)
+    tail = graph.add_node("Linear", {}).uid
+    graph.link_into_sequence(tail)
+    assert graph.is_chained()
+
+
+def test_link_into_sequence_keeps_branches():
+    graph = chain("Conv2d", "ReLU", "Linear")
+    graph.disconnect(2, 3)
+    graph.connect(1, 3)  # 1 -> 2, 1 -> 3 (branch)
+    uid = graph.add_node("Dropout", {}, append_to_sequence=False).uid
+    graph.set_sequence([1, 2, uid, 3])
+    graph.link_into_sequence(uid)
+    # 2 -> 3 연결이 없었으므로 앞 레이어(2)에만 붙음
+    assert sorted(graph.edges()) == [(1, 2), (1, 3), (2, uid)]
+
+
+def test_copy_is_independent():
+    graph = chain("Conv2d", "ReLU")
+    graph.set_input_shape((3, 32, 32))
+    snapshot = graph.copy()
+    graph.remove_node(2)
+    assert snapshot.uids() == [1, 2] and list(snapshot.edges()) == [(1, 2)]
+    assert snapshot.input_shape == (3, 32, 32)
+
+
+def test_take_from_moves_contents():
+    source = chain("Conv2d", "ReLU")
+    target = NetworkGraph()
+    target.take_from(source)
+    assert target.sequence == [1, 2] and list(target.edges()) == [(1, 2)]
+    assert len(source) == 0 and target.add_node("ReLU").uid == 3
+
+
+def test_define_module_validates_before_changing_anything():
+    graph = NetworkGraph()
+    version = graph.version
+    for name, layers in (("1bad", [("ReLU", {})]), ("Block", []), ("Block", [(MODULE_TYPE, {})])):
+        with pytest.raises(ValueError):
+            graph.define_module(name, layers)
+    assert graph.version == version and graph.modules == {}
+
+
+def test_module_instances_share_the_definition():
+    graph = NetworkGraph()
+    graph.define_module("Block", [("Conv2d", {"out_channels": 8}), ("ReLU", {})])
+    a = graph.add_node(MODULE_TYPE, {"module": "Block"})
+    b = graph.add_node(MODULE_TYPE, {"module": "Block", "overrides": {"0": {"out_channels": 16}}})
+    assert graph.instances("Block") == [a.uid, b.uid]
+    assert graph.module_layers(b)[0] == ("Conv2d", {"out_channels": 16})
+    graph.define_module("Block", [("Conv2d", {"out_channels": 4}), ("ReLU", {})])
+    assert graph.module_layers(a)[0] == ("Conv2d", {"out_channels": 4})
+    assert graph.module_layers(b)[0] == ("Conv2d", {"out_channels": 16})
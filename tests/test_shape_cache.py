@@ -0,0 +1,73 @@
+from data.predefined_model import PREDEFINED_MODELS
+from layers.network_graph import NetworkGraph
+from utils.shape_inference import ShapeCache, infer_shapes
+
+
+def build(defs, input_shape):
+    graph = NetworkGraph()
+    for d in defs:
+        graph.add_node(d["type"], d.get("params", {}))
+    graph.chain_sequence()
+    graph.set_input_shape(input_shape)
+    return graph
+
+
+def same_as_full_pass(cache):
+    expected = infer_shapes(cache.graph)
+    got = cache.report()
+    return [(ls.uid, ls.in_shape, ls.out_shape, ls.error) for ls in got.layers] == \
+        [(ls.uid, ls.in_shape, ls.out_shape, ls.error) for ls in expected.layers]
+
+
+def test_first_update_is_a_full_pass():
+    graph = build(PREDEFINED_MODELS["VGG16"], (3, 224, 224))
+    cache = ShapeCache(graph)
+    cache.update()
+    assert cache.last_full and cache.last_evaluated == len(graph)
+    assert same_as_full_pass(cache)
+
+
+def test_param_edit_with_same_output_stops_early():
+    graph = build(PREDEFINED_MODELS["VGG16"], (3, 224, 224))
+    cache = ShapeCache(graph)
+    cache.update()
+    # 출력 shape가 그대로인 편집 (bias 추가): 그 레이어만 다시 계산
+    graph.set_params(3, dict(graph.node(3).params, bias=False))
+    cache.invalidate(3)
+    changed = cache.update()
+    assert not cache.last_full and cache.last_evaluated_uids == [3]
+    assert changed == []
+    assert same_as_full_pass(cache)
+
+
+def test_param_edit_propagates_downstream_until_shapes_settle():
+    graph = build(PREDEFINED_MODELS["LeNet-5"], (1, 28, 28))
+    cache = ShapeCache(graph)
+    cache.update()
+    graph.set_params(4, dict(graph.node(4).params, out_channels=8))  # 두 번째 Conv2d
+    cache.invalidate(4)
+    changed = cache.update()
+    # Conv -> ReLU -> AvgPool -> Flatten -> Linear(오류)까지, 그 뒤 Linear 출력은 그대로라 멈춤
+    assert cache.last_evaluated_uids == [4, 5, 6, 7, 8]
+    assert [ls.uid for ls in changed] == [4, 5, 6, 7, 8]
+    assert cache.results[8].error
+    assert same_as_full_pass(cache)
+
+
+def test_structure_or_input_change_recomputes_everything():
+    graph = build(PREDEFINED_MODELS["LeNet-5"], (1, 28, 28))
+    cache = ShapeCache(graph)
+    cache.update()
+    graph.set_input_shape((1, 32, 32))
+    cache.update()
+    assert cache.last_full and same_as_full_pass(cache)
+    graph.remove_node(12)
+    cache.update()
+    assert cache.last_full and 12 not in cache.results and same_as_full_pass(cache)
+
+
+def test_nothing_dirty_evaluates_nothing():
+    graph = build(PREDEFINED_MODELS["LeNet-5"], (1, 28, 28))
+    cache = ShapeCache(graph)
+    cache.update()
+    assert cache.update() == [] and cache.last_evaluated == 0
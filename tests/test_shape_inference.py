@@ -0,0 +1,98 @@
+import pytest
+
+from data.predefined_model import PREDEFINED_INPUT_SHAPES, PREDEFINED_MODELS
+from layers.network_graph import MODULE_TYPE, NetworkGraph
+from utils.shape_inference import (default_input_shape, format_shape, infer_layer_shape, infer_shapes, parse_shape,
+                                   runnable_input_shape)
+from utils.validate_network import validate_network
+
+
+def build(defs, input_shape=None):
+    graph = NetworkGraph()
+    for d in defs:
+        graph.add_node(d["type"], d.get("params", {}))
+    graph.chain_sequence()
+    graph.set_input_shape(input_shape)
+    return graph
+
+
+def test_parse_and_format_shape():
+    assert parse_shape("3,224,224") == (3, 224, 224)
+    assert parse_shape("(3, ?, ?)") == (3, None, None)
+    assert parse_shape("3x32x32") == (3, 32, 32)
+    assert parse_shape("  ") is None
+    assert format_shape((3, None, 7)) == "(N, 3, ?, 7)"
+
+
+@pytest.mark.parametrize("name", sorted(PREDEFINED_MODELS))
+def test_predefined_models_check_out_at_their_input_size(name):
+    report = infer_shapes(build(PREDEFINED_MODELS[name], PREDEFINED_INPUT_SHAPES[name]))
+    assert report.ok, report.errors
+    assert report.output_shape[-1] == PREDEFINED_MODELS[name][-1]["params"]["out_features"]
+
+
+def test_conv_pool_flatten_linear_shapes():
+    graph = build(PREDEFINED_MODELS["LeNet-5"], (1, 28, 28))
+    shapes = [ls.out_shape for ls in infer_shapes(graph).layers]
+    assert shapes[:7] == [(6, 24, 24), (6, 24, 24), (6, 12, 12), (16, 8, 8), (16, 8, 8), (16, 4, 4), (256,)]
+
+
+def test_mismatch_is_reported_on_the_right_layer():
+    graph = build(PREDEFINED_MODELS["LeNet-5"], (1, 32, 32))
+    errors = infer_shapes(graph).errors
+    assert [uid for uid, _ in errors] == [8]  # 첫 Linear (16*5*5 != 256)
+    ok, message = validate_network(graph)
+    assert not ok and "Layer#8" in message
+
+
+def test_linear_after_conv_needs_flatten():
+    _, err = infer_layer_shape("Linear", {"in_features": 10, "out_features": 2}, (3, 4, 4))
+    assert "Flatten" in err
+
+
+def test_unknown_dims_propagate_without_errors():
+    graph = build(PREDEFINED_MODELS["LeNet-5"])
+    assert default_input_shape(graph) == (1, None, None)
+    report = infer_shapes(graph)
+    assert report.ok  # H/W unknown -> Flatten 크기 unknown -> Linear 비교 안 함
+    assert report.layers[6].out_shape == (None,)
+
+
+def test_merge_inputs_must_agree():
+    graph = build([{"type": "Conv2d", "params": {"in_channels": 3, "out_channels": 8, "kernel_size": 3}},
+                   {"type": "Conv2d", "params": {"in_channels": 8, "out_channels": 8, "kernel_size": 3}},
+                   {"type": "ReLU"}], (3, 16, 16))
+    graph.connect(1, 3)  # (8, 14, 14) + (8, 12, 12)
+    report = infer_shapes(graph)
+    assert [uid for uid, _ in report.errors] == [3]
+    graph.set_params(2, dict(graph.node(2).params, padding=1))
+    assert infer_shapes(graph).ok
+
+
+def test_module_instance_runs_through_its_definition():
+    graph = NetworkGraph()
+    graph.define_module("Block", [("Conv2d", {"in_channels": 3, "out_channels": 8, "kernel_size": 3}),
+                                  ("ReLU", {})])
+    graph.add_node(MODULE_TYPE, {"module": "Block", "overrides": {"0": {"out_channels": 4}}})
+    graph.set_input_shape((3, 10, 10))
+    assert infer_shapes(graph).output_shape == (4, 8, 8)
+
+
+def test_runnable_input_shape_keeps_a_full_shape():
+    graph = build(PREDEFINED_MODELS["LeNet-5"], (1, 28, 28))
+    assert runnable_input_shape(graph) == ((1, 28, 28), False)
+
+
+@pytest.mark.parametrize("name", ["LeNet-5", "AlexNet"])
+def test_runnable_input_shape_guesses_a_consistent_size(name):
+    shape, guessed = runnable_input_shape(build(PREDEFINED_MODELS[name]))
+    assert guessed and shape == PREDEFINED_INPUT_SHAPES[name]
+
+
+def test_runnable_input_shape_rejects_what_it_cannot_guess():
+    with pytest.raises(ValueError):
+        runnable_input_shape(build([{"type": "ReLU"}]))
+    bad = build([{"type": "Conv2d", "params": {"in_channels": 3, "out_channels": 4, "kernel_size": 3}},
+                 {"type": "Flatten"}, {"type": "Linear", "params": {"in_features": 7, "out_features": 2}}])
+    with pytest.raises(ValueError):
+        runnable_input_shape(bad)
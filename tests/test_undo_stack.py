@@ -0,0 +1,153 @@
+import random
+
+from layers.network_graph import NetworkGraph
+from utils.design_io import graph_to_doc
+from utils.undo_stack import UndoStack
+
+
+def state(graph):
+    """저장 내용 (swap-remove로 바뀌는 노드 배열 순서는 제외)"""
+    doc = graph_to_doc(graph)
+    doc["layers"].sort(key=lambda layer: layer["uid"])
+    return doc
+
+
+def setup():
+    graph = NetworkGraph()
+    stack = UndoStack()
+    graph.observer = stack.record
+    return graph, stack
+
+
+def command(stack, fn, *args):
+    stack.begin()
+    fn(*args)
+    stack.end()
+
+
+def test_each_kind_of_edit_undoes_and_redoes():
+    graph, stack = setup()
+    edits = [
+        lambda: [graph.add_node(t, {"k": i}, pos=(0, 100 * i)) for i, t in enumerate(("Conv2d", "ReLU", "Linear"))],
+        graph.chain_sequence,
+        lambda: graph.set_pos(2, 40, 140),
+        lambda: graph.set_params(1, {"k": 9}),
+        lambda: graph.connect(1, 3, 0, 0),
+        lambda: graph.set_sequence([1, 3, 2]),
+        lambda: graph.set_input_shape((3, 8, 8)),
+        lambda: graph.define_module("Block", [("ReLU", {})]),
+        lambda: graph.remove_node(2),
+        graph.clear_connections,
+        graph.clear,
+    ]
+    states = [state(graph)]
+    for edit in edits:
+        command(stack, edit)
+        states.append(state(graph))
+    for expected in reversed(states[:-1]):
+        assert stack.undo(graph) is not None
+        assert state(graph) == expected
+    assert stack.undo(graph) is None
+    for expected in states[1:]:
+        assert stack.redo(graph) is not None
+        assert state(graph) == expected
+    assert stack.redo(graph) is None
+
+
+def test_redo_restores_connection_positions():
+    graph, stack = setup()
+    for t in ("Conv2d", "ReLU", "ReLU", "Identity"):
+        graph.add_node(t, {})
+    for src, tgt in ((1, 2), (1, 3), (2, 4), (3, 4)):
+        graph.connect(src, tgt)
+    stack.end()
+    uid = graph.add_node("Dropout", {}, append_to_sequence=False).uid
+    graph.set_sequence([1, 2, uid, 3, 4])
+    command(stack, graph.link_into_sequence, uid)  # 2 -> uid 만 (2 -> 3 연결 없음)
+    command(stack, lambda: (graph.disconnect(1, 2), graph.connect(1, 2, 0, 0)))
+    after = state(graph), graph.node(4).inputs
+    stack.undo(graph)
+    stack.undo(graph)
+    stack.redo(graph)
+    stack.redo(graph)
+    assert (state(graph), graph.node(4).inputs) == after
+
+
+def test_random_edits_round_trip():
+    rng = random.Random(7)
+    graph, stack = setup()
+    states = [state(graph)]
+    for _ in range(200):
+        stack.begin()
+        uids = graph.uids()
+        choice = rng.randrange(6) if uids else 0
+        if choice == 0:
+            graph.add_node("ReLU", {"n": rng.randrange(5)}, pos=(rng.randrange(500), rng.randrange(500)))
+        elif choice == 1:
+            graph.remove_node(rng.choice(uids))
+        elif choice == 2:
+            graph.set_pos(rng.choice(uids), rng.randrange(500), rng.randrange(500))
+        elif choice == 3:
+            graph.connect(rng.choice(uids), rng.choice(uids))
+        elif choice == 4:
+            seq = list(graph.sequence)
+            rng.shuffle(seq)
+            graph.set_sequence(seq)
+        else:
+            graph.chain_sequence()
+        if stack.end(merge_moves=False) is not None:
+            states.append(state(graph))
+    for expected in reversed(states[:-1]):
+        stack.undo(graph)
+        assert state(graph) == expected
+    for expected in states[1:]:
+        stack.redo(graph)
+        assert state(graph) == expected
+
+
+def test_moves_of_the_same_layers_merge():
+    graph, stack = setup()
+    command(stack, graph.add_node, "ReLU")
+    for i in range(10):
+        command(stack, graph.set_pos, 1, i, i)
+    assert len(stack.commands) == 2 and len(stack.commands[1]) == 1
+    stack.undo(graph)
+    assert (graph.node(1).x, graph.node(1).y) == (0.0, 0.0)
+
+
+def test_sequence_delta_is_local():
+    graph, stack = setup()
+    command(stack, lambda: [graph.add_node("ReLU") for _ in range(1000)])
+    seq = list(graph.sequence)
+    seq.insert(500, seq.pop(501))
+    command(stack, graph.set_sequence, seq)
+    (op, fields), = stack.commands[-1].ops
+    assert op == "sequence" and len(fields["old"]) + len(fields["new"]) == 4
+
+
+def test_new_edit_drops_redo_history():
+    graph, stack = setup()
+    command(stack, graph.add_node, "ReLU")
+    command(stack, graph.add_node, "Linear")
+    stack.undo(graph)
+    command(stack, graph.add_node, "Conv2d")
+    assert not stack.can_redo() and [n.layer_type for n in graph] == ["ReLU", "Conv2d"]
+
+
+def test_memory_limit_drops_oldest_commands():
+    graph, stack = setup()
+    stack.set_memory_limit(2000)
+    for i in range(50):
+        command(stack, graph.add_node, "ReLU", {"i": i})
+    assert stack.total_bytes <= 2000 < 50 * 200
+    assert stack.total_bytes == sum(c.nbytes for c in stack.commands)
+    while stack.undo(graph) is not None:
+        pass
+    assert 0 < len(graph) < 50  # 버린 명령의 레이어는 남음
+
+
+def test_undo_is_not_recorded():
+    graph, stack = setup()
+    command(stack, graph.add_node, "ReLU")
+    stack.undo(graph)
+    assert not stack.is_open() and stack.can_redo()
@@ -0,0 +1,117 @@
+import pytest
+
+from layers.network_graph import MODULE_TYPE, ModuleDefinition, NetworkGraph, instance_params
+from utils.design_io import graph_to_doc, load_design, save_design
+from utils.export_utils import module_arguments
+from utils.shape_inference import infer_shapes
+from utils.undo_stack import UndoStack
+
+BLOCK = [("Conv2d", {"in_channels": 8, "out_channels": 8, "kernel_size": 3, "padding": 1}),
+         ("BatchNorm2d", {"num_features": 8, "eps": 1e-5}), ("ReLU", {})]
+
+
+def build(*overrides):
+    graph = NetworkGraph()
+    graph.define_module("Block", BLOCK)
+    graph.add_node("Conv2d", {"in_channels": 3, "out_channels": 8, "kernel_size": 1})
+    for diff in overrides:
+        graph.add_node(MODULE_TYPE, instance_params("Block", diff))
+    graph.chain_sequence()
+    graph.set_input_shape((3, 16, 16))
+    return graph
+
+
+def test_resolve_applies_only_known_overrides():
+    definition = ModuleDefinition("Block", BLOCK)
+    layers = definition.resolve({"0": {"kernel_size": 1, "unknown": 5}, "7": {"x": 1}})
+    assert layers[0][1]["kernel_size"] == 1 and "unknown" not in layers[0][1]
+    assert layers[1:] == list(definition.layers[1:])
+    assert definition.layers[0][1]["kernel_size"] == 3  # 공유 정의는 그대로
+
+
+def test_overrides_for_is_the_inverse_of_resolve():
+    definition = ModuleDefinition("Block", BLOCK)
+    overrides = {"0": {"kernel_size": 1, "padding": 0}, "1": {"eps": 0.1}}
+    assert definition.overrides_for(definition.resolve(overrides)) == overrides
+    assert definition.overrides_for(definition.layers) == {}
+    with pytest.raises(ValueError):
+        definition.overrides_for(definition.resolve(overrides) + [("ReLU", {})])  # 레이어 수
+
+
+@pytest.mark.parametrize("layers", [
+    [("Linear", {})] + BLOCK[1:],                          # 타입이 다름
+    [(BLOCK[0][0], dict(BLOCK[0][1], dilation=2))] + BLOCK[1:],  # 정의에 없는 키
+])
+def test_overrides_for_rejects_structural_changes(layers):
+    with pytest.raises(ValueError):
+        ModuleDefinition("Block", BLOCK).overrides_for(layers)
+
+
+@pytest.mark.parametrize("name, layers", [
+    ("2nd", BLOCK), ("class", BLOCK), ("Empty", []), ("Nested", [(MODULE_TYPE, {"module": "Block"})]),
+])
+def test_invalid_definitions_leave_the_graph_unchanged(name, layers):
+    graph = build({})
+    version = graph.version
+    with pytest.raises(ValueError):
+        graph.define_module(name, layers)
+    assert graph.version == version and list(graph.modules) == ["Block"]
+
+
+def test_redefinition_reaches_every_instance():
+    graph = build({}, {"0": {"kernel_size": 1, "padding": 0}})
+    assert graph.instances("Block") == [2, 3]
+    assert infer_shapes(graph).output_shape == (8, 16, 16)
+    graph.define_module("Block", [(BLOCK[0][0], dict(BLOCK[0][1], out_channels=4, stride=2))])
+    # 두 번째 instance의 in_channels는 첫 instance 출력(4)과 맞지 않음
+    report = infer_shapes(graph)
+    assert [uid for uid, _ in report.errors] == [3]
+    # 정의에서 사라진 레이어의 override는 무시되고 남은 키는 유지
+    assert graph.module_layers(graph.node(3))[0][1]["kernel_size"] == 1
+    graph.define_module("Block", BLOCK)
+    assert infer_shapes(graph).ok
+
+
+def test_definition_undo_and_redo():
+    graph = build({})
+    stack = UndoStack()
+    graph.observer = stack.record
+    stack.begin()
+    graph.define_module("Block", [("ReLU", {})])
+    graph.define_module("Other", [("ReLU", {})])
+    stack.end()
+    stack.begin()
+    graph.define_module("Other", None)
+    stack.end()
+    assert sorted(graph.modules) == ["Block"]
+    stack.undo(graph)
+    stack.undo(graph)
+    assert sorted(graph.modules) == ["Block"] and graph.modules["Block"].layers == ModuleDefinition("B", BLOCK).layers
+    stack.redo(graph)
+    assert sorted(graph.modules) == ["Block", "Other"] and len(graph.modules["Block"]) == 1
+
+
+@pytest.mark.parametrize("filename", ["design.json", "design.nnd"])
+def test_modules_round_trip(tmp_path, filename):
+    graph = build({}, {"0": {"kernel_size": 1}, "1": {"eps": 0.001}})
+    graph.define_module("Unused", [("Dropout", {"p": 0.2})])
+    path = str(tmp_path / filename)
+    save_design(graph, path)
+    loaded = load_design(path)
+    assert graph_to_doc(loaded) == graph_to_doc(graph)
+    assert loaded.modules["Block"].layers == graph.modules["Block"].layers
+    assert loaded.module_layers(loaded.node(3)) == graph.module_layers(graph.node(3))
+
+
+def test_module_arguments_cover_every_overridden_key():
+    graph = build({"0": {"kernel_size": 1}}, {}, {"0": {"padding": 0}, "1": {"eps": 0.1}, "9": {"x": 1}})
+    assert module_arguments(graph, graph.sequence) == {
+        "Block": {(0, "kernel_size"): "l0_kernel_size", (0, "padding"): "l0_padding", (1, "eps"): "l1_eps"}}
+    assert module_arguments(graph, [1, 3]) == {"Block": {}}
+
+
+def test_module_arguments_reject_missing_definitions():
+    graph = build({})
+    graph.define_module("Block", None)
+    with pytest.raises(ValueError):
+        module_arguments(graph, graph.sequence)
@@ -1,14 +1,136 @@
+import math
 from PyQt5 import QtWidgets, QtGui, QtCore
 
 class CanvasView(QtWidgets.QGraphicsView):
+    MIN_SCENE_RECT = QtCore.QRectF(0, 0, 1600, 1000)  # 빈 캔버스일 때 기본 크기
+    SCENE_MARGIN = 400          # items 영역 바깥으로 남겨둘 여백
+    LARGE_SCENE_ITEMS = 2000    # 이 이상이면 대형 scene 용 viewport 업데이트 모드 사용
+    MIN_ZOOM, MAX_ZOOM = 0.02, 8.0
+    ZOOM_STEP = 1.15
+
     def __init__(self, scene, parent_window):
         super().__init__(scene)
         self.parent_window = parent_window
         self.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
         self.setAcceptDrops(True)
-        self.setSceneRect(0, 0, 1600, 1000)
         self.setDragMode(QtWidgets.QGraphicsView.RubberBandDrag)
+        self.setTransformationAnchor(QtWidgets.QGraphicsView.AnchorUnderMouse)
+        self.setResizeAnchor(QtWidgets.QGraphicsView.AnchorViewCenter)
+        self.setCacheMode(QtWidgets.QGraphicsView.CacheBackground)
+
+        # scene 크기는 items 영역에 맞춰 늘어남 (update_scene_bounds)
+        scene.setItemIndexMethod(QtWidgets.QGraphicsScene.BspTreeIndex)
+        scene.setSceneRect(self.MIN_SCENE_RECT)
+        self._pan_start = None
+        self.tune_for_item_count(0)
+
+    # ---------------- Scene bounds / index tuning ----------------
+    def update_scene_bounds(self):
+        """scene rect를 items의 bounding 영역(+여백)에 맞춤 (기본 크기보다 작아지지는 않음)"""
+        scene = self.scene()
+        rect = scene.itemsBoundingRect().adjusted(-self.SCENE_MARGIN, -self.SCENE_MARGIN,
+                                                  self.SCENE_MARGIN, self.SCENE_MARGIN)
+        rect = rect.united(self.MIN_SCENE_RECT)
+        if rect != scene.sceneRect():
+            scene.setSceneRect(rect)
+
+    def tune_for_item_count(self, count):
+        """item 수에 맞춰 BSP 깊이와 viewport 업데이트 모드 조정"""
+        # leaf 당 item 수가 ~8개 정도가 되도록 깊이 선택 (Qt 기본 자동 계산은 큰 scene에서 재계산이 잦음)
+        depth = int(math.ceil(math.log2(max(count, 1) / 8.0))) if count > 8 else 4
+        depth = max(4, min(16, depth))
+        scene = self.scene()
+        if scene.bspTreeDepth() != depth:
+            scene.setBspTreeDepth(depth)
+
+        if count >= self.LARGE_SCENE_ITEMS:
+            # 많은 item이 동시에 바뀔 때 영역 하나로 합쳐서 다시 그림
+            mode = QtWidgets.QGraphicsView.BoundingRectViewportUpdate
+        else:
+            mode = QtWidgets.QGraphicsView.MinimalViewportUpdate
+        if self.viewportUpdateMode() != mode:
+            self.setViewportUpdateMode(mode)
+
+    # ---------------- Zoom / Pan ----------------
+    def current_zoom(self):
+        return self.transform().m11()
+
+    def zoom_by(self, factor):
+        new_zoom = self.current_zoom() * factor
+        if new_zoom < self.MIN_ZOOM:
+            factor = self.MIN_ZOOM / self.current_zoom()
+        elif new_zoom > self.MAX_ZOOM:
+            factor = self.MAX_ZOOM / self.current_zoom()
+        self.scale(factor, factor)
+
+    def reset_zoom(self):
+        self.resetTransform()
+
+    def fit_to_view(self):
+        """모든 레이어가 보이도록 확대/축소"""
+        rect = self.scene().itemsBoundingRect()
+        if rect.isEmpty():
+            self.reset_zoom()
+            return
+        self.fitInView(rect.adjusted(-20, -20, 20, 20), QtCore.Qt.KeepAspectRatio)
+        # clamp to zoom range
+        self.zoom_by(1.0)
+
+    def wheelEvent(self, e):
+        # Ctrl + wheel: zoom (마우스 위치 기준), 그 외: 기본 스크롤
+        if e.modifiers() & QtCore.Qt.ControlModifier:
+            steps = e.angleDelta().y() / 120.0
+            if steps:
+                self.zoom_by(self.ZOOM_STEP ** steps)
+            e.accept()
+        else:
+            super().wheelEvent(e)
+
+    def keyPressEvent(self, e):
+        if e.key() == QtCore.Qt.Key_F and not e.modifiers():
+            self.fit_to_view()
+        elif e.key() in (QtCore.Qt.Key_Plus, QtCore.Qt.Key_Equal) and e.modifiers() & QtCore.Qt.ControlModifier:
+            self.zoom_by(self.ZOOM_STEP)
+        elif e.key() == QtCore.Qt.Key_Minus and e.modifiers() & QtCore.Qt.ControlModifier:
+            self.zoom_by(1.0 / self.ZOOM_STEP)
+        elif e.key() == QtCore.Qt.Key_0 and e.modifiers() & QtCore.Qt.ControlModifier:
+            self.reset_zoom()
+        else:
+            super().keyPressEvent(e)
+
+    def mousePressEvent(self, e):
+        # middle button drag: pan
+        if e.button() == QtCore.Qt.MiddleButton:
+            self._pan_start = e.pos()
+            self.viewport().setCursor(QtCore.Qt.ClosedHandCursor)
+            e.accept()
+            return
+        if e.button() == QtCore.Qt.LeftButton and hasattr(self.parent_window, "begin_interaction"):
+            # 드래그 한 번의 이동/순서 변경을 하나의 undo 명령으로 묶음
+            self.parent_window.begin_interaction()
+        super().mousePressEvent(e)
+
+    def mouseMoveEvent(self, e):
+        if self._pan_start is not None:
+            delta = e.pos() - self._pan_start
+            self._pan_start = e.pos()
+            self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - delta.x())
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - delta.y())
+            e.accept()
+            return
+        super().mouseMoveEvent(e)
+
+    def mouseReleaseEvent(self, e):
+        if e.button() == QtCore.Qt.MiddleButton and self._pan_start is not None:
+            self._pan_start = None
+            self.viewport().unsetCursor()
+            e.accept()
+            return
+        super().mouseReleaseEvent(e)
+        if e.button() == QtCore.Qt.LeftButton and hasattr(self.parent_window, "end_interaction"):
+            self.parent_window.end_interaction()
 
+    # ---------------- Drag & Drop (Palette -> Canvas) ----------------
     def dragEnterEvent(self, e):
         if e.mimeData().hasText(): e.acceptProposedAction()
         else: super().dragEnterEvent(e)
@@ -1,26 +1,81 @@
 from PyQt5 import QtWidgets
-from utils.theme_utils import apply_theme_to_widget
 
 class Footer(QtWidgets.QStatusBar):
     """
     Footer 컴포넌트 (상태 표시줄)
-    - 앱 테마와 동기화
+    - 앱 테마와 동기화 (앱 단위 stylesheet를 상속)
     - 메시지 표시 지원
+    - 백그라운드 작업 진행률 / 취소 버튼 (begin_task / set_progress / end_task)
     """
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_theme = "dark"
         self.setFixedHeight(24)
         self.showMessage("Ready")
-        self.update_style(self.current_theme)
+
+        # 모델 비용 요약 (params / MACs / activation 메모리) - 임시 메시지에 가려지지 않도록 permanent
+        self.cost_label = QtWidgets.QLabel("")
+        self.addPermanentWidget(self.cost_label)
+
+        # 백그라운드 작업 진행률 + 취소 (작업 중에만 보임)
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setMaximumHeight(16)
+        self.progress_bar.hide()
+        self.cancel_button = QtWidgets.QPushButton("Cancel")
+        self.cancel_button.setMaximumHeight(20)
+        self.cancel_button.hide()
+        self.cancel_button.clicked.connect(self._on_cancel_clicked)
+        self.addPermanentWidget(self.progress_bar)
+        self.addPermanentWidget(self.cancel_button)
+        self._cancel_callback = None
 
     def update_style(self, theme):
-        """테마에 맞춰 스타일시트 적용"""
+        """
+        현재 테마 기록. stylesheet는 ThemeManager가 앱 단위로 한 번 적용하고 Footer는 그것을 상속하므로
+        여기서 다시 적용하지 않음 (위젯별 적용은 repolish를 한 번 더 일으킴)
+        """
         self.current_theme = theme
 
-        apply_theme_to_widget(self, theme_name=theme)
+    def show_cost_summary(self, text):
+        """모델 비용 합계 표시"""
+        self.cost_label.setText(text)
+
+    # ---------------- Task progress ----------------
+    def begin_task(self, text, on_cancel=None):
+        """진행률 표시 시작. on_cancel이 있으면 취소 버튼 표시"""
+        self._cancel_callback = on_cancel
+        self.showMessage(text)
+        self.progress_bar.setRange(0, 0)  # busy (진행률 모름)
+        self.progress_bar.show()
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(on_cancel is not None)
+
+    def set_progress(self, done, total, text=None):
+        """total이 0이면 busy 표시"""
+        if total > 0:
+            if self.progress_bar.maximum() != total:
+                self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(done, total))
+        elif self.progress_bar.maximum() != 0:
+            self.progress_bar.setRange(0, 0)
+        if text:
+            self.showMessage(text)
+
+    def end_task(self, message=None, timeout=3000):
+        self._cancel_callback = None
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+        if message:
+            self.showMessage(message, timeout)
+        else:
+            self.clearMessage()
 
-        # self.setStyleSheet(style)
+    def _on_cancel_clicked(self):
+        if self._cancel_callback is not None:
+            self.cancel_button.setEnabled(False)
+            self.showMessage("Cancelling...")
+            self._cancel_callback()
 
     def show_temp_message(self, text, timeout=3000):
         """일시적 메시지 표시"""
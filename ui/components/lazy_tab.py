@@ -0,0 +1,26 @@
+from PyQt5 import QtWidgets
+
+
+class LazyTab(QtWidgets.QWidget):
+    """
+    탭 자리 표시자 (placeholder)
+    - 처음 활성화될 때 factory()로 실제 위젯을 만들어 자기 layout에 넣음
+    - 열지 않은 탭은 위젯/스타일 비용을 쓰지 않음
+    """
+    def __init__(self, factory, parent=None):
+        super().__init__(parent)
+        self._factory = factory
+        self.widget = None
+        self._layout = QtWidgets.QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def is_built(self):
+        return self.widget is not None
+
+    def ensure_built(self):
+        """실제 탭 위젯을 (필요하면 만들어서) 반환"""
+        if self.widget is None:
+            self.widget = self._factory()
+            self._factory = None
+            self._layout.addWidget(self.widget)
+        return self.widget
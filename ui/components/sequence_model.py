@@ -0,0 +1,113 @@
+from PyQt5 import QtCore
+
+SEQUENCE_MIME = "application/x-nn-sequence-row"
+
+
+class SequenceModel(QtCore.QAbstractListModel):
+    """
+    Ordered Layers 패널의 model (uid 배열이 곧 행)
+    - sync(): graph.sequence와 비교해서 달라진 구간만 insert / move / remove로 알림
+      (레이어 하나 추가 / 삭제 / 이동은 행 하나만 갱신, 표시 텍스트는 보이는 행만 data()로 계산)
+    - 드래그로 행을 옮기면 직접 바꾸지 않고 moveRequested(src_row, dst_row)만 보냄
+      (graph.sequence를 바꾼 쪽에서 sync()를 호출)
+    """
+    moveRequested = QtCore.pyqtSignal(int, int)
+
+    def __init__(self, graph, parent=None):
+        super().__init__(parent)
+        self.graph = graph
+        self._uids = []
+
+    # ---------------- Qt model interface ----------------
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._uids)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        uid = self._uids[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            node = self.graph.get(uid)
+            return f"{node.layer_type} #{uid}" if node is not None else f"#{uid}"
+        if role == QtCore.Qt.UserRole:
+            return uid
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.ItemIsDropEnabled  # 행 사이에만 drop
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return QtCore.Qt.MoveAction
+
+    def mimeTypes(self):
+        return [SEQUENCE_MIME]
+
+    def mimeData(self, indexes):
+        mime = QtCore.QMimeData()
+        rows = sorted(index.row() for index in indexes if index.isValid())
+        mime.setData(SEQUENCE_MIME, str(rows[0] if rows else -1).encode())
+        return mime
+
+    def dropMimeData(self, mime, action, row, column, parent):
+        if action != QtCore.Qt.MoveAction or not mime.hasFormat(SEQUENCE_MIME):
+            return False
+        src = int(bytes(mime.data(SEQUENCE_MIME)).decode())
+        dst = parent.row() if row < 0 and parent.isValid() else row
+        if dst < 0:
+            dst = len(self._uids)
+        if 0 <= src < len(self._uids):
+            self.moveRequested.emit(src, dst)
+        # False: view가 원본 행을 지우지 않도록 (실제 이동은 sync()의 move 알림으로)
+        return False
+
+    # ---------------- Helpers ----------------
+    def uid_at(self, row):
+        return self._uids[row]
+
+    def uids(self):
+        return list(self._uids)
+
+    def sync(self):
+        """graph.sequence(그래프에 있는 uid만)에 맞춤. 공통 앞/뒤를 제외한 가운데 구간만 알림"""
+        new = [uid for uid in self.graph.sequence if uid in self.graph]
+        old = self._uids
+        if new == old:
+            return
+        start = 0
+        limit = min(len(old), len(new))
+        while start < limit and old[start] == new[start]:
+            start += 1
+        end_old, end_new = len(old), len(new)
+        while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+            end_old -= 1
+            end_new -= 1
+        old_mid, new_mid = old[start:end_old], new[start:end_new]
+
+        if not old_mid:
+            self.beginInsertRows(QtCore.QModelIndex(), start, end_new - 1)
+            self._uids = new
+            self.endInsertRows()
+        elif not new_mid:
+            self.beginRemoveRows(QtCore.QModelIndex(), start, end_old - 1)
+            self._uids = new
+            self.endRemoveRows()
+        elif len(old_mid) == len(new_mid) and old_mid[0] == new_mid[-1] and old_mid[1:] == new_mid[:-1]:
+            # 행 하나가 아래로 이동 (start -> end)
+            self.beginMoveRows(QtCore.QModelIndex(), start, start, QtCore.QModelIndex(), end_old)
+            self._uids = new
+            self.endMoveRows()
+        elif len(old_mid) == len(new_mid) and old_mid[-1] == new_mid[0] and old_mid[:-1] == new_mid[1:]:
+            # 행 하나가 위로 이동 (end -> start)
+            self.beginMoveRows(QtCore.QModelIndex(), end_old - 1, end_old - 1, QtCore.QModelIndex(), start)
+            self._uids = new
+            self.endMoveRows()
+        else:
+            # 그 외: 가운데 구간만 지우고 다시 넣음
+            self.beginRemoveRows(QtCore.QModelIndex(), start, end_old - 1)
+            self._uids = old[:start] + old[end_old:]
+            self.endRemoveRows()
+            self.beginInsertRows(QtCore.QModelIndex(), start, end_new - 1)
+            self._uids = new
+            self.endInsertRows()
@@ -1,28 +1,83 @@
 import sys
 import os
+import json
+import contextlib
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "data"))
 
-from PyQt5 import QtWidgets, QtCore
+from PyQt5 import QtWidgets, QtCore, QtGui
 from ui.palette.palette_widget import PaletteListWidget
 from ui.canvas.canvas_view import CanvasView
+from ui.components.sequence_model import SequenceModel
 from layers.layer_item import LayerItem
 from layers.edge_item import EdgeItem
 from layers.layers_config import LAYER_TEMPLATES
-from utils.export_utils import export_to_pytorch
-from utils.save_load_utils import save_design_json, load_design_json
+from layers.network_graph import NetworkGraph, MODULE_TYPE, instance_params
+from utils.export_utils import export_to_pytorch, RESERVED_MODULE_NAMES
+from utils.model_benchmark import benchmark_task, format_report
+from utils.save_load_utils import ask_save_path, ask_load_path, read_design_task, write_design_task
+from utils.design_tasks import BackgroundTask, ChunkedJob
+from utils.graph_layout import layout_snapshot, layout_task
+from utils.design_journal import DesignJournal
+from utils.undo_stack import UndoStack
 from utils.validate_network import validate_network
+from utils.shape_inference import parse_shape, ShapeCache
+from utils.cost_model import CostCache
+from utils.change_scheduler import ChangeScheduler
+from utils.composite_modules import (COMPOSITE_TYPES, ExpandedModules, collapse_nodes, expand_children, expand_node,
+                                     is_expandable)
 from data.predefined_model import PREDEFINED_MODELS
 
 class DesignTab(QtWidgets.QWidget):
     """네트워크 설계 탭"""
+    AUTOSAVE_INTERVAL_MS = 2000
+    UNDO_MEMORY_LIMIT = 64 << 20  # undo 기록 메모리 상한 (bytes), 넘으면 오래된 명령부터 버림
     def __init__(self, parent_window=None):
         super().__init__()
         self.parent_window = parent_window
 
-        self.layer_uid = 0
+        # graph: 레이어/연결/순서의 실제 데이터 (Qt 없음). layer_items/edges/sequence_model은 뷰
+        self.graph = NetworkGraph()
         self.layer_items = {}
         self.edges = []
 
+        # 레이어 이동 시 sequence/edge 재계산을 이벤트 루프 한 턴에 한 번으로 묶음
+        self._bulk_depth = 0
+        self._bulk_options = {}
+        self.sequence_scheduler = ChangeScheduler(self.update_sequence_from_positions, self)
+
+        # live validation: 레이어별 shape 캐시 (편집된 레이어의 downstream만 다시 계산)
+        self.shape_cache = ShapeCache(self.graph)
+        self.cost_cache = CostCache(self.shape_cache)
+        self.validation_scheduler = ChangeScheduler(self.revalidate, self)
+
+        # save/load: 파일 I/O와 파싱은 worker 스레드, 뷰 생성은 GUI 스레드에서 chunk 단위 (한 번에 하나씩)
+        self.io_pool = QtCore.QThreadPool(self)
+        self.io_pool.setMaxThreadCount(1)
+        self._io_task = None  # 진행 중인 BackgroundTask / ChunkedJob
+
+        # auto layout: layered 배치는 graph snapshot으로 worker에서 계산하고 결과 좌표는 한 번에 적용
+        # 계산 중에 다시 요청되면 끝난 뒤 최신 graph로 한 번만 다시 계산
+        self.layout_pool = QtCore.QThreadPool(self)
+        self.layout_pool.setMaxThreadCount(1)
+        self._layout_task = None
+        self._layout_again = False
+
+        # autosave: graph 변경을 journal에 모아 두었다가 주기적으로 append (O(변경)), 커지면 snapshot으로 compaction
+        # 이전 세션 복구 여부를 정한 뒤(offer_session_recovery) 시작
+        self.journal = DesignJournal(self.session_directory())
+        self.autosave_timer = QtCore.QTimer(self)
+        self.autosave_timer.setInterval(self.AUTOSAVE_INTERVAL_MS)
+        self.autosave_timer.timeout.connect(self.autosave)
+
+        # undo/redo: graph 변경 알림을 명령 단위(이벤트 루프 한 턴 / 마우스 드래그 한 번)로 묶어 delta로 보관
+        self.undo_stack = UndoStack(self.UNDO_MEMORY_LIMIT)
+        self.undo_scheduler = ChangeScheduler(self._close_undo_group, self)
+        self._interaction_depth = 0
+        self.graph.observer = self._on_graph_change
+
+        # 펼친 composite 모듈 (접을 때 자식 -> 원래 레이어). undo로 되돌아와도 다시 접을 수 있도록 기록은 유지
+        self.expanded_modules = ExpandedModules()
+
         layout = QtWidgets.QHBoxLayout(self)
         layout.setContentsMargins(8, 8, 8, 8)
 
@@ -56,6 +111,15 @@ class DesignTab(QtWidgets.QWidget):
 
         # Palette 레이아웃 안에 Predefined Models를 추가 (Palette 밑에 위치)
         palette_layout.addWidget(predefined_box, 2)
+
+        # User Modules: graph.modules의 정의 목록 (더블클릭: instance 추가, 우클릭: 정의 편집/삭제)
+        modules_box = QtWidgets.QGroupBox("User Modules")
+        modules_layout = QtWidgets.QVBoxLayout(modules_box)
+        self.module_list = QtWidgets.QListWidget()
+        self.module_list.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.module_list.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        modules_layout.addWidget(self.module_list)
+        palette_layout.addWidget(modules_box, 1)
         palette_layout.addStretch()
         palette_box.setLayout(palette_layout)
 
@@ -76,28 +140,49 @@ class DesignTab(QtWidgets.QWidget):
         # ---------------- Sequence & Controls ----------------
         right_box = QtWidgets.QGroupBox("Sequence & Controls")
         right_layout = QtWidgets.QVBoxLayout(right_box)
-        self.sequence_list = QtWidgets.QListWidget()
+        # Ordered Layers: graph.sequence를 그대로 보여주는 model (변경된 행만 알림, 드래그 이동은 moveRequested로)
+        self.sequence_model = SequenceModel(self.graph, self)
+        self.sequence_list = QtWidgets.QListView()
+        self.sequence_list.setModel(self.sequence_model)
+        self.sequence_list.setUniformItemSizes(True)
         self.sequence_list.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
-
-        # Connect model signals (use a single handler that accepts *args)
-        model = self.sequence_list.model()
-        self.sequence_list.model().rowsMoved.connect(self.on_sequence_reordered)
-        self.sequence_list.model().rowsMoved.connect(self.update_sequence_from_positions)
-
-        model.rowsMoved.connect(self.on_sequence_reordered)
-        model.rowsInserted.connect(self.on_sequence_reordered)
-        model.rowsRemoved.connect(self.on_sequence_reordered)
-        model.layoutChanged.connect(self.on_sequence_reordered)
+        self.sequence_list.setDefaultDropAction(QtCore.Qt.MoveAction)
+        self.sequence_model.moveRequested.connect(self.on_sequence_reordered)
 
         right_layout.addWidget(QtWidgets.QLabel("Ordered Layers"))
         right_layout.addWidget(self.sequence_list, 1)
 
+        # 입력 shape (배치 차원 제외). 비우면 첫 레이어로부터 추정
+        shape_row = QtWidgets.QHBoxLayout()
+        shape_row.addWidget(QtWidgets.QLabel("Input shape:"))
+        self.input_shape_edit = QtWidgets.QLineEdit()
+        self.input_shape_edit.setPlaceholderText("예: 3,224,224 (비우면 자동)")
+        self.input_shape_edit.editingFinished.connect(self.on_input_shape_edited)
+        shape_row.addWidget(self.input_shape_edit)
+        shape_row.addWidget(QtWidgets.QLabel("Batch:"))
+        self.batch_spin = QtWidgets.QSpinBox()
+        self.batch_spin.setRange(1, 4096)
+        self.batch_spin.setValue(self.cost_cache.batch_size)
+        self.batch_spin.valueChanged.connect(self.on_batch_size_changed)
+        shape_row.addWidget(self.batch_spin)
+        right_layout.addLayout(shape_row)
+
         # Buttons
         self.btn_export = QtWidgets.QPushButton("Export PyTorch Code")
         self.btn_save = QtWidgets.QPushButton("Save Design (.json)")
         self.btn_load = QtWidgets.QPushButton("Load Design (.json)")
         self.btn_clear = QtWidgets.QPushButton("Clear Canvas")
         self.btn_connect = QtWidgets.QPushButton("Connect Layers")
+        self.btn_fit = QtWidgets.QPushButton("Fit View")
+        self.btn_fit.setToolTip("모든 레이어가 보이도록 확대/축소 (F, Ctrl+Wheel: zoom, 가운데 버튼 드래그: 이동)")
+        self.btn_layout = QtWidgets.QPushButton("Auto Layout")
+        self.btn_layout.setToolTip("연결을 따라 층별로 다시 배치 (교차 최소화)")
+        self.btn_benchmark = QtWidgets.QPushButton("Benchmark (CPU)")
+        self.btn_benchmark.setToolTip("export한 모델을 별도 프로세스에서 CPU로 측정 (batch별 latency / throughput, 레이어별 시간)")
+        self.btn_make_module = QtWidgets.QPushButton("Make Module")
+        self.btn_make_module.setToolTip("선택한 레이어들을 재사용 모듈로 정의하고 그 자리를 instance 하나로 바꿈")
+        self.btn_undo = QtWidgets.QPushButton("Undo")
+        self.btn_redo = QtWidgets.QPushButton("Redo")
 
         row1 = QtWidgets.QHBoxLayout()
         row1.addWidget(self.btn_export)
@@ -107,45 +192,188 @@ class DesignTab(QtWidgets.QWidget):
         row2.addWidget(self.btn_clear)
         row3 = QtWidgets.QHBoxLayout()
         row3.addWidget(self.btn_connect)
+        row3.addWidget(self.btn_fit)
+        row3.addWidget(self.btn_layout)
+        row3.addWidget(self.btn_benchmark)
 
         right_layout.addLayout(row1)
         right_layout.addLayout(row2)
         right_layout.addLayout(row3)
+        row4 = QtWidgets.QHBoxLayout()
+        row4.addWidget(self.btn_undo)
+        row4.addWidget(self.btn_redo)
+        row4.addWidget(self.btn_make_module)
+        right_layout.addLayout(row4)
         right_layout.addStretch()
         layout.addWidget(right_box, 2)
 
         # 시그널 연결
-        self.sequence_list.itemClicked.connect(self._on_sequence_item_clicked)
+        self.sequence_list.clicked.connect(self._on_sequence_item_clicked)
         self.predefined_list.itemDoubleClicked.connect(self.add_predefined_model_to_canvas)
+        self.module_list.itemDoubleClicked.connect(self.add_module_instance)
+        self.module_list.customContextMenuRequested.connect(self._module_list_menu)
+        self.btn_make_module.clicked.connect(self.make_module_from_selection)
         self.btn_connect.clicked.connect(self.connect_layers_dialog)
         self.btn_clear.clicked.connect(self.clear_canvas)
         self.btn_save.clicked.connect(self.save_design)
         self.btn_load.clicked.connect(self.load_design)
         self.btn_export.clicked.connect(self.export_code)
+        self.btn_benchmark.clicked.connect(self.benchmark_model)
+        self.btn_fit.clicked.connect(self.view.fit_to_view)
+        self.btn_layout.clicked.connect(self.auto_layout)
+        self.btn_undo.clicked.connect(self.undo)
+        self.btn_redo.clicked.connect(self.redo)
+        # Ctrl+Z / Ctrl+Y / Ctrl+Shift+Z (입력 칸에 포커스가 있으면 그 위젯의 undo가 우선)
+        for keys, slot in (("Ctrl+Z", self.undo), ("Ctrl+Y", self.redo), ("Ctrl+Shift+Z", self.redo)):
+            shortcut = QtWidgets.QShortcut(QtGui.QKeySequence(keys), self)
+            shortcut.setContext(QtCore.Qt.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(slot)
+        self._update_undo_buttons()
+
+    @property
+    def layer_uid(self):
+        """마지막으로 발급된 uid (graph가 관리)"""
+        return self.graph.last_uid
+
+    # ---------------- Graph -> View sync ----------------
+    def _create_layer_view(self, node):
+        """graph 노드에 대한 LayerItem 생성 및 scene 등록"""
+        item = LayerItem(node)
+        item.setPos(node.x, node.y)
+        self.scene.addItem(item)
+        self.layer_items[node.uid] = item
+        return item
+
+    def _rebuild_sequence_list(self):
+        """Sequence 패널을 graph.sequence에 맞춤 (달라진 행만 insert/move/remove)"""
+        self.sequence_model.sync()
+
+    def sync_views_from_graph(self):
+        """graph 전체를 기준으로 LayerItem / Sequence / Edge 뷰를 맞춤 (graph를 직접 수정한 뒤 호출)"""
+        with self.bulk_update(layout=False, chain=False):
+            pass
+
+    # ---------------- Bulk insertion ----------------
+    def is_bulk_updating(self):
+        return self._bulk_depth > 0
+
+    @contextlib.contextmanager
+    def bulk_update(self, layout=True, chain=True):
+        """
+        여러 레이어를 한 번에 추가/변경하는 트랜잭션.
+        블록 안에서는 graph만 수정하고 (sequence 시그널, itemChange 알림은 멈춤),
+        블록이 끝날 때 뷰 생성 / layout / 연결 / edge 갱신을 한 번씩만 수행한다.
+        - layout: True면 sequence 순서대로 임시 배치 후 블록이 끝나면 auto_layout 요청 (False면 graph 노드 좌표 사용)
+        - chain: True면 블록 시작 시 graph가 직렬 연결(is_chained)이었을 때만 sequence 순서대로 다시 직렬 연결
+          (branch / merge가 있는 design은 연결을 그대로 둠). False면 graph 연결 유지
+        중첩 가능하며 가장 바깥 블록의 옵션이 적용된다.
+        """
+        if self._bulk_depth == 0:
+            self._bulk_options = {"layout": layout, "chain": chain and self.graph.is_chained()}
+        self._bulk_depth += 1
+        try:
+            yield self.graph
+        finally:
+            try:
+                # finish while still marked as bulk so setPos() on existing items stays cheap
+                if self._bulk_depth == 1:
+                    self._finish_bulk_update(**self._bulk_options)
+            finally:
+                self._bulk_depth -= 1
+            if self._bulk_depth == 0 and self._bulk_options.get("layout"):
+                self.auto_layout()
+
+    def _finish_bulk_update(self, layout=True, chain=True):
+        if layout:
+            self._layout_graph_positions()
+
+        # 새 노드 뷰 생성 + 기존 뷰 위치 동기화 (bulk 중이라 itemChange는 좌표 동기화만 수행)
+        for node in self.graph:
+            item = self.layer_items.get(node.uid)
+            if item is None:
+                self._create_layer_view(node)
+            elif item.pos().x() != node.x or item.pos().y() != node.y:
+                item.setPos(node.x, node.y)
+
+        self._rebuild_sequence_list()
+        if chain:
+            self.graph.chain_sequence()
+        self.update_connections()
+        for e in self.edges:
+            e.update_position()
+        self.sequence_scheduler.cancel()
+        self._sync_input_shape_field()
+        self.refresh_canvas_bounds()
+
+    def add_layers(self, layer_defs, layout=True, chain=True):
+        """
+        layer_defs: [{"type": ..., "params": {...}}, ...] 를 한 번에 추가 (bulk).
+        chain: 새 레이어를 sequence 끝에 차례로 이어 붙임 (기존 연결은 그대로).
+        추가된 graph 노드 목록을 반환.
+        """
+        nodes = []
+        tail = next((uid for uid in reversed(self.graph.sequence) if uid in self.graph), None)
+        with self.bulk_update(layout=layout, chain=False):
+            for layer_def in layer_defs:
+                layer_type = layer_def.get("type")
+                params = layer_def.get("params")
+                if params is None:
+                    params = LAYER_TEMPLATES.get(layer_type, {}).get("params", {})
+                pos = layer_def.get("pos", (0.0, 0.0))
+                nodes.append(self.graph.add_node(layer_type, params, pos=pos))
+                if chain and tail is not None:
+                    self.graph.connect(tail, nodes[-1].uid)
+                tail = nodes[-1].uid
+        return nodes
 
     # ---------------- Layer Add/Edit ----------------
     def add_layer(self, layer_type, pos, params=None):
         if params is None:
             params = LAYER_TEMPLATES.get(layer_type, {}).get("params", {})
-        self.layer_uid += 1
-        uid = self.layer_uid
-        item = LayerItem(layer_type, params, uid)
-        item.setPos(pos)
-        if not hasattr(item, "connections"):
-            item.connections = []
-        self.scene.addItem(item)
-        self.layer_items[uid] = item
+        node = self.graph.add_node(layer_type, params, pos=(pos.x(), pos.y()), append_to_sequence=False)
+        self._create_layer_view(node)
 
-        li = QtWidgets.QListWidgetItem(f"{layer_type} #{uid}")
-        li.setData(QtCore.Qt.UserRole, uid)
-        self.sequence_list.addItem(li)
+        # 떨어뜨린 높이의 sequence 자리에 넣고 앞/뒤 레이어 사이에만 연결 (나머지 연결은 그대로)
+        seq = list(self.graph.sequence)
+        at = next((i for i, uid in enumerate(seq) if uid in self.graph and self.graph.node(uid).y > node.y), len(seq))
+        seq.insert(at, node.uid)
+        self.graph.set_sequence(seq)
+        self.graph.link_into_sequence(node.uid)
+        self.sequence_model.sync()
 
-        self.auto_layout()
         self.update_connections()
+        self.auto_layout()
 
-
-    def _on_sequence_item_clicked(self, list_item):
-        uid = list_item.data(QtCore.Qt.UserRole)
+    # ---------------- Input shape ----------------
+    def on_input_shape_edited(self):
+        text = self.input_shape_edit.text()
+        try:
+            self.graph.set_input_shape(parse_shape(text))
+            self.schedule_validation()
+        except ValueError:
+            QtWidgets.QMessageBox.warning(self, "Input shape", f"잘못된 shape입니다: {text}\n예: 3,224,224")
+            self._sync_input_shape_field()
+
+    def _sync_input_shape_field(self):
+        shape = self.graph.input_shape
+        self.input_shape_edit.setText(",".join("?" if d is None else str(d) for d in shape) if shape else "")
+
+    def remove_layer(self, uid):
+        """
+        레이어 제거 (graph + 뷰). Edge는 update_connections에서 정리됨.
+        입력과 출력이 하나씩인 레이어는 앞 -> 뒤를 바로 이어서 직렬 구간이 끊기지 않게 함
+        """
+        self._drop_layer_view(uid)
+        if uid in self.graph:
+            node = self.graph.node(uid)
+            bridge = (node.inputs[0], node.outputs[0]) if len(node.inputs) == 1 and len(node.outputs) == 1 else None
+            self.graph.remove_node(uid)
+            if bridge is not None and bridge[0] != bridge[1]:
+                self.graph.connect(*bridge)
+        self.schedule_sequence_update()
+
+    def _on_sequence_item_clicked(self, index):
+        uid = index.data(QtCore.Qt.UserRole)
         if uid in self.layer_items:
             it = self.layer_items[uid]
             self.scene.clearSelection()
@@ -153,32 +381,63 @@ class DesignTab(QtWidgets.QWidget):
             self.view.centerOn(it)
 
     # ---------------- Auto Layout ----------------
-    def auto_layout(self):
+    def _layout_graph_positions(self):
+        """sequence 순서대로 graph 노드 좌표만 계산 (세로 1열). worker의 layered 배치가 올 때까지의 임시 위치"""
         x_offset = 50; y_offset = 50; y_gap = 100
-        for idx in range(self.sequence_list.count()):
-            uid = self.sequence_list.item(idx).data(QtCore.Qt.UserRole)
-            if uid in self.layer_items:
-                self.layer_items[uid].setPos(x_offset, y_offset + idx * y_gap)
+        for idx, node in enumerate(self.graph.ordered_nodes()):
+            self.graph.set_pos(node.uid, x_offset, y_offset + idx * y_gap)
+
+    def auto_layout(self):
+        """layered 배치를 worker 스레드에서 계산 (결과는 _apply_layout에서 한 번에 반영)"""
+        if self.is_bulk_updating():
+            return  # bulk 종료 시 한 번만 배치
+        if self._layout_task is not None:
+            self._layout_again = True
+            return
+        task = BackgroundTask(layout_task, layout_snapshot(self.graph))
+        task.signals.finished.connect(self._apply_layout)
+        task.signals.failed.connect(self._on_layout_failed)
+        self._layout_task = task
+        self._layout_again = False
+        self.layout_pool.start(task)
+
+    def _apply_layout(self, result):
+        """worker 결과 좌표를 bulk 한 번으로 적용 (undo 명령 하나). 그 사이 구조가 바뀌었으면 버리거나 다시 계산"""
+        self._layout_task = None
+        version, positions = result
+        if self._layout_again:
+            self.auto_layout()
+            return
+        if version != self.graph.version or self._io_task is not None or self._interaction_depth > 0:
+            return
+        self._close_undo_group()
+        self.undo_stack.begin("Auto layout")
+        with self.bulk_update(layout=False, chain=False) as graph:
+            for uid, (x, y) in positions.items():
+                graph.set_pos(uid, x, y)
+
+    def _on_layout_failed(self, msg):
+        self._layout_task = None
+        self._layout_again = False
+        footer = self._footer()
+        if footer is not None:
+            footer.show_temp_message(f"Auto layout failed: {msg}")
+
+    def refresh_canvas_bounds(self):
+        """scene rect / BSP 깊이 / viewport 모드를 현재 레이어 수와 배치에 맞춤"""
+        self.view.tune_for_item_count(len(self.graph))
+        self.view.update_scene_bounds()
 
     # ---------------- Connections ----------------
     def connect_layers_dialog(self):
-        items = [self.sequence_list.item(i) for i in range(self.sequence_list.count())]
-        if len(items) < 2:
+        if len(self.graph.sequence) < 2:
             QtWidgets.QMessageBox.warning(self, "Connection Failed", "레이어가 2개 이상이어야 합니다.")
             return
 
-        # clear existing connections
-        for layer in self.layer_items.values():
-            layer.connections = []
-
-        uids = [it.data(QtCore.Qt.UserRole) for it in items]
-        for i in range(len(uids) - 1):
-            src = self.layer_items[uids[i]]
-            tgt = self.layer_items[uids[i + 1]]
-            if tgt.uid not in src.connections:
-                src.connections.append(tgt.uid)
+        # sequence 순서대로 직렬 연결
+        self.graph.chain_sequence()
 
-        valid, msg = validate_network(self.layer_items, self.sequence_list)
+        valid, msg = validate_network(self.graph)
         if not valid:
             QtWidgets.QMessageBox.warning(self, "Connection Failed", msg)
             return
@@ -189,145 +448,438 @@ class DesignTab(QtWidgets.QWidget):
         QtWidgets.QMessageBox.information(self, "Connection Success", "레이어 연결이 완료되었습니다.")
 
     def update_connections(self):
-        """현재 connections 정보를 바탕으로 Scene의 EdgeItem을 완전히 재생성"""
-        # remove existing edges from scene
-        for e in list(self.edges):
-            try:
-                self.scene.removeItem(e)
-            except Exception:
-                pass
-        self.edges = []
-
-        # create new edges based on connections
-        for uid, item in self.layer_items.items():
-            for tgt_uid in getattr(item, "connections", []) or []:
-                if tgt_uid in self.layer_items:
-                    tgt_item = self.layer_items[tgt_uid]
-                    e = EdgeItem(item, tgt_item)
-                    self.scene.addItem(e)
-                    self.edges.append(e)
+        """현재 connections 정보와 Scene의 EdgeItem을 동기화.
+        연결 집합이 바뀐 부분만 EdgeItem을 제거/생성한다 (이동만 한 경우는 LayerItem.update_edges가 처리)."""
+        wanted = set()
+        for uid, tgt_uid in self.graph.edges():
+            if uid in self.layer_items and tgt_uid in self.layer_items:
+                wanted.add((uid, tgt_uid))
+
+        # keep edges whose endpoints are still the registered items and still wanted
+        kept = []
+        existing = set()
+        for e in self.edges:
+            key = (e.source_item.uid, e.target_item.uid)
+            alive = (self.layer_items.get(key[0]) is e.source_item and
+                     self.layer_items.get(key[1]) is e.target_item)
+            if alive and key in wanted and key not in existing:
+                kept.append(e)
+                existing.add(key)
+            else:
+                e.detach()
+                try:
+                    self.scene.removeItem(e)
+                except Exception:
+                    pass
+
+        # create only the missing edges
+        for src_uid, tgt_uid in wanted - existing:
+            e = EdgeItem(self.layer_items[src_uid], self.layer_items[tgt_uid])
+            self.scene.addItem(e)
+            kept.append(e)
+        self.edges = kept
+
+        # 구조가 바뀌었으면 graph.version으로 감지되어 다음 검증 때 전체 재계산
+        self.schedule_validation()
+
+    # ---------------- Live validation ----------------
+    def schedule_validation(self):
+        self.validation_scheduler.mark_dirty()
+
+    def set_layer_params(self, uid, params):
+        """레이어 파라미터 변경 (graph를 통해서 -> undo/journal 기록) 후 표시 갱신 및 재검증"""
+        self.graph.set_params(uid, params)
+        item = self.layer_items.get(uid)
+        if item is not None:
+            item._refresh_display()
+        self.on_layer_params_changed(uid)
+
+    def on_layer_params_changed(self, uid):
+        """LayerItem 파라미터 편집 후 호출: 해당 레이어부터 downstream만 재검증"""
+        self.shape_cache.invalidate(uid)
+        self.schedule_validation()
+
+    def revalidate(self):
+        """shape/비용 캐시를 갱신하고 결과가 바뀐 레이어만 캔버스 표시(테두리/툴팁/요약) 갱신"""
+        for ls in self.shape_cache.update():
+            item = self.layer_items.get(ls.uid)
+            if item is not None:
+                item.set_shape_status(ls)
+
+        # 비용: shape 캐시가 다시 계산한 레이어만 재계산, 합계는 차분 갱신
+        for uid in self.cost_cache.update():
+            item = self.layer_items.get(uid)
+            if item is not None:
+                item.set_cost(self.cost_cache.costs.get(uid))
+        self._show_cost_summary()
+
+    def on_batch_size_changed(self, value):
+        self.cost_cache.batch_size = value
+        self._show_cost_summary()
+
+    def _footer(self):
+        return getattr(self.parent_window, "status_bar", None)
+
+    def _show_cost_summary(self):
+        footer = self._footer()
+        if footer is not None:
+            footer.show_cost_summary(self.cost_cache.summary_text() if len(self.graph) else "")
+
+    def schedule_sequence_update(self):
+        """sequence 재계산을 예약 (같은 턴의 여러 이동은 한 번으로 합쳐짐)"""
+        self.sequence_scheduler.mark_dirty()
+
+    def flush_pending_changes(self):
+        """예약된 sequence/edge 재계산을 즉시 수행"""
+        self.sequence_scheduler.flush()
 
     def update_sequence_from_positions(self):
-        # y좌표 기준으로 정렬 후 SequenceList 갱신
-        items = sorted(self.layer_items.values(), key=lambda i: i.pos().y())
-        self.sequence_list.clear()
-        for item in items:
-            li = QtWidgets.QListWidgetItem(f"{item.layer_type} #{item.uid}")
-            li.setData(QtCore.Qt.UserRole, item.uid)
-            self.sequence_list.addItem(li)
-            
-        uids = [self.sequence_list.item(i).data(QtCore.Qt.UserRole) for i in range(self.sequence_list.count())]
-        print("Updated sequence:", uids)
-        
-        # 연결 갱신
-        self.update_connections()
-        self.layer_sequence = uids
-        self.layer_sequence = [self.sequence_list.item(i).data(QtCore.Qt.UserRole) 
-                            for i in range(self.sequence_list.count())]
-        
-    def update_sequence_connections_only(self):
-        """SequenceList 순서를 기준으로 connections만 갱신 (Edge는 그대로)"""
-        uids = [self.sequence_list.item(i).data(QtCore.Qt.UserRole) for i in range(self.sequence_list.count())]
+        # y좌표 기준으로 정렬 후 SequenceList 갱신 (graph 노드 좌표는 LayerItem.itemChange에서 동기화됨)
+        # 직렬 design이었을 때만 새 순서로 다시 직렬 연결 (branch / merge 연결은 위치를 바꿔도 유지)
+        chained = self.graph.is_chained()
+        nodes = sorted(self.graph, key=lambda n: n.y)
+        self.graph.set_sequence([n.uid for n in nodes])
 
-        for layer in self.layer_items.values():
-            layer.connections = []
-
-        for i in range(len(uids) - 1):
-            self.layer_items[uids[i]].connections = [uids[i + 1]]
+        self._rebuild_sequence_list()
 
+        if chained:
+            self.graph.chain_sequence()
+        self.update_connections()
+        self.refresh_canvas_bounds()
 
-    # unified handler for various model signals (drag/drop, layout change 등)
-    def on_sequence_reordered(self, *args):
-        uids = [self.sequence_list.item(i).data(QtCore.Qt.UserRole) for i in range(self.sequence_list.count())]
+    def on_sequence_reordered(self, src_row, dst_row):
+        """
+        Sequence 패널에서 행을 드래그로 옮김 (dst_row: 옮기기 전 기준 삽입 위치).
+        옮긴 레이어만 새 이웃 사이의 y로 옮겨서, 이후 위치 기준 재계산에서도 같은 순서가 유지되게 함.
+        연결은 직렬 design일 때만 새 순서로 다시 잇고, branch / merge가 있으면 그대로 둠 (bulk_update의 chain)
+        """
+        if self._io_task is not None:
+            return
+        uids = self.sequence_model.uids()
+        uid = uids.pop(src_row)
+        if dst_row > src_row:
+            dst_row -= 1
+        if dst_row == src_row:
+            return
+        uids.insert(dst_row, uid)
 
-        # reset connections and rebuild according to list order
-        for layer in self.layer_items.values():
-            layer.connections = []
+        above = self.graph.get(uids[dst_row - 1]) if dst_row > 0 else None
+        below = self.graph.get(uids[dst_row + 1]) if dst_row + 1 < len(uids) else None
+        if above is not None and below is not None:
+            x, y = above.x, (above.y + below.y) / 2
+        elif above is not None:
+            x, y = above.x, above.y + 100
+        else:
+            x, y = below.x, below.y - 100
 
-        for i in range(len(uids) - 1):
-            self.layer_items[uids[i]].connections = [uids[i+1]]
-
-        # rebuild edges
-        self.update_connections()
+        self._close_undo_group()
+        self.sequence_scheduler.cancel()
+        with self.bulk_update(layout=False, chain=True) as graph:
+            graph.set_pos(uid, x, y)
+            graph.set_sequence(uids)
 
 
     # ---------------- Export / Save / Load ----------------
     def export_code(self):
-        QtWidgets.QApplication.processEvents()
-        self.update_sequence_connections_only()  # 최신 connections 반영
-        self.update_sequence_from_positions()     # this sets self.layer_sequence
+        self.sequence_scheduler.flush(force=True)  # this sets graph.sequence
+
+        export_to_pytorch(self.graph)
 
-        export_to_pytorch(self.layer_items, self.layer_sequence)
+    def benchmark_model(self):
+        """export 코드를 worker 스레드 -> 자식 프로세스에서 측정하고 이전 기록과 비교해서 보여줌"""
+        if self._io_busy():
+            return
+        self.sequence_scheduler.flush(force=True)
+        modes = ["Training export", "Inference export"]
+        mode, ok = QtWidgets.QInputDialog.getItem(self, "Benchmark", "Export mode:", modes, 0, False)
+        if not ok:
+            return
+        task = BackgroundTask(benchmark_task, self.graph.copy(), mode == modes[1], self.benchmark_history_path())
+        task.signals.finished.connect(self._on_benchmark_finished)
+        self._start_io_task(task, "Benchmarking...", "Benchmark Error", cancellable=True)
+
+    def _on_benchmark_finished(self, outcome):
+        result, baseline = outcome
+        self._end_io("Benchmark finished")
+        dlg = QtWidgets.QDialog(self)
+        dlg.setWindowTitle("Benchmark")
+        dlg.resize(640, 480)
+        layout = QtWidgets.QVBoxLayout(dlg)
+        te = QtWidgets.QPlainTextEdit(format_report(result, baseline))
+        te.setReadOnly(True)
+        te.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        layout.addWidget(te)
+        btns = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        btns.rejected.connect(dlg.reject)
+        layout.addWidget(btns)
+        dlg.exec_()
 
     def save_design(self):
-        QtWidgets.QApplication.processEvents()
-        self.update_sequence_connections_only()
-        self.update_sequence_from_positions()
-        save_design_json(self.layer_items, self.layer_sequence)
+        if self._io_busy():
+            return
+        self.sequence_scheduler.flush(force=True)
+        path, compression = ask_save_path(self)
+        if not path:
+            return
+        # worker는 snapshot만 사용하므로 저장 중에도 편집 가능
+        task = BackgroundTask(write_design_task, self.graph.copy(), path, compression)
+        task.signals.finished.connect(lambda saved: self._end_io(f"Saved to {saved}"))
+        self._start_io_task(task, f"Saving {path}...", "Save Error", cancellable=False)
 
     def load_design(self):
-        load_design_json(self)
+        if self._io_busy():
+            return
+        path = ask_load_path(self)
+        if not path:
+            return
+        task = BackgroundTask(read_design_task, path)
+        task.signals.finished.connect(self._on_design_loaded)
+        # 로드가 끝날 때까지 편집을 막음 (취소 버튼은 메인 윈도우의 Footer에 있음)
+        self.setEnabled(False)
+        self._start_io_task(task, f"Loading {path}...", "Load Error", cancellable=True)
+
+    def _io_busy(self):
+        if self._io_task is None:
+            return False
+        footer = self._footer()
+        if footer is not None:
+            footer.show_temp_message("다른 저장/불러오기 작업이 진행 중입니다.")
+        return True
+
+    def _start_io_task(self, task, text, error_title, cancellable):
+        self._io_task = task
+        footer = self._footer()
+        if footer is not None:
+            footer.begin_task(text, on_cancel=task.cancel if cancellable else None)
+            task.signals.progress.connect(footer.set_progress)
+        task.signals.failed.connect(lambda msg: self._on_io_failed(error_title, msg))
+        task.signals.cancelled.connect(lambda: self._end_io("Cancelled"))
+        self.io_pool.start(task)
+
+    def _on_design_loaded(self, graph):
+        if self._io_task is None or self._io_task.is_cancelled():
+            self._end_io("Cancelled")
+            return
+        self.adopt_graph(graph, "Loaded")
+
+    def adopt_graph(self, graph, verb="Loaded"):
+        """다른 곳(worker / journal 복구)에서 만든 그래프를 붙이고 LayerItem/EdgeItem은 이벤트 루프 턴마다 나눠서 생성"""
+        self.setEnabled(False)
+        self.clear_canvas()
+        self.graph.take_from(graph)
+        self._refresh_module_list()
+        self.undo_stack.clear()  # 불러온 design부터 새 기록 (이전 design을 붙잡고 있지 않음)
+        self.expanded_modules.clear()
+        self._update_undo_buttons()
+
+        job = ChunkedJob(self._materialize_steps(), parent=self)
+        self._io_task = job
+        footer = self._footer()
+        if footer is not None:
+            footer.begin_task(f"Creating {len(self.graph)} layers...", on_cancel=job.cancel)
+            job.progress.connect(footer.set_progress)
+        job.finished.connect(lambda: self._end_io(f"{verb} {len(self.graph)} layers"))
+        job.failed.connect(lambda msg: self._on_materialize_stopped("Load Error", msg))
+        job.cancelled.connect(lambda: self._on_materialize_stopped())
+        job.start()
+
+    def _materialize_steps(self):
+        """graph 전체의 뷰 생성 (ChunkedJob용 generator, (done, total)을 yield)"""
+        self._bulk_depth += 1
+        try:
+            nodes = list(self.graph)
+            total = 2 * len(nodes)
+            for i, node in enumerate(nodes):
+                self._create_layer_view(node)
+                yield i + 1, total
+
+            done = len(nodes)
+            for node in nodes:
+                src = self.layer_items[node.uid]
+                for tgt in node.outputs:
+                    e = EdgeItem(src, self.layer_items[tgt])
+                    self.scene.addItem(e)
+                    self.edges.append(e)
+                done += 1
+                yield done, total
+
+            # sequence 리스트 / 남은 동기화 (edge는 이미 있으므로 update_connections는 diff만 확인)
+            self._finish_bulk_update(layout=False, chain=False)
+        finally:
+            self._bulk_depth -= 1
+
+    def _on_materialize_stopped(self, error_title=None, msg=None):
+        """뷰 생성 도중 취소/실패: 반쯤 만든 design은 버림"""
+        self.clear_canvas()
+        if error_title:
+            self._on_io_failed(error_title, msg)
+        else:
+            self._end_io("Load cancelled")
+
+    def _on_io_failed(self, title, msg):
+        self._end_io()
+        QtWidgets.QMessageBox.critical(self, title, f"Failed:\n{msg}")
+
+    def _end_io(self, message=None):
+        self._io_task = None
+        self.setEnabled(True)
+        footer = self._footer()
+        if footer is not None:
+            footer.end_task(message)
+
+    # ---------------- Undo / Redo ----------------
+    def _on_graph_change(self, op, fields):
+        """NetworkGraph.observer: journal에 기록하고, undo 중이 아니면 열린 undo 명령에 추가"""
+        self.journal.record(op, fields)
+        if not self.undo_stack.applying:
+            self.undo_stack.record(op, fields)
+            self.undo_scheduler.mark_dirty()
+
+    def begin_interaction(self):
+        """마우스 드래그 시작 (CanvasView): 놓을 때까지의 변경은 하나의 undo 명령"""
+        self._interaction_depth += 1
+
+    def end_interaction(self):
+        self._interaction_depth = max(0, self._interaction_depth - 1)
+        if self._interaction_depth == 0:
+            self._close_undo_group()
+
+    def _close_undo_group(self):
+        """열린 undo 명령을 닫음 (드래그 중이면 놓을 때까지 유지). 보류 중인 sequence 재계산도 같은 명령에 포함"""
+        if self._interaction_depth > 0:
+            return
+        self.sequence_scheduler.flush()
+        self.undo_scheduler.cancel()
+        self.undo_stack.end()
+        self._update_undo_buttons()
+
+    def _update_undo_buttons(self):
+        for button, enabled, verb, text in ((self.btn_undo, self.undo_stack.can_undo(), "Undo",
+                                             self.undo_stack.undo_text()),
+                                            (self.btn_redo, self.undo_stack.can_redo(), "Redo",
+                                             self.undo_stack.redo_text())):
+            button.setEnabled(enabled)
+            button.setToolTip(f"{verb} {text}" if text else verb)
+
+    def undo(self):
+        self._apply_undo_step(self.undo_stack.undo)
+
+    def redo(self):
+        self._apply_undo_step(self.undo_stack.redo)
+
+    def _apply_undo_step(self, step):
+        if self._io_task is not None or self._interaction_depth > 0:
+            return
+        self._close_undo_group()
+        cmd = step(self.graph)
+        if cmd is not None:
+            self._sync_views_after(cmd.touched())
+        self._update_undo_buttons()
+
+    def _sync_views_after(self, touched):
+        """undo/redo로 바뀐 부분만 뷰에 반영 (touched: GraphCommand.touched())"""
+        reset = touched["reset"]
+        self._bulk_depth += 1  # setPos -> itemChange는 좌표 동기화만
+        try:
+            # 레이어 뷰: 삭제/추가된 레이어 (reset이면 전체). 복원된 노드는 새 객체이므로 item도 새로 만듦
+            uids = list(self.layer_items) if reset else touched["uids"]
+            for uid in uids:
+                item = self.layer_items.get(uid)
+                if item is not None and (uid not in self.graph or item.node is not self.graph.node(uid)):
+                    del self.layer_items[uid]
+                    self.scene.removeItem(item)
+            for node in (self.graph if reset else (self.graph.node(u) for u in touched["uids"] if u in self.graph)):
+                if node.uid not in self.layer_items:
+                    self._create_layer_view(node)
+
+            moved = self.layer_items if reset else touched["moved"]
+            for uid in moved:
+                item = self.layer_items.get(uid)
+                if item is not None and uid in self.graph:
+                    node = self.graph.node(uid)
+                    if item.pos().x() != node.x or item.pos().y() != node.y:
+                        item.setPos(node.x, node.y)
+                    item.update_edges()
+
+            for uid in touched["params"]:
+                item = self.layer_items.get(uid)
+                if item is not None:
+                    item._refresh_display()
+                self.shape_cache.invalidate(uid)
+        finally:
+            self._bulk_depth -= 1
+
+        if reset or touched["sequence"]:
+            self._rebuild_sequence_list()
+        if reset or touched["edges"] or touched["uids"]:
+            self.update_connections()
+        if reset or touched["input_shape"]:
+            self._sync_input_shape_field()
+        if reset or touched["modules"]:
+            self._refresh_module_views(touched["modules"])
+        self.sequence_scheduler.cancel()  # 뷰 이동으로 예약된 재계산이 복원한 순서/연결을 덮어쓰지 않도록
+        self.schedule_validation()
+        self.refresh_canvas_bounds()
+
+    # ---------------- Autosave / session recovery ----------------
+    @staticmethod
+    def session_directory():
+        base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.GenericDataLocation)
+        return os.path.join(base or os.path.expanduser("~"), "NetworkDesigner", "session")
+
+    @classmethod
+    def benchmark_history_path(cls):
+        return os.path.join(os.path.dirname(cls.session_directory()), "benchmark_history.jsonl")
+
+    def offer_session_recovery(self):
+        """이전 세션이 비정상 종료되어 journal이 남아 있으면 복구를 제안한 뒤 autosave 시작"""
+        if self.journal.has_session():
+            answer = QtWidgets.QMessageBox.question(
+                self, "Recover Session",
+                "이전 세션이 정상 종료되지 않았습니다. 자동 저장된 design을 복구할까요?",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No, QtWidgets.QMessageBox.Yes)
+            graph = None
+            if answer == QtWidgets.QMessageBox.Yes:
+                try:
+                    graph = self.journal.recover()
+                except Exception as e:
+                    QtWidgets.QMessageBox.critical(self, "Recover Session", f"복구하지 못했습니다:\n{e}")
+            if graph is not None:
+                self.adopt_graph(graph, "Recovered")
+            else:
+                self.journal.discard()
+        self.autosave_timer.start()
+
+    def autosave(self):
+        """journal에 쌓인 변경을 파일에 append (필요하면 snapshot으로 compaction)"""
+        if self._io_task is not None:
+            return  # 로드 중에는 graph가 통째로 바뀌는 중
+        try:
+            self.journal.flush(self.graph)
+        except OSError as e:
+            self.autosave_timer.stop()
+            footer = self._footer()
+            if footer is not None:
+                footer.show_temp_message(f"Autosave disabled: {e}", 5000)
+
+    def shutdown(self):
+        """정상 종료: 복구할 필요가 없으므로 세션 파일 삭제"""
+        self.autosave_timer.stop()
+        self.journal.discard()
 
     def clear_canvas(self):
+        self.sequence_scheduler.cancel()
+        self.validation_scheduler.cancel()
+        self.graph.clear()
         # remove scene items
         self.scene.clear()
         self.layer_items.clear()
         self.edges.clear()
-        self.sequence_list.clear()
+        self.sequence_model.sync()
+        self._refresh_module_list()
+        self.refresh_canvas_bounds()
 
     # ---------------- Predefined 모델 추가 함수 ----------------
-    def _expand_placeholder(self, layer_def):
-        """플레이스홀더 모듈(ResidualBlock, Inception 등)을 표준 레이어 시퀀스로 전개해서 반환한다.
-        전개할 수 없는 경우에는 원래 정의를 리스트로 감싸서 반환.
-        """
-        t = layer_def.get("type")
-        params = layer_def.get("params", {})
-
-        if t == "Inception":
-            # Inception 모듈을 단일 시퀀스로 근사 (브랜치 병합은 지원하지 않으므로 순차적으로 배치)
-            in_ch = params.get("in_channels", 192)
-            return [
-                {"type": "Conv2d", "params": {"in_channels": in_ch, "out_channels": params.get("out_1x1", 64), "kernel_size": 1}},
-                {"type": "ReLU", "params": {}},
-
-                {"type": "Conv2d", "params": {"in_channels": in_ch, "out_channels": params.get("out_3x3_reduce", 96), "kernel_size": 1}},
-                {"type": "ReLU", "params": {}},
-                {"type": "Conv2d", "params": {"in_channels": params.get("out_3x3_reduce", 96), "out_channels": params.get("out_3x3", 128), "kernel_size": 3, "padding": 1}},
-                {"type": "ReLU", "params": {}},
-
-                {"type": "Conv2d", "params": {"in_channels": in_ch, "out_channels": params.get("out_5x5_reduce", 16), "kernel_size": 1}},
-                {"type": "ReLU", "params": {}},
-                {"type": "Conv2d", "params": {"in_channels": params.get("out_5x5_reduce", 16), "out_channels": params.get("out_5x5", 32), "kernel_size": 5, "padding": 2}},
-                {"type": "ReLU", "params": {}},
-
-                {"type": "MaxPool2d", "params": {"kernel_size": 3, "stride": 1, "padding": 1}},
-                {"type": "Conv2d", "params": {"in_channels": in_ch, "out_channels": params.get("out_pool_proj", 32), "kernel_size": 1}},
-                {"type": "ReLU", "params": {}},
-            ]
-
-        if t == "ResidualBlock":
-            # Residual block을 두 개의 conv-block 시퀀스로 전개 (skip-connection은 export 단계에서 처리 권장)
-            in_ch = params.get("in_channels", 64)
-            out_ch = params.get("out_channels", 64)
-            stride = params.get("stride", 1)
-            repeats = params.get("repeats", 1)
-            seq = []
-            for r in range(repeats):
-                seq.extend([
-                    {"type": "Conv2d", "params": {"in_channels": in_ch, "out_channels": out_ch, "kernel_size": 3, "stride": stride, "padding": 1}},
-                    {"type": "BatchNorm2d", "params": {"num_features": out_ch}},
-                    {"type": "ReLU", "params": {}},
-                    {"type": "Conv2d", "params": {"in_channels": out_ch, "out_channels": out_ch, "kernel_size": 3, "stride": 1, "padding": 1}},
-                    {"type": "BatchNorm2d", "params": {"num_features": out_ch}},
-                    {"type": "ReLU", "params": {}},
-                ])
-                in_ch = out_ch
-                stride = 1
-            return seq
-
-        # 기본: 변경 없음
-        return [layer_def]
-
     def add_predefined_model_to_canvas(self, list_item):
         model_name = list_item.text()
         layers = self.PREDEFINED_MODELS.get(model_name, [])
@@ -335,39 +887,215 @@ class DesignTab(QtWidgets.QWidget):
             QtWidgets.QMessageBox.warning(self, "Predefined Model", f"No template for {model_name}")
             return
 
-        x_offset = 50
-        y_offset = 50 + self.sequence_list.count() * 100
-
-        # 각 정의를 전개(expand)하여 실제 레이어 시퀀스를 만든다
-        expanded_layers = []
-        for layer_def in layers:
-            expanded = self._expand_placeholder(layer_def)
-            expanded_layers.extend(expanded)
-
-        for layer_def in expanded_layers:
-            layer_type = layer_def.get("type")
-            params = layer_def.get("params", {})
-
-            # 만약 LAYER_TEMPLATES에 타입이 없다면, 기본 템플릿으로 빈 params 사용
-            if layer_type not in LAYER_TEMPLATES:
-                # 일부 레이어(Flatten, Dropout 등)는 템플릿에 없을 수 있으니 허용
-                # LAYER_TEMPLATES가 필요로 하는 키가 있다면 export 시 에러가 날 수 있음
-                pass
-
-            self.layer_uid += 1
-            uid = self.layer_uid
-            item = LayerItem(layer_type, params, uid)
-            item.setPos(x_offset, y_offset)
-            if not hasattr(item, "connections"):
-                item.connections = []
-            self.scene.addItem(item)
-            self.layer_items[uid] = item
-
-            li = QtWidgets.QListWidgetItem(f"{layer_type} #{uid}")
-            li.setData(QtCore.Qt.UserRole, uid)
-            self.sequence_list.addItem(li)
-
-            y_offset += 100  # 다음 레이어 아래로
-
-        self.auto_layout()
-        self.update_connections()
\ No newline at end of file
+        # ResidualBlock / Inception은 레이어 하나로 둠 (ResidualBlock은 expand_module_layer로 한 단계씩 펼침,
+        # Inception은 concat을 캔버스로 표현할 수 없어서 펼치지 않음)
+        # LAYER_TEMPLATES에 없는 타입(AdaptiveAvgPool2d 등)도 params 그대로 허용
+        # 한 번에 추가: layout / 연결 / edge 갱신은 마지막에 한 번만
+        self.add_layers([{"type": d.get("type"), "params": d.get("params", {})} for d in layers])
+
+    # ---------------- Composite modules (expand / collapse) ----------------
+    def _drop_layer_view(self, uid):
+        item = self.layer_items.pop(uid, None)
+        if item is not None:
+            self.scene.removeItem(item)
+
+    def module_owner(self, uid):
+        """uid가 펼친 composite 모듈의 자식이면 그 모듈의 원래 uid (LayerItem 메뉴용), 아니면 None"""
+        return self.expanded_modules.owner(self.graph, uid)
+
+    def expand_module_layer(self, item):
+        """composite 레이어(ResidualBlock / user module)를 자식 레이어들로 한 단계 펼침 (undo 한 번으로 되돌림)"""
+        uid = getattr(item, "uid", item)
+        if self._io_task is not None or uid not in self.graph:
+            return
+        try:
+            expand_children(self.graph, uid)  # 펼칠 수 없으면 undo 명령을 열기 전에 이유를 보여줌
+        except ValueError as e:
+            QtWidgets.QMessageBox.information(self, "Expand Module", str(e))
+            return
+        node = self.graph.node(uid)
+        layer_type, params = node.layer_type, dict(node.params)
+        self._close_undo_group()
+        self.undo_stack.begin(f"Expand {layer_type}")
+        with self.bulk_update(layout=False, chain=False):
+            children = expand_node(self.graph, uid)
+            self._drop_layer_view(uid)
+        self.expanded_modules.add(uid, layer_type, params, children)
+
+    def collapse_module_layer(self, item):
+        """item이 속한 펼친 모듈을 다시 레이어 하나로 접음 (파라미터는 자식들의 현재 값에서 다시 계산)"""
+        uid = getattr(item, "uid", item)
+        if self._io_task is not None:
+            return
+        try:
+            owner, layer_type, params, leaves, lossless = self.expanded_modules.collapse_plan(self.graph, uid)
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "Collapse Module", str(e))
+            return
+        if not lossless:
+            answer = QtWidgets.QMessageBox.question(
+                self, "Collapse Module",
+                f"자식 레이어의 일부 편집은 {layer_type} 파라미터로 표현할 수 없어 접으면 사라집니다. 계속할까요?",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No, QtWidgets.QMessageBox.No)
+            if answer != QtWidgets.QMessageBox.Yes:
+                return
+        self._close_undo_group()
+        self.undo_stack.begin(f"Collapse {layer_type}")
+        with self.bulk_update(layout=False, chain=False):
+            collapse_nodes(self.graph, leaves, layer_type, params, uid=owner)
+            for leaf in leaves:
+                self._drop_layer_view(leaf)
+
+    def toggle_module_layer(self, item):
+        """
+        LayerItem 더블클릭 (graph 상태로 결정): 펼칠 수 있는 composite면 펼치고, 펼친 모듈의 레이어면 그 모듈을 접음.
+        처리했으면 True (그 외 레이어는 False -> 파라미터 편집)
+        """
+        uid = getattr(item, "uid", item)
+        if uid not in self.graph:
+            return False
+        composite = self.graph.node(uid).layer_type in COMPOSITE_TYPES
+        if composite and (is_expandable(self.graph, uid) or self.module_owner(uid) is None):
+            self.expand_module_layer(uid)  # 펼칠 수 없으면 이유를 보여줌
+        elif self.module_owner(uid) is not None:
+            self.collapse_module_layer(uid)
+        else:
+            return False
+        return True
+
+    # ---------------- User modules (정의 하나를 여러 instance가 공유) ----------------
+    def _refresh_module_list(self):
+        names = sorted(self.graph.modules)
+        if [self.module_list.item(i).text() for i in range(self.module_list.count())] != names:
+            self.module_list.clear()
+            self.module_list.addItems(names)
+
+    def _refresh_module_views(self, names):
+        """정의가 바뀐 모듈의 instance 표시를 한 번에 갱신 (shape/비용은 graph.version으로 전체 재검증)"""
+        self._refresh_module_list()
+        for name in names:
+            for uid in self.graph.instances(name):
+                item = self.layer_items.get(uid)
+                if item is not None:
+                    item._refresh_display()
+        self.schedule_validation()
+
+    def _edit_layers_dialog(self, title, layers, note):
+        """레이어 목록 [(type, params)]을 JSON으로 편집. OK면 새 목록, 취소/형식 오류면 None"""
+        dlg = QtWidgets.QDialog(self)
+        dlg.setWindowTitle(title)
+        dlg.resize(520, 480)
+        layout = QtWidgets.QVBoxLayout(dlg)
+        layout.addWidget(QtWidgets.QLabel(note))
+        te = QtWidgets.QPlainTextEdit(json.dumps([{"type": t, "params": p} for t, p in layers],
+                                                 ensure_ascii=False, indent=2))
+        te.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        layout.addWidget(te)
+        btns = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        btns.accepted.connect(dlg.accept)
+        btns.rejected.connect(dlg.reject)
+        layout.addWidget(btns)
+        if dlg.exec_() != QtWidgets.QDialog.Accepted:
+            return None
+        try:
+            doc = json.loads(te.toPlainText())
+            return [(entry["type"], dict(entry.get("params") or {})) for entry in doc]
+        except (ValueError, TypeError, KeyError) as e:
+            QtWidgets.QMessageBox.warning(self, title, f"형식이 잘못되었습니다 ([{{\"type\", \"params\"}}, ...]):\n{e}")
+            return None
+
+    def make_module_from_selection(self):
+        """선택한 레이어들(sequence 순서)로 모듈을 정의하고 그 자리를 instance 하나로 바꿈 (undo 한 번)"""
+        if self._io_task is not None:
+            return
+        self.flush_pending_changes()
+        selected = {item.uid for item in self.scene.selectedItems() if isinstance(item, LayerItem)}
+        uids = [uid for uid in self.graph.sequence if uid in selected]
+        if not uids:
+            QtWidgets.QMessageBox.information(self, "Make Module", "모듈로 만들 레이어를 캔버스에서 선택하세요.")
+            return
+        name, ok = QtWidgets.QInputDialog.getText(self, "Make Module", "모듈 이름 (Python 식별자):",
+                                                  text=f"Block{len(self.graph.modules) + 1}")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if name in self.graph.modules or name in RESERVED_MODULE_NAMES:
+            QtWidgets.QMessageBox.warning(self, "Make Module", f"{name}: 이미 쓰이는 이름입니다.")
+            return
+        layers = [(self.graph.node(uid).layer_type, self.graph.node(uid).params) for uid in uids]
+        try:
+            self.graph.check_module(name, layers)  # undo 명령을 열기 전에 검사 (실패 시 열린 채로 남지 않도록)
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "Make Module", str(e))
+            return
+        self._close_undo_group()
+        self.undo_stack.begin(f"Make module {name}")
+        self.graph.define_module(name, layers)
+        with self.bulk_update(layout=False, chain=False):
+            collapse_nodes(self.graph, uids, MODULE_TYPE, instance_params(name))
+            for uid in uids:
+                self._drop_layer_view(uid)
+        self._refresh_module_list()
+
+    def add_module_instance(self, list_item):
+        """User Modules 목록 더블클릭: 정의를 참조하는 instance를 끝에 추가 (params는 이름뿐)"""
+        self.add_layers([{"type": MODULE_TYPE, "params": instance_params(list_item.text())}])
+
+    def _module_list_menu(self, pos):
+        list_item = self.module_list.itemAt(pos)
+        if list_item is None:
+            return
+        name = list_item.text()
+        in_use = len(self.graph.instances(name))
+        menu = QtWidgets.QMenu(self)
+        edit_action = menu.addAction("Edit Definition")
+        delete_action = menu.addAction(f"Delete ({in_use} in use)" if in_use else "Delete")
+        delete_action.setEnabled(not in_use)
+        action = menu.exec_(self.module_list.viewport().mapToGlobal(pos))
+        if action == edit_action:
+            self.edit_module_definition(name)
+        elif action == delete_action:
+            self._close_undo_group()
+            self.undo_stack.begin(f"Delete module {name}")
+            self.graph.define_module(name, None)
+            self._refresh_module_list()
+
+    def edit_module_definition(self, name):
+        """모듈 정의 편집: 모든 instance가 한 번에 바뀜 (instance의 override는 정의에 남은 키에만 적용)"""
+        definition = self.graph.modules.get(name)
+        if definition is None or self._io_task is not None:
+            return
+        count = len(self.graph.instances(name))
+        layers = self._edit_layers_dialog(f"Module {name}", definition.layers,
+                                          f"{name} 정의 — instance {count}개에 모두 적용됩니다.")
+        if layers is None:
+            return
+        try:
+            self.graph.check_module(name, layers)
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "Edit Module", str(e))
+            return
+        self._close_undo_group()
+        self.undo_stack.begin(f"Edit module {name}")
+        self.graph.define_module(name, layers)
+        self._refresh_module_views({name})
+
+    def edit_module_instance(self, uid):
+        """instance 하나의 파라미터 편집: 정의와 다른 값만 override로 저장"""
+        node = self.graph.get(uid)
+        layers = self.graph.module_layers(node) if node is not None else None
+        if layers is None:
+            name = node.params.get("module") if node is not None else None
+            QtWidgets.QMessageBox.warning(self, "Edit Module", f"정의되지 않은 모듈입니다: {name}")
+            return
+        name = node.params["module"]
+        layers = self._edit_layers_dialog(f"{name} #{uid}", layers,
+                                          "이 instance만 바뀝니다 (레이어 구성은 정의에서 편집).")
+        if layers is None:
+            return
+        try:
+            overrides = self.graph.modules[name].overrides_for(layers)
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "Edit Module", str(e))
+            return
+        self.set_layer_params(uid, instance_params(name, overrides))
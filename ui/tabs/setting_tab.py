@@ -1,6 +1,6 @@
 # tabs/settings_tab.py
 from PyQt5 import QtWidgets, QtCore
-from utils.theme_utils import apply_theme_to_window
+from utils.theme_utils import theme_manager
 
 class SettingsTab(QtWidgets.QWidget):
     theme_changed = QtCore.pyqtSignal(str, str)
@@ -11,10 +11,19 @@ class SettingsTab(QtWidgets.QWidget):
         self._build_ui()
         self._load_saved_settings()
 
+    @staticmethod
+    def open_settings():
+        return QtCore.QSettings("MyCompany", "NetworkDesigner")
+
+    @classmethod
+    def saved_theme_name(cls, default="dark"):
+        """저장된 테마 이름 (탭을 만들지 않고 시작 시 적용하기 위함)"""
+        return str(cls.open_settings().value("theme/name", default)).lower()
+
     def _init_settings(self):
-        self.qsettings = QtCore.QSettings("MyCompany", "NetworkDesigner")
+        self.qsettings = self.open_settings()
 
-        # theme names only; styles are handled by apply_theme_to_window via .qss files
+        # theme names only; styles are handled by ThemeManager via .qss files
         self.themes = ["Light", "Dark", "Gray"]
         self.default_theme = "Dark"
 
@@ -86,18 +95,19 @@ class SettingsTab(QtWidgets.QWidget):
     # -------------------- Slots / Actions --------------------
     def on_theme_selected(self, theme_name):
         """Preview only"""
-        # apply preview to sample widgets via .qss
-        apply_theme_to_window(self, theme_name)
-        apply_theme_to_window(self.preview_label, theme_name)
-        apply_theme_to_window(self.sample_btn, theme_name)
-        apply_theme_to_window(self.sample_lineedit, theme_name)
-        apply_theme_to_window(self.sample_list, theme_name)
+        # 탭 자신에만 한 번 적용 (미리보기 위젯들은 상속). 앱 테마와 같으면 로컬 stylesheet 제거
+        if theme_manager.normalize(theme_name) == theme_manager.current:
+            if self.styleSheet():
+                self.setStyleSheet("")
+        else:
+            theme_manager.apply_to(self, theme_name)
 
     def on_apply(self):
         theme_name = self.theme_combo.currentText().lower()
-        # apply to whole app
-        apply_theme_to_window(self, theme_name)
-        apply_theme_to_window(QtWidgets.QApplication.instance(), theme_name)
+        # apply to whole app (single repolish); preview stylesheet is no longer needed
+        theme_manager.apply(theme_name)
+        if self.styleSheet():
+            self.setStyleSheet("")
 
         # Footer update
         main_window = self.window()
@@ -128,18 +138,14 @@ class SettingsTab(QtWidgets.QWidget):
 
     # -------------------- Persistence --------------------
     def _load_saved_settings(self):
-        name = self.qsettings.value("theme/name", self.default_theme)
-        if name not in self.themes:
-            name = self.default_theme
+        # on_apply는 소문자로 저장하므로 대소문자 구분 없이 찾음
+        saved = str(self.qsettings.value("theme/name", self.default_theme)).lower()
+        name = next((t for t in self.themes if t.lower() == saved), self.default_theme)
 
+        # 앱 전체 테마는 시작 시 main에서 이미 적용됨 (탭은 처음 열릴 때 만들어짐) -> 미리보기만 동기화
         idx = self.theme_combo.findText(name)
         if idx >= 0:
+            self.theme_combo.blockSignals(True)
             self.theme_combo.setCurrentIndex(idx)
-            self.on_theme_selected(name)
-
-        # Apply whole app + Footer
-        apply_theme_to_window(self, name)
-        apply_theme_to_window(QtWidgets.QApplication.instance(), name)
-        main_window = self.window()
-        if hasattr(main_window, "status_bar"):
-            main_window.status_bar.update_style(name)
+            self.theme_combo.blockSignals(False)
+            self.on_theme_selected(name.lower())
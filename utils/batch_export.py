@@ -0,0 +1,211 @@
+# Description: Batch validate + export of a design directory tree across a process pool (Qt-free).
+# Each design's canonical content hash (design_io.design_hash) and the generator fingerprint are kept in an
+# on-disk cache, so unchanged designs are skipped: files whose size/mtime did not change are not even parsed,
+# touched-but-identical files are parsed and hashed but not regenerated. A JSON report lists per-file
+# status, timings and errors.
+# Usage: python main.py batch designs/ -o generated/ [--jobs 8] [--inference] [--force]
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.design_io import load_design, design_hash
+from utils.export_utils import generate_pytorch_code, generator_fingerprint
+from utils.validate_network import validate_network
+
+DESIGN_EXTENSIONS = (".json", ".nnd")
+CACHE_NAME = ".export_cache.json"
+REPORT_NAME = "batch_report.json"
+CACHE_VERSION = 1
+
+# 결과 상태
+OK, SKIPPED, INVALID, ERROR = "ok", "skipped", "invalid", "error"
+
+
+def find_designs(root, exclude=()):
+    """root 아래 design 파일 (상대 경로, 정렬). exclude 디렉터리(출력 폴더 등)는 건너뜀"""
+    root = os.path.abspath(root)
+    excluded = {os.path.abspath(p) for p in exclude}
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if not d.startswith(".") and os.path.join(dirpath, d) not in excluded)
+        for name in filenames:
+            if name.lower().endswith(DESIGN_EXTENSIONS) and name not in (CACHE_NAME, REPORT_NAME):
+                found.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return sorted(found)
+
+
+def output_path_for(rel_path, out_dir):
+    return os.path.join(out_dir, os.path.splitext(rel_path)[0] + ".py")
+
+
+class ExportCache:
+    """
+    {"version", "generator", "inference", "files": {상대 경로: {"size", "mtime", "hash", "status", "message"}}}
+    generator / inference가 다르면 전체 무효
+    """
+    def __init__(self, path, generator, inference):
+        self.path = path
+        self.generator = generator
+        self.inference = bool(inference)
+        self.files = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if (data.get("version") == CACHE_VERSION and data.get("generator") == self.generator
+                and data.get("inference") == self.inference):
+            self.files = data.get("files", {})
+        return self
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {"version": CACHE_VERSION, "generator": self.generator, "inference": self.inference,
+                "files": self.files}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+def convert_one(job):
+    """
+    worker: design 하나 검증 + export. job = (src, dst, inference, known_hash)
+    known_hash와 내용 hash가 같고 출력이 있으면 다시 만들지 않음. 예외는 결과로 돌려줌 (pool이 죽지 않도록)
+    """
+    src, dst, inference, known_hash = job
+    result = {"status": ERROR, "message": "", "hash": None, "load_ms": 0.0, "validate_ms": 0.0, "export_ms": 0.0}
+    try:
+        t0 = time.perf_counter()
+        graph = load_design(src)
+        t1 = time.perf_counter()
+        result["load_ms"] = (t1 - t0) * 1000
+        result["hash"] = design_hash(graph)
+        if result["hash"] == known_hash and os.path.exists(dst):
+            result["status"] = SKIPPED
+            return result
+
+        ok, message = validate_network(graph)
+        t2 = time.perf_counter()
+        result["validate_ms"] = (t2 - t1) * 1000
+        result["message"] = message
+        if not ok:
+            result["status"] = INVALID
+            return result
+
+        code = generate_pytorch_code(graph, inference=inference)
+        directory = os.path.dirname(dst)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = dst + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(code + "\n")
+        os.replace(tmp_path, dst)
+        result["export_ms"] = (time.perf_counter() - t2) * 1000
+        result["status"] = OK
+    except Exception as e:
+        result["message"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def run_batch(src_dir, out_dir, jobs=None, inference=False, force=False, cache_path=None, report_path=None,
+              progress=None):
+    """
+    src_dir 아래 모든 design을 out_dir로 export (디렉터리 구조 유지, 확장자 .py).
+    - jobs: worker process 수 (None: CPU 수, 1: 현재 프로세스에서 순차 실행)
+    - force: 캐시 무시
+    - progress(done, total): 진행 알림
+    반환: report dict (summary + files). report_path(기본 out_dir/batch_report.json)에도 저장
+    """
+    started = time.perf_counter()
+    cache_path = cache_path or os.path.join(out_dir, CACHE_NAME)
+    report_path = report_path or os.path.join(out_dir, REPORT_NAME)
+    cache = ExportCache(cache_path, generator_fingerprint(), inference)
+    if not force:
+        cache.load()
+
+    rel_paths = find_designs(src_dir, exclude=[out_dir])
+    entries = {}
+    pending = []
+    for rel in rel_paths:
+        src = os.path.join(src_dir, rel)
+        dst = output_path_for(rel, out_dir)
+        st = os.stat(src)
+        cached = cache.files.get(rel)
+        if (cached is not None and cached.get("size") == st.st_size and cached.get("mtime") == st.st_mtime
+                and (cached.get("status") != OK or os.path.exists(dst))):
+            # 파일이 그대로면 파싱도 하지 않음 (이전 검증 실패도 그대로 보고)
+            entries[rel] = {"status": SKIPPED if cached["status"] == OK else cached["status"],
+                            "message": cached.get("message", ""), "hash": cached.get("hash"), "cached": True}
+            continue
+        known = None if cached is None or cached.get("status") != OK else cached.get("hash")
+        pending.append((rel, (src, dst, inference, known), st))
+
+    jobs = jobs or os.cpu_count() or 1
+    done = len(entries)
+    total = len(rel_paths)
+    if progress is not None:
+        progress(done, total)
+    if jobs <= 1 or len(pending) <= 1:
+        results = map(convert_one, (job for _, job, _ in pending))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        chunksize = max(1, len(pending) // (jobs * 8))
+        results = executor.map(convert_one, (job for _, job, _ in pending), chunksize=chunksize)
+    try:
+        for (rel, _, st), result in zip(pending, results):
+            entries[rel] = result
+            if result["status"] in (OK, SKIPPED, INVALID):
+                cache.files[rel] = {"size": st.st_size, "mtime": st.st_mtime, "hash": result["hash"],
+                                    "status": OK if result["status"] == SKIPPED else result["status"],
+                                    "message": result["message"]}
+            else:
+                cache.files.pop(rel, None)  # 오류는 다음 실행에서 다시 시도
+            done += 1
+            if progress is not None:
+                progress(done, total)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # 사라진 파일은 캐시에서 제거
+    for rel in list(cache.files):
+        if rel not in entries:
+            del cache.files[rel]
+    cache.save()
+
+    counts = {status: 0 for status in (OK, SKIPPED, INVALID, ERROR)}
+    for entry in entries.values():
+        counts[entry["status"]] += 1
+    report = {
+        "source": os.path.abspath(src_dir), "output": os.path.abspath(out_dir),
+        "generator": cache.generator, "inference": bool(inference), "jobs": jobs,
+        "elapsed_s": time.perf_counter() - started, "summary": counts,
+        "files": [dict(entries[rel], path=rel) for rel in rel_paths],
+    }
+    directory = os.path.dirname(report_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def format_summary(report, max_errors=20):
+    counts = report["summary"]
+    lines = [f"{len(report['files'])} designs in {report['elapsed_s']:.2f}s ({report['jobs']} jobs): "
+             f"{counts[OK]} exported, {counts[SKIPPED]} unchanged, {counts[INVALID]} invalid, {counts[ERROR]} errors"]
+    problems = [f for f in report["files"] if f["status"] in (INVALID, ERROR)]
+    for entry in problems[:max_errors]:
+        first_line = (entry.get("message") or "").splitlines()[0] if entry.get("message") else ""
+        lines.append(f"  [{entry['status']}] {entry['path']}: {first_line}")
+    if len(problems) > max_errors:
+        lines.append(f"  ... {len(problems) - max_errors} more (see report)")
+    return "\n".join(lines)
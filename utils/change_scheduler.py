@@ -0,0 +1,47 @@
+from PyQt5 import QtCore
+
+
+class ChangeScheduler(QtCore.QObject):
+    """
+    변경 알림을 모아서(coalesce) 이벤트 루프 한 턴에 한 번만 콜백을 실행하는 스케줄러.
+    - mark_dirty(): 변경 표시 (여러 번 호출해도 콜백은 한 번)
+    - flush(): 보류 중인 변경을 즉시(동기) 처리 — export/save 전, 드래그 종료 시 사용
+    """
+    def __init__(self, callback, parent=None):
+        super().__init__(parent)
+        self._callback = callback
+        self._dirty = False
+        self._running = False
+
+        # interval 0: 현재 이벤트들을 모두 처리한 다음 턴에 실행
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    def is_dirty(self):
+        return self._dirty
+
+    def mark_dirty(self):
+        self._dirty = True
+        if not self._running and not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self):
+        self._timer.stop()
+        self._dirty = False
+
+    def flush(self, force=False):
+        """보류 중인 변경이 있으면(또는 force) 콜백을 지금 실행"""
+        self._timer.stop()
+        if self._running or not (self._dirty or force):
+            return
+        self._dirty = False
+        self._running = True
+        try:
+            self._callback()
+        finally:
+            self._running = False
+            # 콜백 도중 들어온 변경은 다음 턴에 다시 처리
+            if self._dirty:
+                self._timer.start()
@@ -0,0 +1,125 @@
+# Description: Headless command-line commands (no Qt / display needed), wired into main.py.
+# Usage: python main.py validate design.json [--input-shape 3,224,224] [--json]
+#        python main.py export design.json [-o model.py] [--inference]
+#        python main.py batch designs/ -o generated/ [--jobs N] [--inference] [--force]
+# Exit codes: 0 ok, 1 invalid design / export error, 2 unreadable file.
+import os
+import sys
+import json
+
+from utils.design_io import load_design
+from utils.export_utils import generate_pytorch_code
+from utils.shape_inference import parse_shape
+from utils.validate_network import validate_network
+
+EXIT_OK, EXIT_INVALID, EXIT_UNREADABLE = 0, 1, 2
+
+
+def add_commands(ap):
+    """main.py의 ArgumentParser에 subcommand 추가 (subcommand가 없으면 GUI 실행)"""
+    sub = ap.add_subparsers(dest="command", metavar="command")
+
+    p = sub.add_parser("validate", help="design의 연결/shape 검증 (GUI 없이)")
+    p.add_argument("design", help="design 파일 (.json / .nnd)")
+    p.add_argument("--input-shape", help="배치를 뺀 입력 shape (예: 3,224,224). 기본: design에 저장된 값")
+    p.add_argument("--json", action="store_true", help="결과를 JSON 한 줄로 출력")
+
+    p = sub.add_parser("export", help="design -> PyTorch 코드 생성 (GUI 없이)")
+    p.add_argument("design", help="design 파일 (.json / .nnd)")
+    p.add_argument("-o", "--output", default="-", help="출력 .py 경로 (기본: stdout)")
+    p.add_argument("--inference", action="store_true",
+                   help="inference 최적화 export (Conv+BN folding, Dropout 제거, nn.Sequential, inference_mode)")
+
+    p = sub.add_parser("batch", help="디렉터리 전체 검증 + export (process pool, 변경 없는 design은 캐시로 건너뜀)")
+    p.add_argument("source", help="design 파일(.json / .nnd)을 찾을 디렉터리")
+    p.add_argument("-o", "--output", required=True, help="생성 코드 디렉터리 (source의 구조 유지)")
+    p.add_argument("--jobs", type=int, default=None, help="worker process 수 (기본: CPU 수)")
+    p.add_argument("--inference", action="store_true", help="inference 최적화 export")
+    p.add_argument("--force", action="store_true", help="캐시를 무시하고 모두 다시 생성")
+    p.add_argument("--report", help="report JSON 경로 (기본: <output>/batch_report.json)")
+    return sub
+
+
+def _load(path):
+    try:
+        return load_design(path), None
+    except (OSError, ValueError) as e:
+        return None, f"{path}: {e}"
+
+
+def validate_file(path, input_shape=None):
+    """design 파일 하나 검증: (exit code, message, layer 수)"""
+    graph, error = _load(path)
+    if graph is None:
+        return EXIT_UNREADABLE, error, 0
+    ok, message = validate_network(graph, input_shape)
+    return (EXIT_OK if ok else EXIT_INVALID), message, len(graph)
+
+
+def export_file(path, inference=False):
+    """design 파일 하나 -> 코드 문자열: (exit code, code 또는 오류 메시지)"""
+    graph, error = _load(path)
+    if graph is None:
+        return EXIT_UNREADABLE, error
+    try:
+        return EXIT_OK, generate_pytorch_code(graph, inference=inference)
+    except ValueError as e:
+        return EXIT_INVALID, f"{path}: {e}"
+
+
+def write_text(path, text):
+    """atomic write: tmp -> replace"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def cmd_validate(args):
+    try:
+        input_shape = parse_shape(args.input_shape) if args.input_shape else None
+    except ValueError as e:
+        print(f"--input-shape: {e}", file=sys.stderr)
+        return EXIT_UNREADABLE
+    code, message, n_layers = validate_file(args.design, input_shape)
+    if args.json:
+        print(json.dumps({"design": args.design, "ok": code == EXIT_OK, "layers": n_layers, "message": message},
+                         ensure_ascii=False))
+    else:
+        print(message, file=sys.stdout if code == EXIT_OK else sys.stderr)
+    return code
+
+
+def cmd_export(args):
+    code, text = export_file(args.design, args.inference)
+    if code != EXIT_OK:
+        print(text, file=sys.stderr)
+        return code
+    if args.output == "-":
+        sys.stdout.write(text + "\n")
+    else:
+        write_text(args.output, text + "\n")
+        print(f"{args.design} -> {args.output}", file=sys.stderr)
+    return EXIT_OK
+
+
+def cmd_batch(args):
+    from utils.batch_export import run_batch, format_summary, INVALID, ERROR
+    if not os.path.isdir(args.source):
+        print(f"{args.source}: not a directory", file=sys.stderr)
+        return EXIT_UNREADABLE
+    report = run_batch(args.source, args.output, jobs=args.jobs, inference=args.inference, force=args.force,
+                       report_path=args.report)
+    print(format_summary(report), file=sys.stderr)
+    return EXIT_INVALID if report["summary"][INVALID] or report["summary"][ERROR] else EXIT_OK
+
+
+COMMANDS = {
+    "validate": cmd_validate,
+    "export": cmd_export,
+    "batch": cmd_batch,
+}
+
+
+def run_command(args):
+    return COMMANDS[args.command](args)
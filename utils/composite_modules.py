@@ -0,0 +1,303 @@
+# Description: Collapsed composite modules (ResidualBlock / Inception / user modules) and their on-demand
+# expansion (Qt-free). Inception is never expanded: its branches are concatenated on channels, which the
+# canvas cannot express (a merge is an elementwise sum), so an expansion would change the network.
+# Composite layers stay a single graph node until the user opens them; expand_node replaces the node with its
+# children in place (sequence slot, connections, vertical space) and collapse_nodes puts it back with the
+# parameters re-derived from the (possibly edited) children. Both use NetworkGraph operations only, so the
+# journal and the undo stack record them like any other edit. A user-module instance expands into its
+# definition's layers and collapses back into the definition name plus the changed parameters (overrides).
+from layers.network_graph import MODULE_TYPE, instance_params
+
+COMPOSITE_TYPES = ("ResidualBlock", "Inception", MODULE_TYPE)
+LAYER_GAP = 100  # DesignTab 자동 배치의 세로 간격
+COLUMN_GAP = 220  # branch 자식의 가로 간격 (LayerItem 폭 + 여백)
+ENTRY_TYPE = "Identity"  # 첫 레이어인 블록을 펼칠 때 skip과 본류가 함께 읽을 진입점
+
+# 펼치면 의미가 달라지는 composite: 이유를 보여주고 접힌 채로 둠
+NOT_EXPANDABLE = {
+    "Inception": "Inception은 4개 branch 출력을 channel 방향으로 이어 붙이는데(concat) 캔버스의 merge는 "
+                 "elementwise 합만 지원하므로 펼치지 않습니다. 레이어 하나로 그대로 사용하세요.",
+}
+
+
+def _residual_children(params):
+    """
+    repeats > 1: 반복 하나짜리 ResidualBlock repeats개 (한 단계씩 펼침)
+    repeats == 1: export의 BasicBlock과 같은 구조 — conv-BN-ReLU-conv-BN 다음 ReLU가 skip과의 합을 받음
+    (stride나 channel이 바뀌면 skip은 1x1 conv-BN downsample을 거침, conv는 bias 없음).
+    자식의 "inputs"는 읽는 자식 index (None: 블록 밖 입력), "row"/"column"은 배치 위치
+    """
+    in_ch = params.get("in_channels", 64)
+    out_ch = params.get("out_channels", 64)
+    stride = params.get("stride", 1)
+    repeats = params.get("repeats", 1)
+    if repeats > 1:
+        blocks = []
+        for _ in range(repeats):
+            blocks.append({"type": "ResidualBlock", "params": {"in_channels": in_ch, "out_channels": out_ch,
+                                                               "stride": stride, "repeats": 1}})
+            in_ch = out_ch
+            stride = 1
+        return blocks
+    children = [
+        {"type": "Conv2d", "params": {"in_channels": in_ch, "out_channels": out_ch, "kernel_size": 3, "stride": stride, "padding": 1, "bias": False}},
+        {"type": "BatchNorm2d", "params": {"num_features": out_ch}},
+        {"type": "ReLU", "params": {}},
+        {"type": "Conv2d", "params": {"in_channels": out_ch, "out_channels": out_ch, "kernel_size": 3, "stride": 1, "padding": 1, "bias": False}},
+        {"type": "BatchNorm2d", "params": {"num_features": out_ch}},
+    ]
+    skip = [None]
+    if stride != 1 or in_ch != out_ch:
+        children += [
+            {"type": "Conv2d", "params": {"in_channels": in_ch, "out_channels": out_ch, "kernel_size": 1, "stride": stride, "bias": False},
+             "inputs": [None], "row": 3, "column": 1},
+            {"type": "BatchNorm2d", "params": {"num_features": out_ch}, "inputs": [5], "row": 4, "column": 1},
+        ]
+        skip = [6]
+    children.append({"type": "ReLU", "params": {}, "inputs": [4] + skip, "row": 5})
+    return children
+
+
+def child_inputs(children):
+    """자식별 입력 index 목록 (None: 블록 밖 입력). "inputs"가 없으면 직렬 (첫 자식만 밖에서 읽음)"""
+    return [list(c["inputs"]) if "inputs" in c else ([i - 1] if i else [None]) for i, c in enumerate(children)]
+
+
+def _without_entry(children):
+    """expand_node가 블록 밖 입력이 없을 때 앞에 둔 Identity 진입점은 빼고 비교"""
+    if children and children[0]["type"] == ENTRY_TYPE and not children[0]["params"]:
+        return children[1:]
+    return children
+
+
+def expand_module(layer_type, params, modules=None):
+    """
+    composite 레이어의 한 단계 아래 자식 정의 목록 [{"type", "params"}], 전개할 수 없으면 None.
+    modules: NetworkGraph.modules (MODULE_TYPE instance 전개용)
+    """
+    if layer_type == MODULE_TYPE:
+        definition = (modules or {}).get((params or {}).get("module"))
+        if definition is None:
+            return None
+        return [{"type": t, "params": p} for t, p in definition.resolve((params or {}).get("overrides"))]
+    if layer_type == "ResidualBlock":
+        return _residual_children(params or {})
+    return None
+
+
+def expand_children(graph, uid):
+    """graph 노드 uid를 펼칠 자식 정의 목록. 펼칠 수 없으면 사용자에게 보여줄 이유를 담은 ValueError"""
+    node = graph.node(uid)
+    if node.layer_type in NOT_EXPANDABLE:
+        raise ValueError(NOT_EXPANDABLE[node.layer_type])
+    children = expand_module(node.layer_type, node.params, graph.modules)
+    if not children:
+        if node.layer_type == MODULE_TYPE:
+            raise ValueError(f"정의되지 않은 모듈입니다: {(node.params or {}).get('module')}")
+        raise ValueError(f"{node.layer_type}은(는) 펼칠 수 없습니다.")
+    return children
+
+
+def is_expandable(graph, uid):
+    try:
+        expand_children(graph, uid)
+    except ValueError:
+        return False
+    return True
+
+
+def collapse_params(layer_type, children, base=None, modules=None):
+    """
+    자식 정의 목록에서 composite 파라미터를 다시 계산 (base의 나머지 키는 유지).
+    구조를 알아볼 수 없으면 None
+    """
+    params = dict(base or {})
+    children = _without_entry(children)
+    if layer_type == MODULE_TYPE:
+        name = params.get("module")
+        definition = (modules or {}).get(name)
+        if definition is None or [c["type"] for c in children] != [t for t, _ in definition.layers]:
+            return None
+        # 정의에 있는 키만 override로 (없는 키를 더한 편집은 round_trips에서 걸림)
+        overrides = {}
+        for i, (child, (_, def_params)) in enumerate(zip(children, definition.layers)):
+            diff = {k: v for k, v in child["params"].items() if k in def_params and def_params[k] != v}
+            if diff:
+                overrides[str(i)] = diff
+        return instance_params(name, overrides)
+    if layer_type == "ResidualBlock":
+        if not children:
+            return None
+        first = children[0]
+        if first["type"] == "ResidualBlock":
+            params.update({"in_channels": first["params"].get("in_channels"),
+                           "out_channels": children[-1]["params"].get("out_channels"),
+                           "stride": first["params"].get("stride", 1),
+                           "repeats": sum(c["params"].get("repeats", 1) for c in children)})
+            return params
+        if first["type"] != "Conv2d" or len(children) < 4 or children[3]["type"] != "Conv2d":
+            return None
+        params.update({"in_channels": first["params"].get("in_channels"),
+                       "out_channels": children[3]["params"].get("out_channels"),
+                       "stride": first["params"].get("stride", 1), "repeats": 1})
+        return params
+    return None
+
+
+def round_trips(layer_type, params, children, modules=None):
+    """params를 다시 펼쳤을 때 children과 같은지 (다르면 자식에서 한 편집 일부가 접으면서 사라짐)"""
+    expected = expand_module(layer_type, params, modules)
+    return expected is not None and [(d["type"], d["params"]) for d in expected] == \
+        [(c["type"], c["params"]) for c in _without_entry(children)]
+
+
+# ---------------- Graph operations ----------------
+def expand_node(graph, uid, gap=LAYER_GAP):
+    """
+    composite 노드를 자식 노드들로 교체하고 자식 uid 목록을 반환 (펼칠 수 없으면 graph를 바꾸기 전에 ValueError).
+    자식은 composite 자리에 놓고 (branch는 오른쪽 열), 그 아래 레이어는 늘어난 만큼 내림.
+    블록 밖 입력을 여러 자식이 읽는데 (skip) 노드에 입력이 없으면 (모델 입력) Identity 진입점을 앞에 둠
+    """
+    node = graph.node(uid)
+    children = expand_children(graph, uid)
+    inputs = child_inputs(children)
+    rows = [c.get("row", i) for i, c in enumerate(children)]
+    if not node.inputs and sum(srcs.count(None) for srcs in inputs) > 1:
+        children = [{"type": ENTRY_TYPE, "params": {}}] + children
+        inputs = [[None]] + [[0 if i is None else i + 1 for i in srcs] for srcs in inputs]
+        rows = [0] + [r + 1 for r in rows]
+    extra = max(rows) * gap
+    for other in list(graph):
+        if other.uid != uid and other.y > node.y:
+            graph.set_pos(other.uid, other.x, other.y + extra)
+
+    uids = [graph.add_node(d["type"], d["params"], append_to_sequence=False,
+                           pos=(node.x + d.get("column", 0) * COLUMN_GAP, node.y + row * gap)).uid
+            for d, row in zip(children, rows)]
+    _splice(graph, [uid], uids, inputs)
+    return uids
+
+
+def collapse_nodes(graph, child_uids, layer_type, params, gap=LAYER_GAP, uid=None):
+    """
+    expand_node의 역: 자식 노드들을 composite 노드 하나로 교체하고 그 uid를 반환.
+    uid: 펼치기 전 원래 uid (다시 쓰면 중첩해서 펼친 바깥 모듈의 기록이 유효하게 남음), None이면 새 uid
+    """
+    first = graph.node(child_uids[0])
+    bottom = max(graph.node(u).y for u in child_uids)
+    node = graph.add_node(layer_type, params, uid=uid, pos=(first.x, first.y), append_to_sequence=False)
+    _splice(graph, child_uids, [node.uid])
+    extra = bottom - first.y
+    members = set(child_uids)
+    for other in list(graph):
+        if other.uid not in members and other.uid != node.uid and other.y > bottom:
+            graph.set_pos(other.uid, other.x, other.y - extra)
+    return node.uid
+
+
+def _splice(graph, old_uids, new_uids, inputs=None):
+    """
+    old_uids(구간)를 new_uids로 교체: 구간 밖에서 들어오던 연결은 블록 밖 입력을 읽는 새 노드(inputs의 None 자리)로,
+    구간 밖으로 나가던 연결은 마지막 새 노드에서 나가도록 옮기고, 새 노드끼리는 inputs대로 잇고 (기본: 직렬),
+    sequence에서 old 구간 자리에 넣은 뒤 old 노드 삭제
+    """
+    old = set(old_uids)
+    inputs = child_inputs([{} for _ in new_uids]) if inputs is None else inputs
+    # 블록 밖 입력은 inputs에서 None이 있던 자리로 (병합 입력 순서를 정의대로: 예) 본류 + skip)
+    heads = {new_uids[i]: srcs.index(None) for i, srcs in enumerate(inputs) if None in srcs}
+    tail = new_uids[-1]
+    for tgt, srcs in zip(new_uids, inputs):
+        for i in srcs:
+            if i is not None:
+                graph.connect(new_uids[i], tgt)
+    for uid in old_uids:
+        node = graph.node(uid)
+        for src in list(node.inputs):
+            if src not in old:
+                for head in heads:
+                    graph.connect(src, head, graph.node(src).outputs.index(uid), heads[head])
+                    heads[head] += 1
+        for tgt in list(node.outputs):
+            if tgt not in old:
+                graph.connect(tail, tgt, None, graph.node(tgt).inputs.index(uid))
+
+    seq = list(graph.sequence)
+    positions = [i for i, uid in enumerate(seq) if uid in old]
+    at = positions[0] if positions else len(seq)
+    seq = [uid for uid in seq[:at] if uid not in old] + list(new_uids) + [uid for uid in seq[at:] if uid not in old]
+    graph.set_sequence(seq)
+    for uid in old_uids:
+        graph.remove_node(uid)
+
+
+# ---------------- Expanded module bookkeeping ----------------
+class ExpandedModules:
+    """
+    펼친 composite 기록: 원래 uid -> (type, params, 자식 uid 목록).
+    undo/redo로 graph가 바뀌어도 기록은 그대로 두고 조회할 때 유효성(원래 노드가 없고 자식이 모두 있음)을 확인함
+    — redo로 같은 uid들이 돌아오면 다시 접을 수 있음. 자식이 다시 펼쳐져 있어도 됨 (중첩)
+    """
+    def __init__(self):
+        self.records = {}
+        self._parent = {}  # 자식 uid -> 원래 composite uid
+
+    def clear(self):
+        self.records.clear()
+        self._parent.clear()
+
+    def add(self, uid, layer_type, params, child_uids):
+        self.records[uid] = (layer_type, dict(params), list(child_uids))
+        for child in child_uids:
+            self._parent[child] = uid
+
+    def leaves(self, graph, uid):
+        """펼친 uid의 현재 말단 노드 (펼친 자식은 그 자식들로), 기록이 깨졌으면 None"""
+        record = self.records.get(uid)
+        if record is None or uid in graph:
+            return None
+        out = []
+        for child in record[2]:
+            if child in graph:
+                out.append(child)
+            else:
+                sub = self.leaves(graph, child)
+                if sub is None:
+                    return None
+                out.extend(sub)
+        return out
+
+    def owner(self, graph, uid):
+        """uid를 자식으로 가진 (유효한) 펼친 모듈의 원래 uid, 없으면 None"""
+        parent = self._parent.get(uid)
+        if parent is not None and self.leaves(graph, parent) is not None:
+            return parent
+        return None
+
+    def collapse_plan(self, graph, uid):
+        """
+        uid가 속한 펼친 모듈을 접을 계획: (원래 uid, type, params, 말단 uid 목록, 자식 편집이 모두 보존되는지).
+        펼친 모듈의 자식이 아니거나 자식 구성이 바뀌어 접을 수 없으면 ValueError
+        """
+        owner = self.owner(graph, uid)
+        if owner is None:
+            raise ValueError(f"#{uid}은(는) 펼친 모듈의 레이어가 아닙니다.")
+        layer_type, old_params, _ = self.records[owner]
+        children = self.children(graph, owner)
+        params = collapse_params(layer_type, children, old_params, graph.modules)
+        if params is None:
+            raise ValueError(f"자식 레이어 구성이 바뀌어 {layer_type}(으)로 접을 수 없습니다.")
+        lossless = round_trips(layer_type, params, children, graph.modules)
+        return owner, layer_type, params, self.leaves(graph, owner), lossless
+
+    def children(self, graph, uid):
+        """펼친 모듈의 직접 자식 정의 목록 (접을 때 collapse_params 입력). 펼쳐진 자식은 기록된 정의를 다시 계산"""
+        out = []
+        for child in self.records[uid][2]:
+            if child in graph:
+                node = graph.node(child)
+                out.append({"type": node.layer_type, "params": node.params})
+            else:
+                layer_type, params, _ = self.records[child]
+                sub = collapse_params(layer_type, self.children(graph, child), params, graph.modules)
+                out.append({"type": layer_type, "params": sub if sub is not None else params})
+        return out
@@ -0,0 +1,310 @@
+# Description: Qt-free cost model — parameters, multiply-accumulates (MACs) and activation memory per layer.
+# Uses the shapes from utils.shape_inference (batch dimension excluded); unknown dims give unknown (None) costs.
+from layers.network_graph import MODULE_TYPE
+from utils.shape_inference import INCEPTION_BRANCHES, ShapeCache, _pair, _prod, infer_layer_shape
+
+
+class LayerCost:
+    """레이어 한 개의 비용 (batch 1 기준, 모르면 None)"""
+    __slots__ = ("params", "macs", "activations")
+
+    def __init__(self, params=0, macs=0, activations=0):
+        self.params = params            # 학습 파라미터 수
+        self.macs = macs                # multiply-accumulate 수 (샘플 1개)
+        self.activations = activations  # 출력 activation 원소 수 (샘플 1개)
+
+    def __eq__(self, other):
+        return (isinstance(other, LayerCost) and
+                (self.params, self.macs, self.activations) == (other.params, other.macs, other.activations))
+
+    def __repr__(self):
+        return f"LayerCost(params={self.params}, macs={self.macs}, activations={self.activations})"
+
+
+# ---------------- Formatting ----------------
+def format_count(n):
+    if n is None:
+        return "?"
+    for unit, div in (("G", 1e9), ("M", 1e6), ("K", 1e3)):
+        if abs(n) >= div:
+            return f"{n / div:.1f}{unit}"
+    return str(int(n))
+
+
+def format_bytes(n):
+    if n is None:
+        return "?"
+    for unit, div in (("GB", 1 << 30), ("MB", 1 << 20), ("KB", 1 << 10)):
+        if abs(n) >= div:
+            return f"{n / div:.1f}{unit}"
+    return f"{int(n)}B"
+
+
+# ---------------- Per-layer cost rules ----------------
+# rule(params, in_shape, out_shape) -> (param_count, macs)
+
+def _conv_cost(cin, cout, k, out_hw, bias=True, groups=1):
+    """k x k conv 한 개의 (params, macs). out_hw: 출력 H*W (None이면 macs unknown)"""
+    if cin is None or cout is None:
+        return None, None
+    weights = cout * (cin // max(groups, 1)) * k * k
+    params = weights + (cout if bias else 0)
+    macs = None if out_hw is None else weights * out_hw
+    return params, macs
+
+
+def _no_cost(params, in_shape, out_shape):
+    return 0, 0
+
+
+def _linear(params, in_shape, out_shape):
+    in_f = params.get("in_features")
+    out_f = params.get("out_features")
+    if in_f is None or out_f is None:
+        return None, None
+    n_params = in_f * out_f + (out_f if params.get("bias", True) else 0)
+    rows = _prod(out_shape[:-1]) if out_shape else 1
+    return n_params, None if rows is None else in_f * out_f * rows
+
+
+def _conv2d(params, in_shape, out_shape):
+    kh, kw = _pair(params.get("kernel_size"), 3)
+    cin, cout = params.get("in_channels"), params.get("out_channels")
+    groups = params.get("groups", 1) or 1
+    if cin is None or cout is None:
+        return None, None
+    weights = cout * (cin // groups) * kh * kw
+    n_params = weights + (cout if params.get("bias", True) else 0)
+    hw = _prod(out_shape[1:]) if out_shape and len(out_shape) == 3 else None
+    return n_params, None if hw is None else weights * hw
+
+
+def _batchnorm2d(params, in_shape, out_shape):
+    num = params.get("num_features")
+    affine = params.get("affine", True)
+    n_params = (2 * num if affine else 0) if num is not None else None
+    # scale + shift per element
+    return n_params, _prod(out_shape) if out_shape else None
+
+
+def _avgpool(params, in_shape, out_shape):
+    kh, kw = _pair(params.get("kernel_size"), 2)
+    elems = _prod(out_shape) if out_shape else None
+    return 0, None if elems is None else elems * kh * kw
+
+
+def _adaptive_avgpool(params, in_shape, out_shape):
+    return 0, _prod(in_shape) if in_shape else None
+
+
+def _lstm(params, in_shape, out_shape):
+    in_f = params.get("input_size")
+    hidden = params.get("hidden_size")
+    layers = params.get("num_layers", 1) or 1
+    dirs = 2 if params.get("bidirectional", False) else 1
+    if in_f is None or hidden is None:
+        return None, None
+    steps = in_shape[0] if in_shape and len(in_shape) == 2 else None
+    n_params = 0
+    macs_per_step = 0
+    layer_in = in_f
+    for _ in range(layers):
+        gates = 4 * hidden * (layer_in + hidden)
+        n_params += dirs * (gates + 8 * hidden)  # weight_ih, weight_hh + bias_ih, bias_hh
+        macs_per_step += dirs * gates
+        layer_in = hidden * dirs
+    return n_params, None if steps is None else macs_per_step * steps
+
+
+def _residual_block(params, in_shape, out_shape):
+    """
+    ResidualBlock(in, out, stride, repeats): 반복마다 3x3 conv-BN-ReLU-3x3 conv-BN (+ skip),
+    첫 반복에서 stride != 1 또는 채널이 바뀌면 1x1 conv + BN downsample.
+    (export_utils에서 생성하는 ResidualBlock 정의와 동일)
+    """
+    cin, cout = params.get("in_channels"), params.get("out_channels")
+    repeats = params.get("repeats", 1) or 1
+    stride = params.get("stride", 1)
+    if cin is None or cout is None:
+        return None, None
+    hw = _prod(out_shape[1:]) if out_shape and len(out_shape) == 3 else None
+    n_params = 0
+    macs = 0
+    for r in range(repeats):
+        block_in = cin if r == 0 else cout
+        for ci in (block_in, cout):
+            p, m = _conv_cost(ci, cout, 3, hw, bias=False)
+            n_params += p + 2 * cout  # conv + BN(affine)
+            macs = None if macs is None or m is None else macs + m + cout * hw
+        if r == 0 and (stride != 1 or cin != cout):
+            p, m = _conv_cost(cin, cout, 1, hw, bias=False)
+            n_params += p + 2 * cout
+            macs = None if macs is None or m is None else macs + m + cout * hw
+    return n_params, macs
+
+
+def _inception(params, in_shape, out_shape):
+    """Inception v1: 1x1 / 1x1→3x3 / 1x1→5x5 / 3x3 maxpool→1x1 (bias 있는 conv + ReLU)"""
+    cin = params.get("in_channels")
+    if cin is None or any(params.get(k) is None for k in INCEPTION_BRANCHES):
+        return None, None
+    hw = _prod(out_shape[1:]) if out_shape and len(out_shape) == 3 else None
+    convs = [
+        (cin, params["out_1x1"], 1),
+        (cin, params.get("out_3x3_reduce", params["out_3x3"]), 1),
+        (params.get("out_3x3_reduce", params["out_3x3"]), params["out_3x3"], 3),
+        (cin, params.get("out_5x5_reduce", params["out_5x5"]), 1),
+        (params.get("out_5x5_reduce", params["out_5x5"]), params["out_5x5"], 5),
+        (cin, params["out_pool_proj"], 1),
+    ]
+    n_params = 0
+    macs = 0
+    for ci, co, k in convs:
+        p, m = _conv_cost(ci, co, k, hw)
+        n_params += p
+        macs = None if macs is None or m is None else macs + m
+    return n_params, macs
+
+
+COST_RULES = {
+    "Linear": _linear,
+    "Conv2d": _conv2d,
+    "ReLU": _no_cost,
+    "Flatten": _no_cost,
+    "Dropout": _no_cost,
+    "BatchNorm2d": _batchnorm2d,
+    "MaxPool2d": _no_cost,
+    "AvgPool2d": _avgpool,
+    "AdaptiveAvgPool2d": _adaptive_avgpool,
+    "LSTM": _lstm,
+    "ResidualBlock": _residual_block,
+    "ResBlock": _residual_block,
+    "Inception": _inception,
+}
+
+
+def _module_cost(params, in_shape, modules):
+    """사용자 정의 모듈: 정의의 레이어들을 shape를 이어 가며 합산"""
+    definition = modules.get(params.get("module"))
+    if definition is None:
+        return None, None
+    n_params, macs = 0, 0
+    shape = in_shape
+    for layer_type, layer_params in definition.resolve(params.get("overrides")):
+        out_shape, _ = infer_layer_shape(layer_type, layer_params, shape)
+        cost = layer_cost(layer_type, layer_params, shape, out_shape)
+        n_params = None if n_params is None or cost.params is None else n_params + cost.params
+        macs = None if macs is None or cost.macs is None else macs + cost.macs
+        shape = out_shape
+    return n_params, macs
+
+
+def layer_cost(layer_type, params, in_shape, out_shape, modules=None):
+    """레이어 하나의 LayerCost (규칙이 없는 타입은 파라미터/연산 0으로 간주, modules: MODULE_TYPE 정의)"""
+    try:
+        if layer_type == MODULE_TYPE:
+            n_params, macs = _module_cost(params or {}, in_shape, modules or {})
+        else:
+            n_params, macs = COST_RULES.get(layer_type, _no_cost)(params or {}, in_shape, out_shape)
+    except (TypeError, ValueError):
+        n_params, macs = None, None
+    acts = _prod(out_shape) if out_shape else None
+    return LayerCost(n_params, macs, acts)
+
+
+class CostTotals:
+    """전체 합계 (알 수 없는 값은 unknown 개수로 따로 셈)"""
+    __slots__ = ("params", "macs", "activations", "unknown")
+
+    def __init__(self):
+        self.params = 0
+        self.macs = 0
+        self.activations = 0
+        self.unknown = 0
+
+    def add(self, cost, sign=1):
+        for name in ("params", "macs", "activations"):
+            v = getattr(cost, name)
+            if v is None:
+                self.unknown += sign
+            else:
+                setattr(self, name, getattr(self, name) + sign * v)
+
+
+class CostCache:
+    """
+    ShapeCache 결과 위에서 레이어별 비용을 메모이제이션.
+    update()는 ShapeCache가 마지막에 다시 계산한 레이어만 비용을 다시 구하고 합계는 차분으로 갱신한다.
+    """
+    def __init__(self, shape_cache, batch_size=1, dtype_bytes=4):
+        self.shape_cache = shape_cache
+        self.batch_size = batch_size
+        self.dtype_bytes = dtype_bytes
+        self.costs = {}  # uid -> LayerCost
+        self.totals = CostTotals()
+
+    def update(self):
+        """ShapeCache.update() 직후 호출. 비용이 바뀐 uid 목록 반환"""
+        sc = self.shape_cache
+        if sc.last_full:
+            old = self.costs
+            self.costs = {}
+            self.totals = CostTotals()
+            changed = []
+            for uid, ls in sc.results.items():
+                cost = layer_cost(ls.layer_type, self._params_of(uid), ls.in_shape, ls.out_shape, sc.graph.modules)
+                self.costs[uid] = cost
+                self.totals.add(cost)
+                if old.get(uid) != cost:
+                    changed.append(uid)
+            return changed
+
+        changed = []
+        for uid in sc.last_evaluated_uids:
+            ls = sc.results.get(uid)
+            if ls is None:
+                continue
+            cost = layer_cost(ls.layer_type, self._params_of(uid), ls.in_shape, ls.out_shape, sc.graph.modules)
+            old = self.costs.get(uid)
+            if old == cost:
+                continue
+            if old is not None:
+                self.totals.add(old, -1)
+            self.totals.add(cost)
+            self.costs[uid] = cost
+            changed.append(uid)
+        return changed
+
+    def _params_of(self, uid):
+        node = self.shape_cache.graph.get(uid)
+        return node.params if node is not None else {}
+
+    # ---------------- Summaries ----------------
+    def activation_bytes(self, cost_or_totals):
+        acts = cost_or_totals.activations
+        return None if acts is None else acts * self.batch_size * self.dtype_bytes
+
+    def summary_text(self):
+        t = self.totals
+        text = (f"Params {format_count(t.params)} · MACs {format_count(t.macs * self.batch_size)} · "
+                f"Act {format_bytes(self.activation_bytes(t))} (batch {self.batch_size})")
+        if t.unknown:
+            text += f" · {t.unknown} unknown"
+        return text
+
+
+def layer_cost_text(cost, dtype_bytes=4):
+    """LayerItem 요약용 한 줄, 샘플 1개 기준 (예: '448 p · 1.2M MAC · 3.1MB act')"""
+    if cost is None:
+        return ""
+    act = None if cost.activations is None else cost.activations * dtype_bytes
+    return f"{format_count(cost.params)} p · {format_count(cost.macs)} MAC · {format_bytes(act)} act"
+
+
+def estimate_costs(graph, input_shape=None, batch_size=1, dtype_bytes=4):
+    """전체 그래프 비용을 한 번에 계산 (headless 용). CostCache 반환"""
+    sc = ShapeCache(graph, input_shape)
+    sc.update()
+    cc = CostCache(sc, batch_size, dtype_bytes)
+    cc.update()
+    return cc
@@ -0,0 +1,277 @@
+# Description: Compact columnar design format (.nnd), Qt-free.
+# Layers are stored as column arrays (uid, type id, param id, x, y, connection offsets/targets) plus
+# interned type / parameter tables, optionally gzip- or lzma-compressed. Uncompressed files load via mmap,
+# compressed files are decompressed as a stream; both round-trip losslessly with the JSON format.
+#
+# Layout (little-endian):
+#   header  : magic b"NNDB", u8 version, u8 compression (0 none / 1 gzip / 2 lzma), 2 pad bytes
+#   body    : (compressed as a whole when compression != 0)
+#     counts      : u64 layers, u32 types, u32 params, u64 edges, u64 sequence
+#     types       : types  x (u32 len + utf-8 name)
+#     params      : params x (u32 len + utf-8 JSON object)
+#     input_shape : u32 len + utf-8 JSON (len 0 -> None)
+#     modules     : u32 len + utf-8 JSON (design_io.modules_to_doc, len 0 -> 없음) — version 2부터
+#     columns     : uid i64[n], type_id u32[n], param_id u32[n], x f64[n], y f64[n],
+#                   conn_offsets u32[n + 1], conn_targets i64[edges], sequence i64[seq]
+import os
+import sys
+import json
+import gzip
+import lzma
+import mmap
+import struct
+import argparse
+from array import array
+
+from layers.network_graph import NetworkGraph
+from utils.design_io import (_serialize_for_json, _coerce_loaded_value, populate_graph, read_design,
+                             design_into_graph, modules_to_doc, modules_from_doc)
+
+MAGIC = b"NNDB"
+VERSION = 2
+HEADER = struct.Struct("<4sBB2x")
+COUNTS = struct.Struct("<QIIQQ")
+U32 = struct.Struct("<I")
+
+COMPRESSIONS = {None: 0, "none": 0, "gzip": 1, "lzma": 2}
+COMPRESSION_NAMES = {0: "none", 1: "gzip", 2: "lzma"}
+DEFAULT_EXTENSION = ".nnd"
+
+# typecode 크기는 플랫폼마다 다를 수 있어 고정 크기만 사용
+assert array("I").itemsize == 4 and array("q").itemsize == 8 and array("d").itemsize == 8
+_SWAP = sys.byteorder != "little"
+
+
+def _params_key(params):
+    """파라미터 intern 키: JSON 형식과 같은 직렬화 (키 순서 유지 -> export 결과도 동일)"""
+    return json.dumps(_serialize_for_json(params or {}), ensure_ascii=False, separators=(",", ":"))
+
+
+def _to_bytes(arr):
+    if _SWAP:
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+# ---------------- Write ----------------
+def _iter_body_chunks(graph):
+    nodes = list(graph)
+    type_ids, types = {}, []
+    param_ids, params = {}, []
+    uid_col, type_col, param_col = array("q"), array("I"), array("I")
+    x_col, y_col = array("d"), array("d")
+    offsets, targets = array("I", [0]), array("q")
+
+    for node in nodes:
+        tid = type_ids.get(node.layer_type)
+        if tid is None:
+            tid = type_ids[node.layer_type] = len(types)
+            types.append(node.layer_type)
+        key = _params_key(node.params)
+        pid = param_ids.get(key)
+        if pid is None:
+            pid = param_ids[key] = len(params)
+            params.append(key)
+        uid_col.append(node.uid)
+        type_col.append(tid)
+        param_col.append(pid)
+        x_col.append(node.x)
+        y_col.append(node.y)
+        targets.extend(node.outputs)
+        offsets.append(len(targets))
+
+    sequence = array("q", graph.sequence)
+    shape = b"" if graph.input_shape is None else json.dumps(list(graph.input_shape)).encode("utf-8")
+    modules = b"" if not graph.modules else json.dumps(modules_to_doc(graph.modules), ensure_ascii=False,
+                                                        separators=(",", ":")).encode("utf-8")
+
+    yield COUNTS.pack(len(nodes), len(types), len(params), len(targets), len(sequence))
+    for name in types:
+        raw = (name or "").encode("utf-8")
+        yield U32.pack(len(raw)) + raw
+    for key in params:
+        raw = key.encode("utf-8")
+        yield U32.pack(len(raw)) + raw
+    yield U32.pack(len(shape)) + shape
+    yield U32.pack(len(modules)) + modules
+    for col in (uid_col, type_col, param_col, x_col, y_col, offsets, targets, sequence):
+        yield _to_bytes(col)
+
+
+def save_binary(graph, path, compression="gzip"):
+    """graph -> .nnd 파일 (atomic write: tmp -> replace)"""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"unknown compression {compression!r} (none / gzip / lzma)")
+    code = COMPRESSIONS[compression]
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as raw:
+        raw.write(HEADER.pack(MAGIC, VERSION, code))
+        if code == 1:
+            out = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6)
+        elif code == 2:
+            out = lzma.LZMAFile(raw, mode="wb")
+        else:
+            out = raw
+        for chunk in _iter_body_chunks(graph):
+            out.write(chunk)
+        if out is not raw:
+            out.close()
+    os.replace(tmp_path, path)
+
+
+# ---------------- Read ----------------
+class _MemoryReader:
+    """mmap(또는 bytes) 위에서 복사 없이 slice를 돌려주는 reader"""
+    def __init__(self, buf, pos=0):
+        self.view = memoryview(buf)
+        self.pos = pos
+
+    def read(self, n):
+        end = self.pos + n
+        if end > len(self.view):
+            raise ValueError("truncated design file")
+        chunk = self.view[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def release(self):
+        self.view.release()
+
+
+class _StreamReader:
+    """압축 스트림에서 필요한 만큼만 읽는 reader"""
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+
+    def read(self, n):
+        data = self.fileobj.read(n)
+        if len(data) != n:
+            raise ValueError("truncated design file")
+        return data
+
+    def release(self):
+        pass
+
+
+def _read_array(reader, typecode, count):
+    arr = array(typecode)
+    if count:
+        chunk = reader.read(count * arr.itemsize)
+        arr.frombytes(chunk)
+        if isinstance(chunk, memoryview):
+            chunk.release()
+        if _SWAP:
+            arr.byteswap()
+    return arr
+
+
+def _read_str(reader):
+    (n,) = U32.unpack(reader.read(U32.size))
+    return str(reader.read(n), "utf-8") if n else ""
+
+
+class BinaryDesign:
+    """.nnd 파일의 column 데이터 (그래프로 만들기 전 단계)"""
+    __slots__ = ("types", "params", "input_shape", "modules", "uids", "type_ids", "param_ids",
+                 "xs", "ys", "conn_offsets", "conn_targets", "sequence", "compression")
+
+    def __len__(self):
+        return len(self.uids)
+
+    def layers(self):
+        """(uid, type, params, (x, y), connections) 튜플 생성 (design_io.populate_graph 입력 형식)"""
+        types, params = self.types, self.params
+        offsets, targets = self.conn_offsets, self.conn_targets
+        for i, uid in enumerate(self.uids):
+            # intern된 params dict는 add_node가 레이어별로 복사함
+            yield (uid, types[self.type_ids[i]], params[self.param_ids[i]], (self.xs[i], self.ys[i]),
+                   targets[offsets[i]:offsets[i + 1]].tolist())
+
+
+def _read_body(reader, design, version):
+    n, n_types, n_params, n_edges, n_seq = COUNTS.unpack(bytes(reader.read(COUNTS.size)))
+    design.types = [_read_str(reader) or None for _ in range(n_types)]
+    design.params = [_coerce_loaded_value(json.loads(_read_str(reader))) for _ in range(n_params)]
+    shape = _read_str(reader)
+    design.input_shape = tuple(json.loads(shape)) if shape else None
+    modules = _read_str(reader) if version >= 2 else ""
+    design.modules = list(modules_from_doc(json.loads(modules))) if modules else []
+    design.uids = _read_array(reader, "q", n)
+    design.type_ids = _read_array(reader, "I", n)
+    design.param_ids = _read_array(reader, "I", n)
+    design.xs = _read_array(reader, "d", n)
+    design.ys = _read_array(reader, "d", n)
+    design.conn_offsets = _read_array(reader, "I", n + 1)
+    design.conn_targets = _read_array(reader, "q", n_edges)
+    design.sequence = _read_array(reader, "q", n_seq)
+
+
+def is_binary_file(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_binary(path):
+    """.nnd 파일 -> BinaryDesign. 비압축은 mmap, 압축은 스트리밍 해제"""
+    design = BinaryDesign()
+    with open(path, "rb") as f:
+        magic, version, code = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a binary design file")
+        if version > VERSION:
+            raise ValueError(f"{path}: unsupported design format version {version}")
+        design.compression = COMPRESSION_NAMES.get(code)
+        if code == 0:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            reader = _MemoryReader(mm, HEADER.size)
+            try:
+                _read_body(reader, design, version)
+            finally:
+                reader.release()
+                mm.close()
+        elif code == 1:
+            with gzip.GzipFile(fileobj=f, mode="rb") as stream:
+                _read_body(_StreamReader(stream), design, version)
+        elif code == 2:
+            with lzma.LZMAFile(f, mode="rb") as stream:
+                _read_body(_StreamReader(stream), design, version)
+        else:
+            raise ValueError(f"{path}: unknown compression code {code}")
+    return design
+
+
+def graph_from_binary(design, graph=None):
+    """BinaryDesign -> NetworkGraph (JSON 로드와 같은 uid 충돌 처리)"""
+    if graph is None:
+        graph = NetworkGraph()
+    return populate_graph(graph, design.layers(), design.sequence, design.input_shape, design.modules)
+
+
+def load_binary(path, graph=None):
+    return graph_from_binary(read_binary(path), graph)
+
+
+# ---------------- Converter ----------------
+def convert_design(src, dst, compression="gzip"):
+    """JSON <-> binary 변환 (dst 확장자가 .json이면 JSON으로, 아니면 binary로 저장)"""
+    from utils.design_io import save_design
+    graph = design_into_graph(read_design(src))
+    save_design(graph, dst, compression=compression)
+    return graph
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Convert designs between JSON and the compact binary format")
+    ap.add_argument("src")
+    ap.add_argument("dst", help="*.json -> JSON, otherwise binary (.nnd)")
+    ap.add_argument("--compression", choices=["none", "gzip", "lzma"], default="gzip")
+    args = ap.parse_args(argv)
+    graph = convert_design(args.src, args.dst, args.compression)
+    print(f"{args.src} -> {args.dst}: {len(graph)} layers, "
+          f"{os.path.getsize(args.src)} -> {os.path.getsize(args.dst)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
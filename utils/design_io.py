@@ -0,0 +1,256 @@
+# Description: Qt-free conversion between NetworkGraph and the design JSON document.
+# Schema: {"layers": [{"uid", "type", "params", "pos", "connections"}, ...], "sequence": [uid, ...],
+#          "input_shape": [C, H, W] (optional),
+#          "modules": {name: [{"type", "params"}, ...]} (optional, 사용자 정의 모듈 — instance는 이름 + override만)}
+# The compact columnar format lives in utils/design_binary.py; load_design/save_design pick the format.
+import os
+import json
+import hashlib
+
+from layers.network_graph import NetworkGraph
+
+
+def _serialize_for_json(obj):
+    """
+    재귀적으로 JSON-직렬화 가능 형태로 변환.
+    - tuple, set -> list
+    - objects with 'tolist' -> tolist()
+    - dict/list -> 재귀 변환
+    - 기타는 str()로 안전하게 변환 (가능하면 원래 타입 유지)
+    """
+    # 기본 타입
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    # dict
+    if isinstance(obj, dict):
+        return {str(k): _serialize_for_json(v) for k, v in obj.items()}
+    # list/tuple/set
+    if isinstance(obj, (list, tuple, set)):
+        return [_serialize_for_json(v) for v in obj]
+    # numpy / torch / pandas-like objects that have tolist()
+    try:
+        if hasattr(obj, "tolist"):
+            return _serialize_for_json(obj.tolist())
+    except Exception:
+        pass
+    # fallback: convertible to str
+    try:
+        return str(obj)
+    except Exception:
+        return None
+
+
+def _coerce_loaded_value(val):
+    """
+    로드한 파라미터 값에 대해 간단한 정리:
+    - "True"/"False" 문자열 -> bool
+    - 리스트/딕셔너리는 재귀적으로 처리
+    (숫자 문자열을 숫자로 바꾸는 자동 처리 등은 안전하지 않아 적용하지 않음)
+    """
+    if isinstance(val, str):
+        if val.lower() == "true":
+            return True
+        if val.lower() == "false":
+            return False
+        return val
+    if isinstance(val, dict):
+        return {k: _coerce_loaded_value(v) for k, v in val.items()}
+    if isinstance(val, list):
+        return [_coerce_loaded_value(v) for v in val]
+    return val
+
+
+def graph_to_doc(graph):
+    """NetworkGraph -> design 문서(dict)"""
+    objs = []
+    for node in graph:
+        objs.append({
+            "uid": int(node.uid),
+            "type": node.layer_type,
+            "params": _serialize_for_json(node.params or {}),
+            "pos": [float(node.x), float(node.y)],
+            "connections": [int(c) for c in node.outputs],
+        })
+    doc = {"layers": objs, "sequence": [int(uid) for uid in graph.sequence]}
+    if graph.input_shape is not None:
+        doc["input_shape"] = list(graph.input_shape)
+    if graph.modules:
+        doc["modules"] = modules_to_doc(graph.modules)
+    return doc
+
+
+def modules_to_doc(modules):
+    """NetworkGraph.modules -> {name: [{"type", "params"}, ...]} (정의마다 한 번만)"""
+    return {name: [{"type": layer_type, "params": _serialize_for_json(params)}
+                   for layer_type, params in definition.layers]
+            for name, definition in sorted(modules.items())}
+
+
+def modules_from_doc(data):
+    """modules_to_doc의 역: (name, [(type, params)]) 생성 (잘못된 항목은 건너뜀)"""
+    if not isinstance(data, dict):
+        return
+    for name, layers in data.items():
+        if not isinstance(layers, list):
+            continue
+        yield name, [(entry.get("type"), _coerce_loaded_value(entry.get("params", {}) or {}))
+                     for entry in layers if isinstance(entry, dict)]
+
+
+def canonical_design(graph):
+    """코드 생성 결과에 영향을 주는 내용만 (위치 제외, uid 순 정렬) — design_hash 입력"""
+    layers = sorted(([int(node.uid), node.layer_type, _serialize_for_json(node.params or {}),
+                      [int(c) for c in node.outputs]] for node in graph), key=lambda layer: layer[0])
+    shape = None if graph.input_shape is None else list(graph.input_shape)
+    return {"layers": layers, "sequence": [int(uid) for uid in graph.sequence], "input_shape": shape,
+            "modules": modules_to_doc(graph.modules)}
+
+
+def design_hash(graph):
+    """canonical_design의 sha256 (레이어 이동만 했으면 같은 값). 벤치마크 기록 / 변환 캐시 키"""
+    raw = json.dumps(canonical_design(graph), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _doc_layers(doc):
+    """design 문서의 layers -> (uid, type, params, (x, y), connections) 튜플 (잘못된 항목은 건너뜀)"""
+    for entry in doc.get("layers", []) or []:
+        try:
+            uid = int(entry.get("uid", 0))
+        except Exception:
+            continue
+
+        pos = entry.get("pos", [0, 0])
+        try:
+            pos = (float(pos[0]), float(pos[1]))
+        except Exception:
+            pos = (0.0, 0.0)
+
+        params = _coerce_loaded_value(entry.get("params", {}) or {})
+
+        # connections은 정수 리스트로 변환
+        conns = []
+        for c in entry.get("connections", []) or []:
+            try:
+                conns.append(int(c))
+            except Exception:
+                # ignore non-int connections
+                pass
+        yield uid, entry.get("type"), params, pos, conns
+
+
+def populate_graph(graph, layers, sequence=None, input_shape=None, modules=()):
+    """
+    (uid, type, params, (x, y), connections) 튜플들로 graph에 레이어/연결/순서를 추가.
+    이미 있는 uid와 겹치면 새 uid를 배정하고 connections/sequence도 새 uid로 매핑한다.
+    modules: (name, [(type, params)]) — 모듈 정의 (같은 이름이 있으면 파일의 정의로 교체, 잘못된 정의는 무시)
+    JSON / binary 형식이 같은 경로를 쓰므로 두 형식의 로드 결과가 같다.
+    """
+    for name, module_layers in modules or ():
+        try:
+            graph.define_module(name, module_layers)
+        except ValueError:
+            pass
+
+    file_to_loaded = {}
+    pending_conns = []
+
+    # 1) 레이어 생성
+    for uid, layer_type, params, pos, conns in layers:
+        if uid <= 0:
+            # skip invalid uid
+            continue
+        new_uid = None if uid in graph else uid
+        node = graph.add_node(layer_type, params, uid=new_uid, pos=pos, append_to_sequence=False)
+        file_to_loaded[uid] = node.uid
+        pending_conns.append((node.uid, conns))
+
+    # 2) 연결 복원 (파일 uid -> 로드된 uid)
+    for src, conns in pending_conns:
+        for c in conns:
+            tgt = file_to_loaded.get(c)
+            if tgt is not None:
+                graph.connect(src, tgt)
+
+    # 3) sequence 복원
+    seq = list(graph.sequence)
+    for uid in sequence or []:
+        try:
+            uid = int(uid)
+        except Exception:
+            continue
+        if uid in file_to_loaded:
+            seq.append(file_to_loaded[uid])
+    graph.set_sequence(seq)
+
+    # 4) 입력 shape (optional)
+    if isinstance(input_shape, (list, tuple)):
+        graph.set_input_shape(None if d is None else int(d) for d in input_shape)
+    return graph
+
+
+def graph_from_doc(doc, graph=None):
+    """
+    design 문서(dict) -> NetworkGraph
+    graph를 주면 그 그래프에 추가한다 (uid 충돌 처리는 populate_graph 참고).
+    """
+    if graph is None:
+        graph = NetworkGraph()
+    return populate_graph(graph, _doc_layers(doc), doc.get("sequence", []), doc.get("input_shape"),
+                          modules_from_doc(doc.get("modules")))
+
+
+def save_json(graph, path, indent=2):
+    """atomic write: tmp -> replace"""
+    doc = graph_to_doc(graph)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def load_json(path, graph=None):
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    return graph_from_doc(doc, graph)
+
+
+# ---------------- Format dispatch (JSON / binary) ----------------
+def is_binary_design(path):
+    from utils.design_binary import is_binary_file
+    return is_binary_file(path)
+
+
+def read_design(path):
+    """
+    파일을 읽어 메모리 표현을 반환 (아직 그래프는 만들지 않음)
+    - JSON: design 문서(dict)
+    - binary: utils.design_binary.BinaryDesign
+    """
+    if is_binary_design(path):
+        from utils.design_binary import read_binary
+        return read_binary(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def design_into_graph(data, graph=None):
+    """read_design() 결과를 graph에 추가"""
+    if isinstance(data, dict):
+        return graph_from_doc(data, graph)
+    from utils.design_binary import graph_from_binary
+    return graph_from_binary(data, graph)
+
+
+def load_design(path, graph=None):
+    """JSON / binary 형식을 자동 판별해서 로드"""
+    return design_into_graph(read_design(path), graph)
+
+
+def save_design(graph, path, compression=None):
+    """확장자가 .json이면 JSON, 아니면 binary (compression: None / "gzip" / "lzma")"""
+    if path.lower().endswith(".json"):
+        save_json(graph, path)
+    else:
+        from utils.design_binary import save_binary
+        save_binary(graph, path, compression=compression)
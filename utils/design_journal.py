@@ -0,0 +1,263 @@
+# Description: Append-only operation journal for autosave / crash recovery (Qt-free).
+# NetworkGraph reports every change to DesignJournal.record() (graph.observer). Operations are buffered
+# in memory and appended to journal.jsonl on flush(), so an autosave costs O(change). When the journal
+# grows past the snapshot size it is compacted: the graph is written as a snapshot and the journal restarts.
+#
+# Files in the session directory:
+#   snapshot-<generation>.nnd : full design at the start of the generation (utils.design_binary)
+#   journal.jsonl             : {"op": "begin", "generation": n} followed by one operation per line
+# The journal is replayed only when its generation matches the newest snapshot, so a crash in the middle
+# of a compaction never applies operations twice.
+import os
+import json
+import glob
+
+from layers.network_graph import NetworkGraph
+from utils.design_io import _serialize_for_json, _coerce_loaded_value
+
+JOURNAL_NAME = "journal.jsonl"
+SNAPSHOT_PATTERN = "snapshot-{}.nnd"
+COMPACT_MIN_BYTES = 1 << 20   # 이 크기 이하의 journal은 compaction하지 않음
+COALESCED_OPS = ("move", "params", "sequence", "input_shape")  # 마지막 값만 의미 있는 연산
+# journal에 쓰는 필드 (observer가 주는 undo 용 old 값 등은 쓰지 않음)
+ENTRY_FIELDS = {
+    "add": ("uid", "type", "params", "pos", "seq"),
+    "remove": ("uid",),
+    "move": ("uid", "pos"),
+    "params": ("uid", "params"),
+    "connect": ("src", "tgt", "out_index", "in_index"),
+    "disconnect": ("src", "tgt"),
+    "clear_connections": (),
+    "sequence": ("uids",),
+    "input_shape": ("shape",),
+    "define_module": ("name", "layers"),
+}
+
+
+def _generation_of(path):
+    try:
+        return int(os.path.basename(path)[len("snapshot-"):-len(".nnd")])
+    except ValueError:
+        return -1
+
+
+class DesignJournal:
+    """
+    세션 디렉터리의 snapshot + journal 관리
+    - record(op, fields): NetworkGraph.observer로 등록. 메모리에만 쌓음 (move/params/sequence는 마지막 값으로 합침)
+    - flush(graph): 쌓인 연산을 journal 끝에 한 번에 append (snapshot이 필요하면 compaction)
+    - recover(): snapshot + journal replay로 그래프 복원 (없으면 None)
+    """
+    def __init__(self, directory, compact_min_bytes=COMPACT_MIN_BYTES):
+        self.directory = directory
+        self.compact_min_bytes = compact_min_bytes
+        self.journal_path = os.path.join(directory, JOURNAL_NAME)
+        self.generation = 0
+        self._pending = []     # 직렬화 대기 중인 (op, fields)
+        self._coalesced = {}   # (op, uid) -> fields, 다음 구조 연산 전에 pending으로 옮김
+        self._needs_snapshot = True
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self._file = None
+
+    # ---------------- Session files ----------------
+    def _snapshot_path(self, generation):
+        return os.path.join(self.directory, SNAPSHOT_PATTERN.format(generation))
+
+    def _snapshots(self):
+        paths = glob.glob(os.path.join(self.directory, SNAPSHOT_PATTERN.format("*")))
+        return sorted((p for p in paths if _generation_of(p) >= 0), key=_generation_of)
+
+    def has_session(self):
+        """복구할 세션 파일이 있는지 (정상 종료 시에는 discard()로 지워짐)"""
+        return bool(self._snapshots())
+
+    def discard(self):
+        """세션 파일 삭제 (정상 종료 / 사용자가 복구를 거절한 경우)"""
+        self.close()
+        for path in self._snapshots() + [self.journal_path]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._pending = []
+        self._coalesced = {}
+        self._needs_snapshot = True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ---------------- Recording ----------------
+    def record(self, op, fields):
+        """NetworkGraph.observer 콜백"""
+        if self._needs_snapshot:
+            return  # 다음 flush에서 전체 snapshot을 쓰므로 개별 연산은 필요 없음
+        if op in ("replace", "clear"):
+            # 전체가 바뀌는 연산: journal 대신 다음 flush에서 snapshot
+            self._needs_snapshot = True
+            self._pending = []
+            self._coalesced = {}
+            return
+        if op == "sequence":
+            fields = {"uids": list(fields["uids"])}  # graph.sequence는 이후 add/remove로 제자리 변경됨
+        if op in COALESCED_OPS:
+            self._coalesced[(op, fields.get("uid"))] = fields
+            return
+        self._move_coalesced()
+        self._pending.append((op, fields))
+
+    def _move_coalesced(self):
+        if self._coalesced:
+            self._pending.extend((key[0], fields) for key, fields in self._coalesced.items())
+            self._coalesced = {}
+
+    def pending_count(self):
+        return len(self._pending) + len(self._coalesced)
+
+    def needs_snapshot(self):
+        return self._needs_snapshot
+
+    # ---------------- Flush / compaction ----------------
+    def flush(self, graph):
+        """쌓인 연산을 journal에 append. snapshot이 필요하거나 journal이 커졌으면 compaction"""
+        if self._needs_snapshot or (self._journal_bytes > self.compact_min_bytes and
+                                    self._journal_bytes > self._snapshot_bytes):
+            self.compact(graph)
+            return
+        self._move_coalesced()
+        if not self._pending:
+            return
+        lines = [json.dumps(_op_to_entry(op, fields), ensure_ascii=False, separators=(",", ":"))
+                 for op, fields in self._pending]
+        self._pending = []
+        data = "\n".join(lines) + "\n"
+        f = self._open_journal()
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        self._journal_bytes += len(data.encode("utf-8"))
+
+    def compact(self, graph):
+        """graph 전체를 새 generation의 snapshot으로 쓰고 journal을 새로 시작 (O(design))"""
+        from utils.design_binary import save_binary
+
+        os.makedirs(self.directory, exist_ok=True)
+        old_snapshots = self._snapshots()
+        generation = (_generation_of(old_snapshots[-1]) + 1) if old_snapshots else 1
+        snapshot = self._snapshot_path(generation)
+        save_binary(graph, snapshot, compression="none")  # atomic (tmp -> replace)
+
+        # journal 재시작 (crash 시: 새 snapshot + 이전 generation journal -> journal은 무시됨)
+        self.close()
+        tmp_path = self.journal_path + ".tmp"
+        header = json.dumps({"op": "begin", "generation": generation}) + "\n"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+        for path in old_snapshots:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        self.generation = generation
+        self._pending = []
+        self._coalesced = {}
+        self._needs_snapshot = False
+        self._journal_bytes = len(header)
+        self._snapshot_bytes = os.path.getsize(snapshot)
+
+    def _open_journal(self):
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf-8", buffering=1 << 16)
+        return self._file
+
+    # ---------------- Recovery ----------------
+    def recover(self):
+        """최신 snapshot을 읽고 같은 generation의 journal을 replay. 복원한 NetworkGraph (세션이 없으면 None)"""
+        from utils.design_binary import load_binary
+
+        snapshots = self._snapshots()
+        if not snapshots:
+            return None
+        snapshot = snapshots[-1]
+        generation = _generation_of(snapshot)
+        graph = load_binary(snapshot)
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                entries = _read_entries(f)
+                header = next(entries, None)
+                if header is not None and header.get("op") == "begin" and header.get("generation") == generation:
+                    for entry in entries:
+                        apply_entry(graph, entry)
+        return graph
+
+
+def _op_to_entry(op, fields):
+    entry = {"op": op}
+    for key in ENTRY_FIELDS.get(op, ()):
+        entry[key] = _serialize_for_json(fields.get(key))
+    return entry
+
+
+def _read_entries(f):
+    """journal 줄 단위 읽기. crash로 잘린 마지막 줄은 버림"""
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            return
+
+
+def apply_entry(graph, entry):
+    """journal 항목 하나를 graph에 적용 (NetworkGraph 메서드를 그대로 사용해 기록 당시와 같은 결과)"""
+    op = entry.get("op")
+    if op == "add":
+        pos = entry.get("pos") or (0.0, 0.0)
+        graph.add_node(entry.get("type"), _coerce_loaded_value(entry.get("params") or {}), uid=entry["uid"],
+                       pos=(pos[0], pos[1]), append_to_sequence=entry.get("seq", True))
+    elif op == "remove":
+        if entry["uid"] in graph:
+            graph.remove_node(entry["uid"])
+    elif op == "move":
+        if entry["uid"] in graph:
+            graph.set_pos(entry["uid"], *entry["pos"])
+    elif op == "params":
+        if entry["uid"] in graph:
+            graph.set_params(entry["uid"], _coerce_loaded_value(entry.get("params") or {}))
+    elif op == "connect":
+        if entry["src"] in graph and entry["tgt"] in graph:
+            graph.connect(entry["src"], entry["tgt"], entry.get("out_index"), entry.get("in_index"))
+    elif op == "disconnect":
+        if entry["src"] in graph and entry["tgt"] in graph:
+            graph.disconnect(entry["src"], entry["tgt"])
+    elif op == "clear_connections":
+        graph.clear_connections()
+    elif op == "sequence":
+        graph.set_sequence(entry.get("uids") or [])
+    elif op == "input_shape":
+        shape = entry.get("shape")
+        graph.set_input_shape(None if shape is None else (None if d is None else int(d) for d in shape))
+    elif op == "define_module":
+        layers = entry.get("layers")
+        graph.define_module(entry["name"], None if layers is None else
+                            [(layer_type, _coerce_loaded_value(params or {})) for layer_type, params in layers])
+    return graph
+
+
+def replay(entries, graph=None):
+    """journal 항목들을 순서대로 적용"""
+    if graph is None:
+        graph = NetworkGraph()
+    for entry in entries:
+        apply_entry(graph, entry)
+    return graph
@@ -0,0 +1,112 @@
+# Description: Background work for save/load. File I/O, serialization and parsing run on a QThreadPool
+# worker (BackgroundTask); GUI-thread work that must touch QGraphicsItems runs in time-sliced chunks across
+# event-loop turns (ChunkedJob), so the window stays responsive and both can be cancelled from the Footer.
+import time
+import threading
+
+from PyQt5 import QtCore
+
+
+class TaskCancelled(Exception):
+    """작업이 취소됨 (BackgroundTask.check_cancelled에서 발생)"""
+
+
+class TaskSignals(QtCore.QObject):
+    """QRunnable은 QObject가 아니므로 시그널은 별도 객체로 (GUI 스레드에서 생성 -> 슬롯은 GUI 스레드에서 실행)"""
+    progress = QtCore.pyqtSignal(int, int, str)  # done, total (0이면 진행률 모름), message
+    finished = QtCore.pyqtSignal(object)         # 결과
+    failed = QtCore.pyqtSignal(str)              # 오류 메시지
+    cancelled = QtCore.pyqtSignal()
+
+
+class BackgroundTask(QtCore.QRunnable):
+    """
+    fn(task, *args)를 worker 스레드에서 실행.
+    - fn은 GUI 객체를 건드리면 안 됨 (graph snapshot / 파일 경로 같은 독립 데이터만 사용)
+    - fn 안에서 task.report(...)로 진행률, task.check_cancelled()로 취소 지점 표시
+    """
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = TaskSignals()
+        self._cancel = threading.Event()
+        self.setAutoDelete(False)  # 시그널 객체 수명을 호출 측이 관리
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise TaskCancelled()
+
+    def report(self, done, total=0, message=""):
+        self.signals.progress.emit(int(done), int(total), message)
+
+    def run(self):
+        try:
+            result = self.fn(self, *self.args)
+        except TaskCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+class ChunkedJob(QtCore.QObject):
+    """
+    GUI 스레드에서 실행해야 하는 긴 작업을 이벤트 루프 턴마다 조금씩 실행.
+    steps: (done, total)을 yield하는 generator. 한 턴에 time_budget 초까지 진행한 뒤 다음 턴으로 넘김.
+    """
+    progress = QtCore.pyqtSignal(int, int)
+    finished = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+    def __init__(self, steps, time_budget=0.03, parent=None):
+        super().__init__(parent)
+        self._steps = steps
+        self.time_budget = time_budget
+        self._cancel = False
+        self._running = False
+
+    def start(self):
+        self._running = True
+        QtCore.QTimer.singleShot(0, self._run_slice)
+
+    def cancel(self):
+        self._cancel = True
+
+    def is_running(self):
+        return self._running
+
+    def _run_slice(self):
+        if self._cancel:
+            self._stop()
+            self.cancelled.emit()
+            return
+        deadline = time.perf_counter() + self.time_budget
+        done = total = 0
+        try:
+            while True:
+                done, total = next(self._steps)
+                if time.perf_counter() >= deadline:
+                    break
+        except StopIteration:
+            self._stop()
+            self.finished.emit()
+            return
+        except Exception as e:
+            self._stop()
+            self.failed.emit(str(e))
+            return
+        self.progress.emit(done, total)
+        QtCore.QTimer.singleShot(0, self._run_slice)
+
+    def _stop(self):
+        self._running = False
+        self._steps.close()
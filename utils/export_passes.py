@@ -0,0 +1,127 @@
+# Description: Graph optimisation passes for the inference export (Qt-free, torch-free).
+# Each pass rewrites a copy of the design with NetworkGraph operations only, so the user's design and its
+# undo history are never touched. export_utils generates code from the rewritten graph and uses the
+# InferencePlan to map weights saved from the training export onto the optimised model.
+
+from utils.export_utils import INPLACE_LAYERS, VIEW_LAYERS
+
+DROPOUT_LAYERS = ("Dropout", "Dropout1d", "Dropout2d", "Dropout3d", "AlphaDropout")
+INPLACE_ACTIVATIONS = tuple(t for t in INPLACE_LAYERS if t not in DROPOUT_LAYERS)
+# f(f(x)) == f(x): 같은 파라미터로 연달아 적용하면 두 번째는 의미 없음
+IDEMPOTENT_ACTIVATIONS = ("ReLU", "ReLU6", "Hardtanh")
+BN_DEFAULT_EPS = 1e-5
+
+
+class InferencePlan:
+    """
+    inference 최적화 결과 요약
+    - folded: conv uid -> (bn uid, eps) — BatchNorm을 conv의 weight/bias로 접어 넣은 쌍
+    - dropped: 제거된 Dropout uid, merged: 앞의 같은 activation에 합쳐져 제거된 uid (둘 다 weight 없음)
+    - inplace: inplace=True로 바꾼 activation uid (producer 출력을 덮어씀)
+    """
+    __slots__ = ("folded", "dropped", "merged", "inplace")
+
+    def __init__(self):
+        self.folded = {}
+        self.dropped = []
+        self.merged = []
+        self.inplace = []
+
+    def summary(self):
+        return (f"{len(self.folded)} BatchNorm folded, {len(self.dropped)} Dropout removed, "
+                f"{len(self.merged)} activations merged, {len(self.inplace)} in-place")
+
+
+def _can_bypass(graph, uid):
+    """uid를 빼고 입력->출력을 직접 이어도 되는지 (이미 연결된 쌍이 있으면 병합 입력 수가 바뀌므로 안 됨)"""
+    node = graph.node(uid)
+    for src in node.inputs:
+        outputs = graph.node(src).outputs
+        if any(tgt in outputs for tgt in node.outputs):
+            return False
+    return True
+
+
+def _bypass(graph, uid):
+    """항등으로 취급할 레이어 제거: 각 입력을 각 출력에 같은 자리(병합 순서 유지)로 연결한 뒤 노드 삭제"""
+    node = graph.node(uid)
+    for src in list(node.inputs):
+        for tgt in list(node.outputs):
+            graph.connect(src, tgt, graph.node(src).outputs.index(uid), graph.node(tgt).inputs.index(uid))
+    graph.remove_node(uid)
+
+
+def drop_dropout(graph, plan):
+    """Dropout은 inference에서 항등"""
+    for node in list(graph):
+        if node.layer_type in DROPOUT_LAYERS and _can_bypass(graph, node.uid):
+            _bypass(graph, node.uid)
+            plan.dropped.append(node.uid)
+
+
+def fold_conv_bn(graph, plan):
+    """Conv2d -> BatchNorm2d (conv 출력을 BN만 읽는 경우): BN을 없애고 conv에 bias를 둠"""
+    for node in list(graph):
+        if node.layer_type != "BatchNorm2d" or node.uid not in graph or len(node.inputs) != 1:
+            continue
+        conv = graph.node(node.inputs[0])
+        if conv.layer_type != "Conv2d" or conv.outputs != [node.uid]:
+            continue
+        channels, features = conv.params.get("out_channels"), node.params.get("num_features")
+        if channels is not None and features is not None and channels != features:
+            continue  # shape 검증에서 이미 오류인 쌍은 그대로 둠
+        eps = node.params.get("eps", BN_DEFAULT_EPS)
+        params = dict(conv.params)
+        params["bias"] = True
+        graph.set_params(conv.uid, params)
+        _bypass(graph, node.uid)
+        plan.folded[conv.uid] = (node.uid, eps)
+
+
+def _activation_key(node):
+    params = {k: v for k, v in (node.params or {}).items() if k != "inplace"}
+    return node.layer_type, sorted(params.items())
+
+
+def merge_activations(graph, plan):
+    """
+    연달은 activation을 in-place 하나로 합침:
+    - 같은 idempotent activation이 연달아 있으면 뒤의 것을 제거
+    - 남은 activation의 입력을 다른 레이어가 읽지 않으면 (producer 출력의 유일한 consumer) inplace=True로.
+      모델 입력이나 view(Flatten 등)는 덮어쓰지 않음. inference_mode라 autograd 조건은 없음
+    코드 생성의 liveness 분석이 같은 규칙으로 다시 확인하므로 여기서 표시한 것이 안전하지 않게 되는 경우는 없음
+    """
+    for node in list(graph):
+        if node.uid not in graph or node.layer_type not in IDEMPOTENT_ACTIVATIONS or len(node.inputs) != 1:
+            continue
+        prev = graph.node(node.inputs[0])
+        if prev.outputs == [node.uid] and _activation_key(prev) == _activation_key(node):
+            _bypass(graph, node.uid)
+            plan.merged.append(node.uid)
+    for node in list(graph):
+        if node.layer_type not in INPLACE_ACTIVATIONS or len(node.inputs) != 1 or (node.params or {}).get("inplace"):
+            continue
+        prev = graph.node(node.inputs[0])
+        if prev.outputs == [node.uid] and prev.layer_type not in VIEW_LAYERS:
+            graph.set_params(node.uid, dict(node.params or {}, inplace=True))
+            plan.inplace.append(node.uid)
+
+
+INFERENCE_PASSES = (drop_dropout, fold_conv_bn, merge_activations)
+
+
+def optimize_for_inference(graph, sequence=None):
+    """
+    graph 복사본에 inference 최적화 pass들을 적용.
+    반환: (최적화된 NetworkGraph, InferencePlan). sequence를 주면 그 레이어들만 대상으로 함
+    """
+    optimized = graph.copy()
+    if sequence is not None:
+        keep = set(sequence)
+        for uid in [uid for uid in optimized.uids() if uid not in keep]:
+            optimized.remove_node(uid)
+        optimized.set_sequence([uid for uid in sequence if uid in optimized])
+    plan = InferencePlan()
+    for run_pass in INFERENCE_PASSES:
+        run_pass(optimized, plan)
+    return optimized, plan
@@ -1,100 +1,471 @@
-from PyQt5 import QtWidgets, QtCore
-import torch.nn as nn
-import torch
+# Description: PyTorch code generation. Only emits source text, so torch is NOT imported here
+# (keeps torch off the GUI startup path; features that run models import it lazily).
+# forward() follows the connection graph in topological order: a layer with several inputs gets their
+# elementwise sum (residual add), tensors are released right after their last consumer (name reuse / del),
+# and activations overwrite their input in place when nothing else reads it afterwards.
+# Each user-defined module is emitted once as an nn.Sequential subclass; the parameters that some instance
+# overrides become constructor arguments, so an instance is a single `Name(arg=value)` line.
+import os
+import heapq
+import hashlib
+from itertools import count
 
-def export_to_pytorch(layer_items, sequence):
+from layers.network_graph import MODULE_TYPE
+from utils.shape_inference import runnable_input_shape
+
+GENERATOR_VERSION = 5  # 생성 코드 형식이 바뀌면 올림 (batch export 캐시 무효화)
+
+MODEL_INPUT = None  # forward()의 입력 텐서 (producer가 없는 레이어들이 읽음)
+
+# inplace 인자가 있는 torch 레이어
+INPLACE_LAYERS = ("ReLU", "ReLU6", "LeakyReLU", "ELU", "SELU", "CELU", "Hardtanh", "SiLU", "Dropout")
+# backward에서 자기 출력을 쓰지 않는 레이어: 그 출력을 다음 activation이 in-place로 덮어써도 autograd에 안전.
+# 마지막 연산이 in-place activation인 모듈(ResidualBlock: `return self.relu(out)`)은 넣으면 안 됨 —
+# ReLU backward가 그 출력을 쓰므로 덮어쓰면 loss.backward()가 in-place 수정 오류로 실패함
+# (Inception은 마지막이 torch.cat이라 안전)
+INPLACE_SAFE_PRODUCERS = ("Linear", "Conv2d", "BatchNorm2d", "Inception")
+# 입력의 view를 돌려주는 레이어: 출력을 덮어쓰면 아직 살아 있는 입력 텐서까지 바뀜
+VIEW_LAYERS = ("Flatten", "Unflatten", "Identity")
+
+# torch.nn에 없는 모듈: 생성 코드에 클래스 정의를 넣음 (utils.cost_model의 비용 계산과 같은 구조)
+RESIDUAL_BLOCK_SOURCE = '''class BasicBlock(nn.Module):
+    """3x3 conv-BN-ReLU-3x3 conv-BN + skip (1x1 conv-BN when stride or channels change), then ReLU"""
+    def __init__(self, in_channels, out_channels, stride=1):
+        super(BasicBlock, self).__init__()
+        self.conv1 = nn.Conv2d(in_channels, out_channels, 3, stride=stride, padding=1, bias=False)
+        self.bn1 = nn.BatchNorm2d(out_channels)
+        self.conv2 = nn.Conv2d(out_channels, out_channels, 3, stride=1, padding=1, bias=False)
+        self.bn2 = nn.BatchNorm2d(out_channels)
+        self.relu = nn.ReLU(inplace=True)
+        self.downsample = None
+        if stride != 1 or in_channels != out_channels:
+            self.downsample = nn.Sequential(
+                nn.Conv2d(in_channels, out_channels, 1, stride=stride, bias=False),
+                nn.BatchNorm2d(out_channels))
+
+    def forward(self, x):
+        identity = x if self.downsample is None else self.downsample(x)
+        out = self.relu(self.bn1(self.conv1(x)))
+        out = self.bn2(self.conv2(out))
+        out += identity
+        return self.relu(out)
+
+
+class ResidualBlock(nn.Sequential):
+    """`repeats` BasicBlocks; only the first one applies the stride / channel change"""
+    def __init__(self, in_channels, out_channels, stride=1, repeats=1):
+        super(ResidualBlock, self).__init__(*[
+            BasicBlock(in_channels if r == 0 else out_channels, out_channels, stride if r == 0 else 1)
+            for r in range(max(1, repeats))])
+'''
+
+INCEPTION_SOURCE = '''class Inception(nn.Module):
+    """GoogLeNet (v1) module: 1x1 / 1x1->3x3 / 1x1->5x5 / 3x3 max pool->1x1 branches, concatenated on channels"""
+    def __init__(self, in_channels, out_1x1, out_3x3, out_5x5, out_pool_proj,
+                 out_3x3_reduce=None, out_5x5_reduce=None):
+        super(Inception, self).__init__()
+        r3 = out_3x3 if out_3x3_reduce is None else out_3x3_reduce
+        r5 = out_5x5 if out_5x5_reduce is None else out_5x5_reduce
+
+        def conv(cin, cout, k):
+            return [nn.Conv2d(cin, cout, k, padding=k // 2), nn.ReLU(inplace=True)]
+
+        self.branch1 = nn.Sequential(*conv(in_channels, out_1x1, 1))
+        self.branch3 = nn.Sequential(*conv(in_channels, r3, 1), *conv(r3, out_3x3, 3))
+        self.branch5 = nn.Sequential(*conv(in_channels, r5, 1), *conv(r5, out_5x5, 5))
+        self.branch_pool = nn.Sequential(nn.MaxPool2d(3, stride=1, padding=1), *conv(in_channels, out_pool_proj, 1))
+
+    def forward(self, x):
+        return torch.cat([self.branch1(x), self.branch3(x), self.branch5(x), self.branch_pool(x)], 1)
+'''
+
+# layer_type -> (클래스 이름, 생성자 인자, 정의 소스)
+CUSTOM_MODULES = {
+    "ResidualBlock": ("ResidualBlock", ("in_channels", "out_channels", "stride", "repeats"), RESIDUAL_BLOCK_SOURCE),
+    "ResBlock": ("ResidualBlock", ("in_channels", "out_channels", "stride", "repeats"), RESIDUAL_BLOCK_SOURCE),
+    "Inception": ("Inception", ("in_channels", "out_1x1", "out_3x3_reduce", "out_3x3", "out_5x5_reduce",
+                                "out_5x5", "out_pool_proj"), INCEPTION_SOURCE),
+}
+
+
+def generator_fingerprint():
+    """GENERATOR_VERSION + 코드 생성기 소스(export_utils / export_passes)의 hash — 템플릿을 고치면 바뀜"""
+    h = hashlib.sha256(str(GENERATOR_VERSION).encode("ascii"))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ("export_utils.py", "export_passes.py"):
+        with open(os.path.join(here, name), "rb") as f:
+            h.update(f.read())
+    return f"{GENERATOR_VERSION}-{h.hexdigest()[:16]}"
+
+
+def topological_order(graph, seq):
     """
-    Export PyTorch code using the user-visible order.
-    - layer_items: dict {uid: LayerItem}
-    - sequence: either a QListWidget (UI) OR a Python list of uids (preferred)
+    seq에 있는 레이어들을 연결 기준 위상 순서로 (동률이면 seq 순서 우선 -> 직렬 모델은 seq 그대로).
+    seq 밖의 레이어와의 연결은 무시. 순환이 있으면 ValueError
     """
-    # --- normalize sequence to a plain list of uids ---
-    if isinstance(sequence, QtWidgets.QListWidget):
-        seq = [sequence.item(i).data(QtCore.Qt.UserRole) for i in range(sequence.count())]
-    elif isinstance(sequence, list):
-        seq = list(sequence)
-    else:
-        # try to coerce an iterable
-        try:
-            seq = list(sequence)
-        except Exception:
-            QtWidgets.QMessageBox.warning(None, "Export Error", "Invalid sequence argument for export.")
-            return
+    position = {}
+    for uid in seq:
+        position.setdefault(uid, len(position))
+    indegree = {uid: sum(1 for src in graph.node(uid).inputs if src in position) for uid in position}
+    ready = [(position[uid], uid) for uid, n in indegree.items() if n == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        _, uid = heapq.heappop(ready)
+        order.append(uid)
+        for tgt in graph.node(uid).outputs:
+            if tgt in indegree:
+                indegree[tgt] -= 1
+                if indegree[tgt] == 0:
+                    heapq.heappush(ready, (position[tgt], tgt))
+    if len(order) != len(position):
+        cyclic = sorted(uid for uid, n in indegree.items() if n > 0)
+        raise ValueError(f"연결에 순환(cycle)이 있어 코드를 생성할 수 없습니다: layer {cyclic}")
+    return order
+
+
+class ForwardStep:
+    """forward()의 레이어 호출 하나: out = layer(args) 후 released 이름들을 del"""
+    __slots__ = ("uid", "out", "srcs", "args", "dying", "inplace_ok", "released")
+
+    def __init__(self, uid, out, srcs, args, dying, inplace_ok, released):
+        self.uid = uid
+        self.out = out
+        self.srcs = srcs
+        self.args = args
+        self.dying = dying
+        self.inplace_ok = inplace_ok
+        self.released = released
+
+
+def plan_forward(graph, order, autograd=True):
+    """
+    forward()의 텐서 흐름 계획 (liveness 분석).
+    반환: (steps, outputs)
+    - steps: ForwardStep 목록 — released는 이 레이어 뒤에 del할 이름
+    - outputs: forward가 반환할 텐서 이름 (다른 레이어가 읽지 않는 레이어들의 출력)
+    이름은 마지막 consumer가 실행되면 해제되어 다음 출력에 재사용되므로 직렬 구간은 계속 `x`를 씀.
+    autograd=False (inference_mode)면 backward를 신경 쓸 필요가 없어 in-place 조건이 넓어짐
+    """
+    exported = set(order)
+    step_of = {uid: i for i, uid in enumerate(order)}
+    sources = {uid: [src for src in graph.node(uid).inputs if src in exported] or [MODEL_INPUT] for uid in order}
+    last_use = {}
+    for uid in order:
+        for src in sources[uid]:
+            last_use[src] = step_of[uid]
+
+    names = {MODEL_INPUT: "x"}
+    free = []
+    fresh = count(1)
+    steps = []
+    for uid in order:
+        srcs = sources[uid]
+        dying = [src for src in srcs if last_use.get(src) == step_of[uid]]
+        args = [names[src] for src in srcs]
+
+        # in-place: 합(새 텐서)이거나, 입력이 여기서 마지막으로 쓰이고 (호출 측 입력이 아니고)
+        # autograd가 있으면 그 producer의 backward가 출력을 안 쓰는 경우
+        if len(srcs) > 1:
+            inplace_ok = True
+        else:
+            src = srcs[0]
+            producer = None if src is MODEL_INPUT else graph.node(src).layer_type
+            inplace_ok = (producer is not None and src in dying and producer not in VIEW_LAYERS and
+                          (not autograd or producer in INPLACE_SAFE_PRODUCERS))
+
+        if dying:
+            out = names[dying[0]]
+            released = [names[src] for src in dying[1:]]
+        else:
+            out = free.pop() if free else f"x{next(fresh)}"
+            released = []
+        free.extend(released)
+        names[uid] = out
+        steps.append(ForwardStep(uid, out, srcs, args, dying, inplace_ok, released))
+
+    outputs = [names[uid] for uid in order if uid not in last_use]
+    return steps, outputs
+
+
+def group_sequential(steps):
+    """
+    직렬 구간을 묶음: 다음 레이어가 바로 앞 레이어의 출력 하나만 읽고 그 출력을 다른 곳에서 안 쓰면 같은 블록.
+    반환: ForwardStep 리스트의 리스트 (길이 1이면 묶지 않음)
+    """
+    blocks = []
+    for step in steps:
+        if blocks:
+            prev = blocks[-1][-1]
+            if step.srcs == [prev.uid] and prev.uid in step.dying:
+                blocks[-1].append(step)
+                continue
+        blocks.append([step])
+    return blocks
+
+
+def _layer_expr(layer_type, params, inplace_ok=None, args=None):
+    """
+    레이어 생성 식 (custom 모듈은 정의된 인자만).
+    inplace_ok: inplace 레이어에 liveness 결과 반영 (None이면 params 그대로), args: 값 대신 쓸 인자 이름 {key: name}
+    """
+    params = dict(params or {})
+    args = args or {}
+
+    def value(k, v):
+        return args.get(k) or repr(v)
+
+    custom = CUSTOM_MODULES.get(layer_type)
+    if custom is not None:
+        cls, accepted, _ = custom
+        kv = [f"{k}={value(k, params[k])}" for k in accepted if k in params]
+        return f"{cls}({', '.join(kv)})"
+    if layer_type in INPLACE_LAYERS and inplace_ok is not None:
+        if inplace_ok:
+            params["inplace"] = True
+        elif params.get("inplace"):
+            params["inplace"] = False  # 입력을 다른 레이어가 계속 읽으므로 덮어쓰면 안 됨
+    kv = [f"{k}={value(k, v)}" for k, v in params.items()]
+    return f"nn.{layer_type}({', '.join(kv)})"
 
+
+def _module_expr(node, inplace_ok, module_args=None):
+    """forward 단계 하나의 모듈 생성 식 (사용자 정의 모듈은 override만 인자로)"""
+    if node.layer_type == MODULE_TYPE:
+        params = node.params or {}
+        free = (module_args or {}).get(params.get("module"), {})
+        kv = []
+        for index, diff in sorted((params.get("overrides") or {}).items(), key=lambda item: int(item[0])):
+            kv.extend(f"{free[(int(index), k)]}={v!r}" for k, v in diff.items() if (int(index), k) in free)
+        return f"{params.get('module')}({', '.join(kv)})"
+    return _layer_expr(node.layer_type, node.params, inplace_ok)
+
+
+# 사용자 모듈 클래스 이름으로 쓸 수 없는 이름 (생성 코드의 다른 이름과 겹침)
+RESERVED_MODULE_NAMES = ("Net", "BasicBlock", "ResidualBlock", "Inception", "nn", "torch",
+                         "TRAINING_KEYS", "FOLDED_BN", "load_training_state_dict")
+
+
+def module_arguments(graph, uids):
+    """
+    uids의 instance가 쓰는 모듈 정의별 생성자 인자: {name: {(layer index, key): 인자 이름}}.
+    어느 instance든 override한 (레이어, 키)만 인자가 되고 나머지는 정의 값이 클래스에 그대로 들어감
+    """
+    used = {}
+    for uid in uids:
+        node = graph.node(uid)
+        if node.layer_type != MODULE_TYPE:
+            continue
+        name = (node.params or {}).get("module")
+        definition = graph.modules.get(name)
+        if definition is None:
+            raise ValueError(f"layer {uid}: 정의되지 않은 모듈 {name}")
+        if name in RESERVED_MODULE_NAMES:
+            raise ValueError(f"모듈 이름 {name}은(는) 생성 코드에서 쓸 수 없습니다. 이름을 바꾸세요.")
+        free = used.setdefault(name, {})
+        for index, diff in ((node.params or {}).get("overrides") or {}).items():
+            i = int(index)
+            if i >= len(definition):
+                continue
+            for k in diff:
+                if k in definition.layers[i][1]:
+                    free.setdefault((i, k), f"l{i}_{k}")
+    return used
+
+
+def module_class_source(definition, free):
+    """사용자 정의 모듈 클래스 (nn.Sequential). free: {(layer index, key): 인자 이름}"""
+    defaults = [f"{arg}={definition.layers[i][1][k]!r}" for (i, k), arg in sorted(free.items())]
+    lines = [f"class {definition.name}(nn.Sequential):",
+             f'    """user module: {" -> ".join(t for t, _ in definition.layers)}"""',
+             f"    def __init__(self{''.join(', ' + d for d in defaults)}):",
+             f"        super({definition.name}, self).__init__("]
+    for i, (layer_type, params) in enumerate(definition.layers):
+        args = {k: arg for (j, k), arg in free.items() if j == i}
+        lines.append(f"            {_layer_expr(layer_type, params, args=args)},")
+    lines.append("        )")
+    return "\n".join(lines) + "\n"
+
+
+def _call_line(name, args, out):
+    if len(args) > 1:
+        return f"        {out} = self.{name}({' + '.join(args)})  # merge: elementwise add"
+    return f"        {out} = self.{name}({args[0]})"
+
+
+# inference export: 학습 export(같은 design, 기본 모드)로 저장한 state_dict를 최적화된 모델에 로드
+LOAD_TRAINING_WEIGHTS_SOURCE = '''def load_training_state_dict(model, state_dict):
+    """Load weights saved from the training export of the same design, folding BatchNorm into the convs"""
+    state = {}
+    for key, value in state_dict.items():
+        prefix, _, name = key.partition(".")
+        if prefix in TRAINING_KEYS:
+            state[TRAINING_KEYS[prefix] + "." + name] = value
+    for conv, (bn, eps) in FOLDED_BN.items():
+        mean, var = state_dict[bn + ".running_mean"], state_dict[bn + ".running_var"]
+        gamma = state_dict.get(bn + ".weight", torch.ones_like(mean))
+        beta = state_dict.get(bn + ".bias", torch.zeros_like(mean))
+        bias = state_dict.get(conv + ".bias", torch.zeros_like(mean))
+        scale = gamma * torch.rsqrt(var + eps)
+        state[TRAINING_KEYS[conv] + ".weight"] = state_dict[conv + ".weight"] * scale.reshape(-1, 1, 1, 1)
+        state[TRAINING_KEYS[conv] + ".bias"] = beta + (bias - mean) * scale
+    model.load_state_dict(state)
+    return model
+'''
+
+
+def generate_pytorch_code(graph, sequence=None, inference=False):
+    """
+    Generate PyTorch source code (Qt 없이 실행 가능) from the connection graph.
+    - graph: NetworkGraph
+    - sequence: optional list of uids to export (기본값: graph.sequence). 위상 정렬의 동률 순서로도 사용
+    - inference: True면 utils.export_passes로 Conv+BN folding / Dropout 제거 / activation 병합·in-place 표시 후
+      직렬 구간을 nn.Sequential로 묶고 forward를 torch.inference_mode()로 실행하는 코드 생성
+    raises ValueError if the sequence is empty or the connections contain a cycle
+    """
+    seq = list(graph.sequence if sequence is None else sequence)
     if not seq:
-        QtWidgets.QMessageBox.warning(None, "Export Error", "레이어 시퀀스가 비어있습니다. 먼저 레이어를 추가하세요.")
-        return
+        raise ValueError("레이어 시퀀스가 비어있습니다. 먼저 레이어를 추가하세요.")
+    missing = [uid for uid in seq if uid not in graph]
+    seq = [uid for uid in seq if uid in graph]
+    if not seq:
+        raise ValueError("레이어 시퀀스의 레이어를 찾을 수 없습니다.")
+
+    source_graph = graph  # 입력 shape 추정은 최적화 전 그래프로
+    plan = None
+    if inference:
+        from utils.export_passes import optimize_for_inference
+        graph, plan = optimize_for_inference(graph, seq)
+        seq = list(graph.sequence)
+        if not seq:
+            raise ValueError("최적화 후 남은 레이어가 없습니다.")
 
-    # --- header / imports ---
+    order = topological_order(graph, seq)
+    steps, outputs = plan_forward(graph, order, autograd=not inference)
+    blocks = group_sequential(steps) if inference else [[step] for step in steps]
+
+    # --- header / imports / custom module definitions ---
     code_lines = [
         "import torch",
         "import torch.nn as nn",
         "",
-        "# NOTE: If you use custom modules (ResidualBlock, Inception, ...),",
-        "# make sure to import them here, e.g.:",
-        "# from layers.custom_modules import ResidualBlock, Inception",
-        "",
+    ]
+    if plan is not None:
+        code_lines.insert(0, f"# Inference export: {plan.summary()}")
+    module_args = module_arguments(graph, order)
+    layer_types = [graph.node(uid).layer_type for uid in order]
+    for name in module_args:
+        layer_types.extend(t for t, _ in graph.modules[name].layers)
+    emitted = set()
+    for layer_type in layer_types:
+        custom = CUSTOM_MODULES.get(layer_type)
+        if custom is not None and custom[2] not in emitted:
+            emitted.add(custom[2])
+            code_lines.extend(["", custom[2], ""])
+    # 사용자 정의 모듈: instance가 몇 개든 클래스는 한 번
+    for name, free in module_args.items():
+        code_lines.extend(["", module_class_source(graph.modules[name], free), ""])
+
+    code_lines.extend([
         "class Net(nn.Module):",
         "    def __init__(self):",
         "        super(Net, self).__init__()",
-    ]
+    ])
+    for uid in missing:
+        code_lines.append(f"        # WARNING: layer uid {uid} not found (skipped)")
 
-    # --- create layer attributes in the same order as seq (important) ---
-    for uid in seq:
-        if uid not in layer_items:
-            # skip missing uids but warn in comment
-            code_lines.append(f"        # WARNING: layer uid {uid} not found (skipped)")
-            continue
-        item = layer_items[uid]
-        cls = item.layer_type
-        params = item.params or {}
-        # represent parameters safely
-        kv = [f"{k}={repr(v)}" for k, v in params.items()]
-        code_lines.append(f"        self.l{uid} = nn.{cls}({', '.join(kv)})")
-
-    # --- forward ---
+    # --- create layer attributes in forward order (직렬 블록은 nn.Sequential 하나로) ---
+    block_names = []
+    training_keys = {}  # 학습 export의 attribute 이름 -> 이 모델의 state_dict prefix
+    for n, block in enumerate(blocks, 1):
+        if len(block) == 1:
+            step = block[0]
+            name = f"l{step.uid}"
+            code_lines.append(f"        self.{name} = {_module_expr(graph.node(step.uid), step.inplace_ok, module_args)}")
+            training_keys[name] = name
+        else:
+            name = f"b{n}"
+            code_lines.append(f"        self.{name} = nn.Sequential(")
+            for i, step in enumerate(block):
+                code_lines.append(f"            {_module_expr(graph.node(step.uid), step.inplace_ok, module_args)},")
+                training_keys[f"l{step.uid}"] = f"{name}.{i}"
+            code_lines.append("        )")
+        block_names.append(name)
+
+    # --- forward: topological order, merge = elementwise add, release tensors after their last use ---
     code_lines.append("")
+    if inference:
+        code_lines.append("    @torch.inference_mode()")
     code_lines.append("    def forward(self, x):")
-    for uid in seq:
-        if uid not in layer_items:
-            code_lines.append(f"        # skipped missing layer {uid}")
-            continue
-        code_lines.append(f"        x = self.l{uid}(x)")
-    code_lines.append("        return x")
+    for name, block in zip(block_names, blocks):
+        code_lines.append(_call_line(name, block[0].args, block[-1].out))
+        released = [n for step in block for n in step.released]
+        if released:
+            code_lines.append(f"        del {', '.join(released)}")
+    code_lines.append(f"        return {outputs[0]}" if len(outputs) == 1 else f"        return {', '.join(outputs)}")
     code_lines.append("")
 
-    # --- simple runtime test (estimate input shape from first layer) ---
-    # Try to build a sensible input tensor for a quick smoke test
-    first_item = layer_items.get(seq[0], None)
-    if first_item:
-        if "in_channels" in (first_item.params or {}):
-            c = first_item.params.get("in_channels", 3)
-            # common default image size
-            test_shape = f"(1, {c}, 224, 224)"
-            test_call = f"y = model(torch.randn{test_shape})"
-        elif "in_features" in (first_item.params or {}):
-            f = first_item.params.get("in_features", 128)
-            test_shape = f"(1, {f})"
-            test_call = f"y = model(torch.randn{test_shape})"
-        else:
-            test_call = "y = model(torch.randn(1, 128))"
-    else:
-        test_call = "y = model(torch.randn(1, 128))"
+    if plan is not None:
+        code_lines.append("")
+        code_lines.append(f"TRAINING_KEYS = {training_keys!r}")
+        folded = {f"l{conv}": (f"l{bn}", eps) for conv, (bn, eps) in plan.folded.items()}
+        code_lines.append(f"FOLDED_BN = {folded!r}")
+        code_lines.extend(["", "", LOAD_TRAINING_WEIGHTS_SOURCE, ""])
+
+    # --- simple runtime test: input tensor from graph.input_shape (unknown dims guessed via shape inference) ---
+    try:
+        test_shape, guessed = runnable_input_shape(source_graph)
+        if guessed:
+            code_lines.append(f"# input shape guessed as {test_shape}: set Input shape in the designer if this is wrong")
+    except ValueError:
+        test_shape = (128,)
+        code_lines.append("# input shape unknown: the smoke test below uses (N, 128)")
+    # training export는 batch 2 (BatchNorm은 train 모드에서 batch > 1)
+    test_call = f"y = model(torch.randn({'1' if inference else '2'}, {', '.join(str(d) for d in test_shape)}))"
 
     code_lines.append("if __name__ == '__main__':")
-    code_lines.append("    model = Net()")
+    code_lines.append("    model = Net().eval()" if inference else "    model = Net()")
     code_lines.append(f"    {test_call}")
-    code_lines.append("    print(y.shape)")
+    code_lines.append("    print(y.shape)" if len(outputs) == 1 else "    print([t.shape for t in y])")
+    if not inference:
+        # training export: backward까지 통과하는지 확인 (in-place activation이 autograd가 쓰는 텐서를 덮어쓰면 여기서 실패)
+        code_lines.append("    loss = y.float().sum()" if len(outputs) == 1 else
+                          "    loss = sum(t.float().sum() for t in y)")
+        code_lines.append("    if loss.requires_grad:")
+        code_lines.append("        loss.backward()")
+        code_lines.append("        print('backward ok')")
+    return "\n".join(code_lines)
+
+
+def export_to_pytorch(graph, sequence=None):
+    """Generate code from the graph and show it in a dialog (save to .py 가능)"""
+    from PyQt5 import QtWidgets
+
+    try:
+        code = generate_pytorch_code(graph, sequence)
+    except ValueError as e:
+        QtWidgets.QMessageBox.warning(None, "Export Error", str(e))
+        return
 
     # --- dialog to show & save code ---
     dlg = QtWidgets.QDialog()
     dlg.setWindowTitle("Exported PyTorch Code")
     dlg.resize(800, 600)
     layout = QtWidgets.QVBoxLayout(dlg)
+    inference_check = QtWidgets.QCheckBox("Inference mode (fold Conv+BN, drop Dropout, nn.Sequential, inference_mode)")
+    layout.addWidget(inference_check)
     te = QtWidgets.QPlainTextEdit()
-    te.setPlainText("\n".join(code_lines))
+    te.setPlainText(code)
     layout.addWidget(te)
 
+    def regenerate(checked):
+        try:
+            te.setPlainText(generate_pytorch_code(graph, sequence, inference=checked))
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(dlg, "Export Error", str(e))
+
+    inference_check.toggled.connect(regenerate)
+
     btns = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Save | QtWidgets.QDialogButtonBox.Close)
     layout.addWidget(btns)
 
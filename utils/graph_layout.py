@@ -0,0 +1,220 @@
+# Description: Layered (Sugiyama-style) DAG layout, Qt-free so it can run on a worker thread.
+# Steps: cycle removal (DFS back edges reversed) -> longest-path ranks -> dummy nodes on long edges ->
+# barycenter sweeps that keep the ordering with the fewest crossings (counted with a Fenwick tree) ->
+# x coordinates by isotonic regression toward the neighbours' mean (order preserved, minimum gap 1).
+# Every step is O((V + E) log V) with V/E including the dummy nodes, and the number of sweeps is fixed.
+# A plain chain comes out as the familiar single column; layers without any connection are stacked below
+# the connected part in sequence order (the canvas derives the sequence from y, so their order is kept).
+import heapq
+
+X_GAP = 220   # LayerItem 폭 180 + 여백
+Y_GAP = 100   # DesignTab 기존 세로 간격
+SWEEPS = 8    # barycenter sweep 횟수 (위->아래, 아래->위 번갈아)
+COORD_PASSES = 4
+
+
+def layout_snapshot(graph):
+    """worker에 넘길 독립 데이터 (version, uid 순서, edges) — sequence 순서가 먼저, 나머지는 뒤에"""
+    uids = [uid for uid in graph.sequence if uid in graph]
+    seen = set(uids)
+    uids.extend(uid for uid in graph.uids() if uid not in seen)
+    return graph.version, uids, list(graph.edges())
+
+
+def layout_task(task, snapshot):
+    """BackgroundTask용: (version, {uid: (x, y)})"""
+    version, uids, edges = snapshot
+    task.report(0, 0, f"Laying out {len(uids)} layers...")
+    return version, layered_layout(uids, edges)
+
+
+def _acyclic(n, succ):
+    """DFS (index 순)로 back edge를 찾아 뒤집은 DAG 간선 목록 (self loop / 중복 제거)"""
+    state = [0] * n  # 0: 미방문, 1: DFS stack 위, 2: 완료
+    edges = set()
+    for root in range(n):
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, iter(succ[root]))]
+        while stack:
+            u, it = stack[-1]
+            for v in it:
+                if state[v] == 0:
+                    edges.add((u, v))
+                    state[v] = 1
+                    stack.append((v, iter(succ[v])))
+                    break
+                if v != u:
+                    edges.add((v, u) if state[v] == 1 else (u, v))
+            else:
+                state[u] = 2
+                stack.pop()
+    return edges
+
+
+def _ranks(n, edges):
+    """longest path rank (위상 순서는 index가 작은 쪽 우선, heap)"""
+    succ = [[] for _ in range(n)]
+    indegree = [0] * n
+    for u, v in edges:
+        succ[u].append(v)
+        indegree[v] += 1
+    rank = [0] * n
+    ready = [i for i in range(n) if indegree[i] == 0]
+    heapq.heapify(ready)
+    while ready:
+        u = heapq.heappop(ready)
+        for v in succ[u]:
+            rank[v] = max(rank[v], rank[u] + 1)
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                heapq.heappush(ready, v)
+    return rank
+
+
+def _crossings(upper, lower, succ, pos):
+    """인접한 두 층 사이 교차 수 (간선을 위 순서로 정렬한 뒤 아래 위치의 inversion 수, Fenwick tree)"""
+    targets = []
+    for u in upper:
+        targets.extend(sorted(pos[v] for v in succ[u]))
+    size = len(lower)
+    tree = [0] * (size + 1)
+    total = 0
+    seen = 0
+    for p in targets:
+        # 이미 본 간선 중 p보다 오른쪽으로 가는 것 = 교차
+        i, le = p + 1, 0
+        while i > 0:
+            le += tree[i]
+            i -= i & -i
+        total += seen - le
+        i = p + 1
+        while i <= size:
+            tree[i] += 1
+            i += i & -i
+        seen += 1
+    return total
+
+
+def _total_crossings(layers, succ, pos):
+    return sum(_crossings(layers[r], layers[r + 1], succ, pos) for r in range(len(layers) - 1))
+
+
+def _reorder(layer, neighbours, pos):
+    """barycenter 정렬 (이웃이 없으면 현재 위치 유지, 동률이면 현재 순서)"""
+    def key(v):
+        nb = neighbours[v]
+        return (sum(pos[u] for u in nb) / len(nb) if nb else pos[v]), pos[v]
+    layer.sort(key=key)
+    for i, v in enumerate(layer):
+        pos[v] = i
+
+
+def _isotonic(targets, weights):
+    """
+    x[0] < x[1] < ... (간격 >= 1)을 지키면서 sum w (x - t)^2 최소.
+    y = x - i로 바꾸면 y 비감소 조건의 isotonic regression (pool adjacent violators, O(n))
+    """
+    blocks = []  # [평균, 가중치 합, 원소 수]
+    for i, (t, w) in enumerate(zip(targets, weights)):
+        blocks.append([t - i, w, 1])
+        while len(blocks) > 1 and blocks[-2][0] > blocks[-1][0]:
+            m2, w2, c2 = blocks.pop()
+            m1, w1, c1 = blocks.pop()
+            blocks.append([(m1 * w1 + m2 * w2) / (w1 + w2), w1 + w2, c1 + c2])
+    out = []
+    for mean, _, count in blocks:
+        for _ in range(count):
+            out.append(mean + len(out))
+    return out
+
+
+def _assign_x(layers, preds, succ, is_dummy):
+    x = {}
+    for layer in layers:
+        for i, v in enumerate(layer):
+            x[v] = float(i)
+    # 번갈아 위/아래 이웃의 평균 쪽으로 당김 (dummy는 긴 간선을 곧게 하도록 가중치를 더 줌)
+    for p in range(COORD_PASSES):
+        downward = p % 2 == 0
+        order = layers[1:] if downward else layers[-2::-1]
+        neighbours = preds if downward else succ
+        for layer in order:
+            targets, weights = [], []
+            for v in layer:
+                nb = neighbours[v]
+                targets.append(sum(x[u] for u in nb) / len(nb) if nb else x[v])
+                weights.append((4.0 if is_dummy(v) else 1.0) if nb else 0.25)
+            for v, value in zip(layer, _isotonic(targets, weights)):
+                x[v] = value
+    return x
+
+
+def layered_layout(uids, edges, x_gap=X_GAP, y_gap=Y_GAP, start_x=50.0, start_y=50.0, sweeps=SWEEPS):
+    """
+    uids: 레이어 uid (앞쪽일수록 같은 조건에서 왼쪽/위), edges: (src uid, tgt uid).
+    반환: {uid: (x, y)} — 같은 rank는 같은 y, 왼쪽 끝이 start_x
+    """
+    n = len(uids)
+    if n == 0:
+        return {}
+    index = {uid: i for i, uid in enumerate(uids)}
+    succ = [[] for _ in range(n)]
+    connected = [False] * n
+    for src, tgt in edges:
+        if src in index and tgt in index:
+            succ[index[src]].append(index[tgt])
+            connected[index[src]] = connected[index[tgt]] = True
+    dag = _acyclic(n, succ)
+    rank = _ranks(n, dag)
+    # 연결이 없는 레이어는 연결된 부분의 마지막 rank 아래에 sequence(uids) 순서대로 한 줄씩 쌓음
+    below = max((rank[i] for i in range(n) if connected[i]), default=-1) + 1
+    for k, i in enumerate(i for i in range(n) if not connected[i]):
+        rank[i] = below + k
+
+    # 긴 간선은 rank마다 dummy를 두어 층 사이 간선만 남김
+    succ = [[] for _ in range(n)]
+    preds = [[] for _ in range(n)]
+    for u, v in sorted(dag):
+        prev = u
+        for r in range(rank[u] + 1, rank[v]):
+            d = len(rank)
+            rank.append(r)
+            succ.append([])
+            preds.append([])
+            succ[prev].append(d)
+            preds[d].append(prev)
+            prev = d
+        succ[prev].append(v)
+        preds[v].append(prev)
+
+    layers = [[] for _ in range(max(rank) + 1)]
+    for v, r in enumerate(rank):
+        layers[r].append(v)  # 실제 노드(uids 순서) 다음 dummy (생성 순서)
+    pos = {}
+    for layer in layers:
+        for i, v in enumerate(layer):
+            pos[v] = i
+
+    # crossing minimisation: 교차가 가장 적었던 순서를 유지
+    best = _total_crossings(layers, succ, pos)
+    best_layers = [list(layer) for layer in layers]
+    for s in range(sweeps):
+        if best == 0:
+            break
+        if s % 2 == 0:
+            for layer in layers[1:]:
+                _reorder(layer, preds, pos)
+        else:
+            for layer in layers[-2::-1]:
+                _reorder(layer, succ, pos)
+        crossings = _total_crossings(layers, succ, pos)
+        if crossings < best:
+            best = crossings
+            best_layers = [list(layer) for layer in layers]
+    layers = best_layers
+
+    x = _assign_x(layers, preds, succ, lambda v: v >= n)
+    left = min(x[v] for v in range(n))
+    return {uid: (start_x + (x[i] - left) * x_gap, start_y + rank[i] * y_gap) for i, uid in enumerate(uids)}
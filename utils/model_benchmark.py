@@ -0,0 +1,319 @@
+# Description: CPU benchmark of the exported PyTorch model (Qt-free; torch is only imported by the child).
+# The generated module is written to a temp directory and timed in a separate Python process (warmup +
+# repeated runs per batch size, per-layer times from forward hooks on each design layer, also inside the
+# nn.Sequential blocks of an inference export), so a crash or a slow model never takes the designer down.
+# Results are appended to a JSONL history keyed by design_hash so a design can be compared with the
+# previous run of the same design or with the previously benchmarked revision.
+import os
+import sys
+import json
+import time
+import queue
+import tempfile
+import threading
+import subprocess
+
+from utils.design_io import design_hash
+from utils.export_utils import generate_pytorch_code
+from utils.shape_inference import format_shape, infer_shapes, runnable_input_shape
+
+DEFAULT_BATCH_SIZES = (1, 8, 32)
+DEFAULT_WARMUP = 5
+DEFAULT_REPEAT = 20
+REGRESSION_THRESHOLD = 0.10  # 이전 기록보다 10% 이상 느리면 regression으로 표시
+
+# 자식 프로세스에서 실행: python runner.py model.py config.json
+# stdout 한 줄에 JSON 하나 ({"progress": [done, total, message]} ... 마지막에 {"result": {...}})
+RUNNER_SOURCE = r'''
+import sys
+import json
+import time
+import importlib.util
+
+import torch
+
+
+def emit(obj):
+    sys.stdout.write(json.dumps(obj) + "\n")
+    sys.stdout.flush()
+
+
+def timed_runs(model, x, warmup, repeat):
+    for _ in range(warmup):
+        model(x)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        model(x)
+        times.append(time.perf_counter() - t0)
+    return sorted(times)
+
+
+def design_layers(module, model):
+    """
+    설계 레이어 단위의 (이름, 모듈). training export는 top-level 'l<uid>'가 곧 레이어,
+    inference export는 nn.Sequential 블록 안의 자식을 TRAINING_KEYS ('l<uid>' -> 'b<n>.<i>')로 레이어에 대응
+    """
+    keys = getattr(module, "TRAINING_KEYS", None)
+    if not keys:
+        return list(model.named_children())
+    modules = dict(model.named_modules())
+    return [(name, modules[path]) for name, path in keys.items() if path in modules]
+
+
+def layer_times(model, layers, x, warmup, repeat):
+    """레이어별 forward 시간 (forward pre/post hook 사이), 실행 순서대로"""
+    starts, totals, order = {}, {}, []
+
+    def pre(name):
+        def hook(module, inputs):
+            starts[name] = time.perf_counter()
+        return hook
+
+    def post(name):
+        def hook(module, inputs, output):
+            dt = time.perf_counter() - starts[name]
+            if name not in totals:
+                order.append(name)
+                totals[name] = []
+            totals[name].append(dt)
+        return hook
+
+    handles = []
+    for name, child in layers:
+        handles.append(child.register_forward_pre_hook(pre(name)))
+        handles.append(child.register_forward_hook(post(name)))
+    try:
+        for _ in range(warmup):
+            model(x)
+        starts.clear()
+        totals.clear()
+        del order[:]
+        for _ in range(repeat):
+            model(x)
+    finally:
+        for h in handles:
+            h.remove()
+    rows = []
+    for name in order:
+        times = sorted(totals[name])
+        # 한 forward에서 여러 번 호출될 수 있으므로 호출 수 / repeat 배로 합산
+        per_forward = sum(times) / repeat
+        rows.append({"name": name, "ms": per_forward * 1e3, "calls": len(times) // repeat})
+    return rows
+
+
+def main(model_path, config_path):
+    with open(config_path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    if cfg.get("threads"):
+        torch.set_num_threads(cfg["threads"])
+    spec = importlib.util.spec_from_file_location("exported_model", model_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    model = module.Net().eval()
+
+    shape = cfg["input_shape"]
+    batches = cfg["batch_sizes"]
+    total = len(batches) + 1
+    result = {"torch": torch.__version__, "threads": torch.get_num_threads(), "input_shape": shape,
+              "batches": [], "layers": []}
+    with torch.inference_mode():
+        for i, bs in enumerate(batches):
+            emit({"progress": [i, total, "batch %d" % bs]})
+            times = timed_runs(model, torch.randn(bs, *shape), cfg["warmup"], cfg["repeat"])
+            median = times[len(times) // 2]
+            result["batches"].append({
+                "batch": bs, "median_ms": median * 1e3, "min_ms": times[0] * 1e3,
+                "p90_ms": times[int(0.9 * (len(times) - 1))] * 1e3,
+                "throughput": bs / median if median > 0 else None,
+            })
+        emit({"progress": [len(batches), total, "per-layer"]})
+        result["layers"] = layer_times(model, design_layers(module, model), torch.randn(batches[0], *shape),
+                                       cfg["warmup"], cfg["repeat"])
+    emit({"result": result})
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2])
+'''
+
+
+class BenchmarkCancelled(Exception):
+    """cancelled()가 True를 돌려 자식 프로세스를 종료함"""
+
+
+def benchmark_input_shape(graph):
+    """
+    batch를 뺀 입력 shape. graph.input_shape의 unknown 차원은 shape 추론을 통과하는 흔한 크기로 채움
+    (runnable_input_shape). 실행하면 실패할 shape이면 자식 프로세스를 띄우기 전에 ValueError
+    """
+    shape, _ = runnable_input_shape(graph)
+    errors = infer_shapes(graph, shape).errors
+    if errors:
+        uid, msg = errors[0]
+        raise ValueError(f"입력 {format_shape(shape)}에서 shape 오류 (Layer#{uid}: {msg}). "
+                         "Input shape를 지정하거나 레이어 설정을 고치세요.")
+    return [int(d) for d in shape]
+
+
+def _pump_lines(stream, lines):
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def run_benchmark(graph, batch_sizes=DEFAULT_BATCH_SIZES, warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT,
+                  inference=False, threads=None, python=None, progress=None, cancelled=None, timeout=None):
+    """
+    graph의 export 코드를 자식 프로세스에서 CPU로 측정.
+    - progress(done, total, message): 진행 알림, cancelled(): True면 자식 프로세스를 종료하고 BenchmarkCancelled
+    반환: {"design", "inference", "batches": [...], "layers": [...], "torch", "threads", "time", ...}
+    raises ValueError (export 불가 / shape 모름), RuntimeError (자식 프로세스 실패 / timeout)
+    """
+    code = generate_pytorch_code(graph, inference=inference)
+    config = {"input_shape": benchmark_input_shape(graph), "batch_sizes": list(batch_sizes),
+              "warmup": int(warmup), "repeat": max(1, int(repeat)), "threads": threads}
+    result = None
+    with tempfile.TemporaryDirectory(prefix="nn_bench_") as tmp:
+        model_path = os.path.join(tmp, "model.py")
+        runner_path = os.path.join(tmp, "runner.py")
+        config_path = os.path.join(tmp, "config.json")
+        for path, text in ((model_path, code), (runner_path, RUNNER_SOURCE), (config_path, json.dumps(config))):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+        # stderr는 파일로 (pipe 버퍼가 차서 자식이 멈추는 일 없도록), stdout은 별도 스레드에서 줄 단위로 읽음
+        with open(os.path.join(tmp, "stderr.txt"), "w+", encoding="utf-8") as err:
+            proc = subprocess.Popen([python or sys.executable, runner_path, model_path, config_path], cwd=tmp,
+                                    stdout=subprocess.PIPE, stderr=err, universal_newlines=True)
+            lines = queue.Queue()
+            threading.Thread(target=_pump_lines, args=(proc.stdout, lines), daemon=True).start()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            try:
+                while True:
+                    try:
+                        line = lines.get(timeout=0.1)
+                    except queue.Empty:
+                        if cancelled is not None and cancelled():
+                            raise BenchmarkCancelled()
+                        if deadline is not None and time.monotonic() > deadline:
+                            raise RuntimeError(f"benchmark timed out after {timeout}s")
+                        continue
+                    if line is None:
+                        break
+                    try:
+                        msg = json.loads(line)
+                    except ValueError:
+                        continue  # 생성된 모듈의 print 등
+                    if "progress" in msg and progress is not None:
+                        progress(*msg["progress"])
+                    elif "result" in msg:
+                        result = msg["result"]
+                proc.wait()
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                raise
+            finally:
+                proc.stdout.close()
+            err.seek(0)
+            stderr = err.read()
+    if proc.returncode != 0 or result is None:
+        tail = "\n".join(stderr.strip().splitlines()[-8:])
+        raise RuntimeError(f"benchmark process failed (exit {proc.returncode}):\n{tail}")
+
+    result.update({"design": design_hash(graph), "inference": bool(inference), "layer_count": len(graph),
+                   "time": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    return result
+
+
+# ---------------- History ----------------
+class BenchmarkHistory:
+    """benchmark 결과 JSONL 기록 (한 줄에 run 하나)"""
+    def __init__(self, path):
+        self.path = path
+
+    def entries(self):
+        if not os.path.exists(self.path):
+            return []
+        out = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue
+        return out
+
+    def baseline_for(self, result):
+        """비교 기준: 같은 design(hash)·모드의 마지막 run, 없으면 같은 모드로 마지막에 측정한 design (이전 revision)"""
+        same_mode = [e for e in self.entries() if e.get("inference") == result.get("inference")]
+        for entry in reversed(same_mode):
+            if entry.get("design") == result.get("design"):
+                return entry
+        return same_mode[-1] if same_mode else None
+
+    def append(self, result):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result, separators=(",", ":")) + "\n")
+
+
+def compare(result, baseline, threshold=REGRESSION_THRESHOLD):
+    """batch별 median 비교: [(batch, now_ms, before_ms, ratio, regressed)]"""
+    if baseline is None:
+        return []
+    before = {b["batch"]: b["median_ms"] for b in baseline.get("batches", [])}
+    rows = []
+    for b in result.get("batches", []):
+        old = before.get(b["batch"])
+        if old:
+            ratio = b["median_ms"] / old
+            rows.append((b["batch"], b["median_ms"], old, ratio, ratio > 1.0 + threshold))
+    return rows
+
+
+def format_report(result, baseline=None, top=15):
+    """사람이 읽는 결과 요약 (고정폭 텍스트)"""
+    lines = [f"design {result['design'][:12]}  ({result['layer_count']} layers, "
+             f"{'inference' if result.get('inference') else 'training'} export)",
+             f"torch {result.get('torch')}, {result.get('threads')} threads, input {result.get('input_shape')}",
+             "",
+             f"{'batch':>6} {'median ms':>11} {'min ms':>9} {'p90 ms':>9} {'samples/s':>11}"]
+    for b in result["batches"]:
+        tput = b.get("throughput")
+        lines.append(f"{b['batch']:>6} {b['median_ms']:>11.3f} {b['min_ms']:>9.3f} {b['p90_ms']:>9.3f} "
+                     f"{(tput or 0):>11.1f}")
+
+    rows = compare(result, baseline)
+    if rows:
+        same = baseline.get("design") == result.get("design")
+        lines += ["", f"vs {'previous run of this design' if same else 'previous design ' + baseline['design'][:12]}"
+                      f" ({baseline.get('time')}):"]
+        for batch, now, old, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            lines.append(f"{batch:>6} {old:>11.3f} -> {now:.3f} ms ({(ratio - 1) * 100:+.1f}%){flag}")
+
+    layers = sorted(result.get("layers", []), key=lambda r: -r["ms"])[:top]
+    if layers:
+        total = sum(r["ms"] for r in result["layers"]) or 1.0
+        lines += ["", f"slowest layers (batch {result['batches'][0]['batch']}):"]
+        for r in layers:
+            lines.append(f"  {r['name']:<12} {r['ms']:>9.3f} ms {100 * r['ms'] / total:>5.1f}%")
+    return "\n".join(lines)
+
+
+def benchmark_task(task, graph, inference, history_path):
+    """BackgroundTask용: 측정 후 기록에 추가. (result, baseline) 반환 (graph는 GUI 그래프의 snapshot)"""
+    from utils.design_tasks import TaskCancelled
+    try:
+        result = run_benchmark(graph, inference=inference, progress=task.report, cancelled=task.is_cancelled)
+    except BenchmarkCancelled:
+        raise TaskCancelled()
+    history = BenchmarkHistory(history_path)
+    baseline = history.baseline_for(result)
+    history.append(result)
+    return result, baseline
@@ -0,0 +1,502 @@
+# Description: Qt-free shape propagation over a NetworkGraph.
+# Shapes exclude the batch dimension, e.g. (C, H, W) for images, (F,) for vectors, (T, F) for sequences.
+# Unknown dimensions are None and propagate without raising mismatches.
+import math
+import heapq
+
+from layers.network_graph import MODULE_TYPE
+
+
+class LayerShape:
+    """레이어 한 개의 shape 추론 결과"""
+    __slots__ = ("uid", "layer_type", "in_shape", "out_shape", "error")
+
+    def __init__(self, uid, layer_type, in_shape, out_shape, error=None):
+        self.uid = uid
+        self.layer_type = layer_type
+        self.in_shape = in_shape
+        self.out_shape = out_shape
+        self.error = error
+
+    def __repr__(self):
+        return f"LayerShape({self.layer_type} #{self.uid}: {format_shape(self.in_shape)} -> {format_shape(self.out_shape)})"
+
+
+class ShapeReport:
+    """infer_shapes() 결과: sequence 순서의 LayerShape 목록 + 오류 목록"""
+    def __init__(self, input_shape):
+        self.input_shape = input_shape
+        self.layers = []
+        self.by_uid = {}
+
+    def add(self, layer_shape):
+        self.layers.append(layer_shape)
+        self.by_uid[layer_shape.uid] = layer_shape
+
+    @property
+    def errors(self):
+        return [(ls.uid, ls.error) for ls in self.layers if ls.error]
+
+    @property
+    def ok(self):
+        return not any(ls.error for ls in self.layers)
+
+    @property
+    def output_shape(self):
+        return self.layers[-1].out_shape if self.layers else self.input_shape
+
+
+# ---------------- Helpers ----------------
+def format_shape(shape):
+    if shape is None:
+        return "?"
+    return "(N, " + ", ".join("?" if d is None else str(d) for d in shape) + ")" if shape else "(N)"
+
+
+def parse_shape(text):
+    """'3,224,224' / '(3, 224, 224)' / '3x224x224' -> (3, 224, 224). 빈 문자열은 None, '?'는 unknown"""
+    if text is None:
+        return None
+    text = str(text).strip().strip("()[]")
+    if not text:
+        return None
+    dims = []
+    for tok in text.replace("x", ",").replace("×", ",").split(","):
+        tok = tok.strip()
+        if not tok:
+            continue
+        dims.append(None if tok in ("?", "None", "N") else int(tok))
+    return tuple(dims) if dims else None
+
+
+def _pair(v, default):
+    if v is None:
+        return (default, default)
+    if isinstance(v, (list, tuple)):
+        if len(v) == 1:
+            return (v[0], v[0])
+        return (v[0], v[1])
+    return (v, v)
+
+
+def _prod(dims):
+    total = 1
+    for d in dims:
+        if d is None:
+            return None
+        total *= d
+    return total
+
+
+def _conv_out(size, k, s, p, d=1, ceil_mode=False):
+    if size is None or k is None or s is None or p is None:
+        return None
+    num = size + 2 * p - d * (k - 1) - 1
+    out = (math.ceil(num / s) if ceil_mode else num // s) + 1
+    return out
+
+
+def _mismatch(what, expected, got):
+    return f"{what} 불일치: 입력 {got} != 설정값 {expected}"
+
+
+def _expect_rank(in_shape, rank, layer_type):
+    if in_shape is not None and len(in_shape) != rank:
+        return f"{layer_type} 입력은 {rank + 1}D (N, ...)이어야 합니다: 입력 {format_shape(in_shape)}"
+    return None
+
+
+# ---------------- Per-layer shape rules ----------------
+# rule(params, in_shape) -> (out_shape, error or None)
+
+def _identity(params, in_shape):
+    return in_shape, None
+
+
+def _linear(params, in_shape):
+    in_f = params.get("in_features")
+    out_f = params.get("out_features")
+    if in_shape is None:
+        return (out_f,), None
+    if len(in_shape) == 3:
+        return in_shape[:-1] + (out_f,), "Conv 출력(N, C, H, W) → Linear 연결 전에 Flatten이 필요합니다"
+    err = None
+    if in_shape and in_shape[-1] is not None and in_f is not None and in_shape[-1] != in_f:
+        err = _mismatch("Linear in_features", in_f, in_shape[-1])
+    return tuple(in_shape[:-1]) + (out_f,), err
+
+
+def _conv2d(params, in_shape):
+    in_ch = params.get("in_channels")
+    out_ch = params.get("out_channels")
+    err = _expect_rank(in_shape, 3, "Conv2d")
+    if in_shape is None or err:
+        return (out_ch, None, None), err
+    c, h, w = in_shape
+    if c is not None and in_ch is not None and c != in_ch:
+        err = _mismatch("Conv2d in_channels", in_ch, c)
+    kh, kw = _pair(params.get("kernel_size"), 3)
+    sh, sw = _pair(params.get("stride"), 1)
+    dh, dw = _pair(params.get("dilation"), 1)
+    padding = params.get("padding", 0)
+    if padding == "same":
+        return (out_ch, h, w), err
+    if padding == "valid":
+        padding = 0
+    ph, pw = _pair(padding, 0)
+    oh = _conv_out(h, kh, sh, ph, dh)
+    ow = _conv_out(w, kw, sw, pw, dw)
+    if (oh is not None and oh <= 0) or (ow is not None and ow <= 0):
+        err = err or f"Conv2d 출력 크기가 0 이하입니다: 입력 {format_shape(in_shape)}"
+    return (out_ch, oh, ow), err
+
+
+def _pool2d(params, in_shape, name, use_dilation):
+    err = _expect_rank(in_shape, 3, name)
+    if in_shape is None or err:
+        return in_shape, err
+    c, h, w = in_shape
+    kh, kw = _pair(params.get("kernel_size"), 2)
+    sh, sw = _pair(params.get("stride"), None)
+    sh = kh if sh is None else sh
+    sw = kw if sw is None else sw
+    ph, pw = _pair(params.get("padding"), 0)
+    dh, dw = _pair(params.get("dilation"), 1) if use_dilation else (1, 1)
+    ceil_mode = bool(params.get("ceil_mode", False))
+    oh = _conv_out(h, kh, sh, ph, dh, ceil_mode)
+    ow = _conv_out(w, kw, sw, pw, dw, ceil_mode)
+    if (oh is not None and oh <= 0) or (ow is not None and ow <= 0):
+        err = f"{name} 출력 크기가 0 이하입니다: 입력 {format_shape(in_shape)}"
+    return (c, oh, ow), err
+
+
+def _maxpool2d(params, in_shape):
+    return _pool2d(params, in_shape, "MaxPool2d", True)
+
+
+def _avgpool2d(params, in_shape):
+    return _pool2d(params, in_shape, "AvgPool2d", False)
+
+
+def _adaptive_pool2d(params, in_shape):
+    err = _expect_rank(in_shape, 3, "AdaptiveAvgPool2d")
+    if in_shape is None or err:
+        return in_shape, err
+    c, h, w = in_shape
+    oh, ow = _pair(params.get("output_size"), 1)
+    return (c, h if oh is None else oh, w if ow is None else ow), None
+
+
+def _flatten(params, in_shape):
+    if in_shape is None:
+        return (None,), None
+    full = (None,) + tuple(in_shape)  # batch 포함 dim 번호로 계산
+    rank = len(full)
+    start = params.get("start_dim", 1)
+    end = params.get("end_dim", -1)
+    start = start + rank if start < 0 else start
+    end = end + rank if end < 0 else end
+    if not (0 <= start <= end < rank):
+        return in_shape, f"Flatten dim 범위 오류: start_dim={start}, end_dim={end}, 입력 {format_shape(in_shape)}"
+    if start == 0:
+        return in_shape, "Flatten start_dim=0은 batch 차원까지 합칩니다 (지원하지 않음)"
+    merged = _prod(full[start:end + 1])
+    return tuple(full[1:start]) + (merged,) + tuple(full[end + 1:]), None
+
+
+def _batchnorm2d(params, in_shape):
+    err = _expect_rank(in_shape, 3, "BatchNorm2d")
+    if in_shape is None or err:
+        return in_shape, err
+    num = params.get("num_features")
+    if in_shape[0] is not None and num is not None and in_shape[0] != num:
+        err = _mismatch("BatchNorm2d num_features", num, in_shape[0])
+    return in_shape, err
+
+
+def _lstm(params, in_shape):
+    hidden = params.get("hidden_size")
+    mult = 2 if params.get("bidirectional", False) else 1
+    out_f = hidden * mult if hidden is not None else None
+    if in_shape is None:
+        return (None, out_f), None
+    if len(in_shape) != 2:
+        return (None, out_f), f"LSTM 입력은 3D (N, T, F)이어야 합니다: 입력 {format_shape(in_shape)}"
+    err = None
+    in_f = params.get("input_size")
+    if in_shape[-1] is not None and in_f is not None and in_shape[-1] != in_f:
+        err = _mismatch("LSTM input_size", in_f, in_shape[-1])
+    return (in_shape[0], out_f), err
+
+
+def _residual_block(params, in_shape):
+    in_ch = params.get("in_channels")
+    out_ch = params.get("out_channels")
+    err = _expect_rank(in_shape, 3, "ResidualBlock")
+    if in_shape is None or err:
+        return (out_ch, None, None), err
+    c, h, w = in_shape
+    if c is not None and in_ch is not None and c != in_ch:
+        err = _mismatch("ResidualBlock in_channels", in_ch, c)
+    stride = params.get("stride", 1)
+    # 첫 번째 3x3 conv만 stride 적용 (padding 1), 이후 반복은 크기 유지
+    return (out_ch, _conv_out(h, 3, stride, 1), _conv_out(w, 3, stride, 1)), err
+
+
+INCEPTION_BRANCHES = ("out_1x1", "out_3x3", "out_5x5", "out_pool_proj")
+
+
+def _inception(params, in_shape):
+    in_ch = params.get("in_channels")
+    outs = [params.get(k) for k in INCEPTION_BRANCHES]
+    out_ch = None if any(o is None for o in outs) else sum(outs)
+    err = _expect_rank(in_shape, 3, "Inception")
+    if in_shape is None or err:
+        return (out_ch, None, None), err
+    c, h, w = in_shape
+    if c is not None and in_ch is not None and c != in_ch:
+        err = _mismatch("Inception in_channels", in_ch, c)
+    # 모든 브랜치가 공간 크기 유지 후 채널 방향 concat
+    return (out_ch, h, w), err
+
+
+SHAPE_RULES = {
+    "Linear": _linear,
+    "Conv2d": _conv2d,
+    "ReLU": _identity,
+    "Flatten": _flatten,
+    "Dropout": _identity,
+    "BatchNorm2d": _batchnorm2d,
+    "MaxPool2d": _maxpool2d,
+    "AvgPool2d": _avgpool2d,
+    "AdaptiveAvgPool2d": _adaptive_pool2d,
+    "LSTM": _lstm,
+    "ResidualBlock": _residual_block,
+    "ResBlock": _residual_block,
+    "Inception": _inception,
+}
+
+
+def infer_layer_shape(layer_type, params, in_shape, modules=None):
+    """
+    레이어 하나의 (out_shape, error). 규칙이 없는 타입은 shape 유지로 간주.
+    modules: NetworkGraph.modules — MODULE_TYPE은 정의의 레이어들을 차례로 통과시킴
+    """
+    if layer_type == MODULE_TYPE:
+        return _module_shape(params or {}, in_shape, modules or {})
+    rule = SHAPE_RULES.get(layer_type, _identity)
+    try:
+        return rule(params or {}, in_shape)
+    except (TypeError, ValueError, ZeroDivisionError) as e:
+        # 파라미터 타입 오류 (문자열 등) -> shape unknown
+        return None, f"{layer_type} 파라미터 오류: {e}"
+
+
+def _module_shape(params, in_shape, modules):
+    name = params.get("module")
+    definition = modules.get(name)
+    if definition is None:
+        return None, f"정의되지 않은 모듈: {name}"
+    shape = in_shape
+    for i, (layer_type, layer_params) in enumerate(definition.resolve(params.get("overrides"))):
+        shape, err = infer_layer_shape(layer_type, layer_params, shape)
+        if err:
+            return shape, f"{name}[{i}] {layer_type}: {err}"
+    return shape, None
+
+
+def default_input_shape(graph):
+    """input shape 미설정 시 첫 레이어로부터 추정 (공간 크기 등은 unknown)"""
+    layers = graph.ordered_nodes()
+    if not layers:
+        return None
+    # 펼친 ResidualBlock의 Identity 진입점처럼 shape을 바꾸지 않는 레이어는 건너뜀
+    first = next((n for n in layers if n.layer_type != "Identity"), layers[0])
+    layer_type, p = first.layer_type, first.params or {}
+    resolved = graph.module_layers(first)
+    if resolved:
+        layer_type, p = resolved[0]  # 모듈이면 그 첫 레이어로
+    if layer_type in ("Conv2d", "ResidualBlock", "ResBlock", "Inception"):
+        return (p.get("in_channels"), None, None)
+    if layer_type == "BatchNorm2d":
+        return (p.get("num_features"), None, None)
+    if layer_type == "Linear":
+        return (p.get("in_features"),)
+    if layer_type == "LSTM":
+        return (None, p.get("input_size"))
+    return None
+
+
+# 입력 shape에 unknown 차원이 있을 때 실행용으로 넣어 볼 값 (앞쪽이 우선)
+SPATIAL_GUESSES = (224, 227, 299, 256, 128, 96, 64, 32, 28)
+DEFAULT_DIM_GUESS = {3: (3, None, None), 2: (32, 128), 1: (128,)}  # rank별 H/W 외 차원 기본값
+
+
+def runnable_input_shape(graph):
+    """
+    실제 텐서로 실행할 입력 shape (batch 제외, unknown 없음)와 그 값을 추정했는지: (shape, guessed).
+    - graph.input_shape에 unknown이 없으면 그대로 (guessed=False)
+    - 아니면 unknown 차원에 흔한 크기를 넣어 보고 infer_shapes가 오류 없이 통과하는 첫 후보 (guessed=True)
+      (C, H, W)의 H/W는 SPATIAL_GUESSES를 정사각형으로 차례로 시도
+    raises ValueError: 입력 shape을 알 수 없거나 shape 추론을 통과하는 후보가 없을 때
+    """
+    shape = getattr(graph, "input_shape", None) or default_input_shape(graph)
+    if shape is None:
+        raise ValueError("입력 shape을 알 수 없습니다. Input shape를 지정하세요 (예: 3,224,224).")
+    shape = tuple(shape)
+    if all(d is not None for d in shape):
+        return shape, False
+    defaults = DEFAULT_DIM_GUESS.get(len(shape), (128,) * len(shape))
+    sizes = SPATIAL_GUESSES if len(shape) == 3 and None in shape[1:] else (None,)
+    for size in sizes:
+        guess = tuple(d if d is not None else (size if i > 0 and len(shape) == 3 else defaults[i])
+                      for i, d in enumerate(shape))
+        if infer_shapes(graph, guess).ok:
+            return guess, True
+    raise ValueError(f"입력 shape {format_shape(shape)}의 unknown 차원을 추정할 수 없습니다. "
+                     "Input shape를 지정하세요 (예: 3,224,224).")
+
+
+def merge_input_shape(shapes):
+    """여러 predecessor 출력 shape를 하나의 입력 shape로 (elementwise add 가정)"""
+    known = [s for s in shapes if s is not None]
+    if not known:
+        return None, None
+    first = known[0]
+    for s in known[1:]:
+        if len(s) != len(first) or any(a is not None and b is not None and a != b for a, b in zip(s, first)):
+            return first, f"병합 입력 shape 불일치: {', '.join(format_shape(x) for x in known)}"
+    return first, None
+
+
+def infer_shapes(graph, input_shape=None):
+    """
+    graph.sequence 순서로 한 번 훑으며 각 레이어의 입력/출력 shape를 계산 (O(layers + edges)).
+    - 입력 shape: predecessor(들)의 출력 (없으면 graph 입력 shape)
+    - input_shape가 None이면 graph.input_shape, 그것도 없으면 첫 레이어로 추정
+    """
+    if input_shape is None:
+        input_shape = getattr(graph, "input_shape", None) or default_input_shape(graph)
+    report = ShapeReport(input_shape)
+    outputs = {}
+    for node in graph.ordered_nodes():
+        if node.inputs:
+            # 아직 계산되지 않은 predecessor(sequence상 뒤쪽)는 unknown
+            in_shape, merge_err = merge_input_shape([outputs.get(src) for src in node.inputs])
+        else:
+            in_shape, merge_err = input_shape, None
+        out_shape, err = infer_layer_shape(node.layer_type, node.params, in_shape, graph.modules)
+        outputs[node.uid] = out_shape
+        report.add(LayerShape(node.uid, node.layer_type, in_shape, out_shape, merge_err or err))
+    return report
+
+
+class ShapeCache:
+    """
+    레이어별 입력/출력 shape 메모이제이션 + dirty flag 무효화.
+    - 구조(graph.version)나 입력 shape가 바뀌면 전체 재계산
+    - 파라미터만 바뀐 경우 invalidate(uid) 후 update(): 그 레이어부터 downstream으로만 전파하고,
+      출력 shape가 이전과 같으면 그 아래로는 더 내려가지 않음 (early cut-off)
+    결과는 infer_shapes()의 한 번 훑기와 동일하다.
+    """
+    def __init__(self, graph, input_shape=None):
+        self.graph = graph
+        self.input_shape = input_shape  # None이면 graph.input_shape / 추정값
+        self.results = {}               # uid -> LayerShape
+        self.last_evaluated = 0         # 마지막 update()에서 다시 계산한 레이어 수
+        self.last_evaluated_uids = []   # 마지막 update()에서 다시 계산한 레이어 (CostCache 등에서 사용)
+        self.last_full = False          # 마지막 update()가 전체 재계산이었는지
+        self._positions = {}            # uid -> sequence index
+        self._dirty = set()
+        self._version = None
+        self._resolved_input = None
+
+    def invalidate(self, uid=None):
+        """uid의 파라미터가 바뀜 (None이면 전체)"""
+        if uid is None:
+            self._version = None
+        else:
+            self._dirty.add(uid)
+
+    def _current_input_shape(self):
+        if self.input_shape is not None:
+            return self.input_shape
+        return getattr(self.graph, "input_shape", None) or default_input_shape(self.graph)
+
+    def _in_shape_for(self, node, input_shape):
+        if not node.inputs:
+            return input_shape, None
+        pos = self._positions[node.uid]
+        shapes = []
+        for src in node.inputs:
+            # sequence상 뒤쪽 predecessor는 unknown (infer_shapes와 동일)
+            if self._positions.get(src, pos) < pos:
+                ls = self.results.get(src)
+                shapes.append(ls.out_shape if ls is not None else None)
+            else:
+                shapes.append(None)
+        return merge_input_shape(shapes)
+
+    def update(self):
+        """dirty 레이어를 다시 계산하고, 결과가 바뀐 LayerShape 목록을 반환"""
+        input_shape = self._current_input_shape()
+        if self._version != self.graph.version or input_shape != self._resolved_input:
+            return self._recompute_all(input_shape)
+
+        changed = []
+        heap = [(self._positions[uid], uid) for uid in self._dirty if uid in self._positions]
+        heapq.heapify(heap)
+        self._dirty.clear()
+        done = set()
+        evaluated = []
+        while heap:
+            _, uid = heapq.heappop(heap)
+            if uid in done:
+                continue
+            done.add(uid)
+            node = self.graph.get(uid)
+            if node is None:
+                continue
+            evaluated.append(uid)
+            in_shape, merge_err = self._in_shape_for(node, input_shape)
+            out_shape, err = infer_layer_shape(node.layer_type, node.params, in_shape, self.graph.modules)
+            new = LayerShape(uid, node.layer_type, in_shape, out_shape, merge_err or err)
+            old = self.results.get(uid)
+            self.results[uid] = new
+            if old is None or (old.in_shape, old.out_shape, old.error) != (new.in_shape, new.out_shape, new.error):
+                changed.append(new)
+            if old is None or old.out_shape != out_shape:
+                for succ in node.outputs:
+                    if self._positions.get(succ, -1) > self._positions[uid]:
+                        heapq.heappush(heap, (self._positions[succ], succ))
+        self.last_evaluated = len(evaluated)
+        self.last_evaluated_uids = evaluated
+        self.last_full = False
+        return changed
+
+    def _recompute_all(self, input_shape):
+        old_results = self.results
+        report = infer_shapes(self.graph, input_shape)
+        self.results = report.by_uid
+        self._positions = {ls.uid: i for i, ls in enumerate(report.layers)}
+        self._dirty.clear()
+        self._version = self.graph.version
+        self._resolved_input = input_shape
+        self.last_evaluated = len(report.layers)
+        self.last_evaluated_uids = [ls.uid for ls in report.layers]
+        self.last_full = True
+        changed = []
+        for ls in report.layers:
+            old = old_results.get(ls.uid)
+            if old is None or (old.in_shape, old.out_shape, old.error) != (ls.in_shape, ls.out_shape, ls.error):
+                changed.append(ls)
+        return changed
+
+    def report(self):
+        """현재 캐시로 ShapeReport 구성 (update() 이후 호출)"""
+        report = ShapeReport(self._resolved_input)
+        for node in self.graph.ordered_nodes():
+            ls = self.results.get(node.uid)
+            if ls is not None:
+                report.add(ls)
+        return report
@@ -1,19 +1,78 @@
 # theme_utils.py
+# Description: Theme manager — each .qss is read once (path resolved from the package, not the CWD)
+# and applied once at the QApplication level, so a theme switch costs a single repolish.
+import os
 from PyQt5 import QtWidgets
 
+THEME_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "themes")
+THEME_FILES = {
+    "dark": "dark_theme.qss",
+    "light": "light_theme.qss",
+    "gray": "gray_theme.qss",
+}
+DEFAULT_THEME = "dark"
+
+
+class ThemeManager:
+    """
+    테마 stylesheet 캐시 + 앱 단위 적용
+    - stylesheet(name): 파일은 테마마다 한 번만 읽음
+    - apply(name): QApplication에 한 번만 적용 (같은 테마면 아무것도 하지 않음)
+    """
+    def __init__(self, theme_dir=THEME_DIR):
+        self.theme_dir = theme_dir
+        self.current = None
+        self._cache = {}  # theme name -> qss text
+
+    @staticmethod
+    def normalize(theme_name):
+        name = str(theme_name or DEFAULT_THEME).lower()
+        return name if name in THEME_FILES else DEFAULT_THEME
+
+    def path_for(self, theme_name):
+        return os.path.join(self.theme_dir, THEME_FILES[self.normalize(theme_name)])
+
+    def stylesheet(self, theme_name):
+        """테마 stylesheet 텍스트 (캐시)"""
+        name = self.normalize(theme_name)
+        qss = self._cache.get(name)
+        if qss is None:
+            path = self.path_for(name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    qss = f.read()
+            except FileNotFoundError:
+                print(f"[ThemeManager] QSS 파일 '{path}' 없음")
+                qss = ""
+            self._cache[name] = qss
+        return qss
+
+    def apply_to(self, target, theme_name):
+        """target(QApplication 또는 QWidget)에 stylesheet 적용. 이미 같으면 repolish를 일으키지 않음"""
+        qss = self.stylesheet(theme_name)
+        if target.styleSheet() != qss:
+            target.setStyleSheet(qss)
+
+    def apply(self, theme_name, app=None):
+        """앱 전체에 테마 적용 (자식 위젯은 앱 stylesheet를 상속하므로 위젯별 적용 불필요)"""
+        name = self.normalize(theme_name)
+        app = app or QtWidgets.QApplication.instance()
+        if app is None:
+            return name
+        self.apply_to(app, name)
+        self.current = name
+        return name
+
+
+theme_manager = ThemeManager()
+
+
 def apply_theme_to_window(window, theme_name="dark"):
-    """QMainWindow 같은 윈도우 전체에 테마 적용"""
-    qss_file = {
-        "dark": "data/themes/dark_theme.qss",
-        "light": "data/themes/light_theme.qss",
-        "gray": "data/themes/gray_theme.qss"
-    }.get(theme_name, "data/themes/dark_theme.qss")
-
-    try:
-        with open(qss_file, "r", encoding="utf-8") as f:
-            window.setStyleSheet(f.read())
-    except FileNotFoundError:
-        print(f"[apply_theme_to_window] QSS 파일 '{qss_file}' 없음")
+    """QMainWindow 같은 윈도우 전체에 테마 적용 (QApplication이면 앱 단위 적용)"""
+    if isinstance(window, QtWidgets.QApplication):
+        theme_manager.apply(theme_name, window)
+    else:
+        theme_manager.apply_to(window, theme_name)
 
     # Footer가 존재하면 스타일 동기화
     if hasattr(window, "status_bar") and window.status_bar is not None:
@@ -22,14 +81,4 @@ def apply_theme_to_window(window, theme_name="dark"):
 
 def apply_theme_to_widget(widget, theme_name="dark"):
     """개별 QWidget에 테마 적용"""
-    qss_file = {
-        "dark": "data/themes/dark_theme.qss",
-        "light": "data/themes/light_theme.qss",
-        "gray": "data/themes/gray_theme.qss"
-    }.get(theme_name, "data/themes/dark_theme.qss")
-
-    try:
-        with open(qss_file, "r", encoding="utf-8") as f:
-            widget.setStyleSheet(f.read())
-    except FileNotFoundError:
-        print(f"[apply_theme_to_widget] QSS 파일 '{qss_file}' 없음")
+    theme_manager.apply_to(widget, theme_name)
@@ -0,0 +1,322 @@
+# Description: Memory-bounded undo/redo stack over NetworkGraph changes (Qt-free).
+# Commands store the deltas reported by NetworkGraph.observer (add/remove/move/params/connect/sequence/...)
+# and undo them by applying the inverse operations in reverse order, so undo cost and memory are O(change),
+# not O(design). Consecutive moves of a layer inside one command collapse into a single delta.
+import sys
+
+DEFAULT_MEMORY_LIMIT = 64 << 20   # 64 MB
+_NODE_BYTES = 600                 # clear/replace 명령이 붙잡고 있는 노드 하나의 대략적인 크기
+
+
+def _seq_diff(old, new):
+    """두 sequence의 공통 앞/뒤를 잘라낸 차이 (start, old_mid, new_mid) — 한 레이어 이동이면 O(1) 크기"""
+    n_old, n_new = len(old), len(new)
+    start = 0
+    limit = min(n_old, n_new)
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[n_old - 1 - end] == new[n_new - 1 - end]:
+        end += 1
+    return start, tuple(old[start:n_old - end]), tuple(new[start:n_new - end])
+
+
+def _apply_seq_diff(seq, start, remove, insert):
+    return seq[:start] + list(insert) + seq[start + len(remove):]
+
+
+def _params_bytes(params):
+    try:
+        return sys.getsizeof(params) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in params.items())
+    except Exception:
+        return 256
+
+
+class GraphCommand:
+    """사용자 동작 하나에 해당하는 graph 변경 묶음 (delta 목록)"""
+    __slots__ = ("text", "ops", "nbytes", "_move_index")
+
+    def __init__(self, text=""):
+        self.text = text
+        self.ops = []          # (op, fields) — fields는 역연산에 필요한 값만 보관
+        self.nbytes = 0
+        self._move_index = {}  # uid -> ops 안의 move 위치 (같은 명령 안의 연속 이동은 합침)
+
+    def __len__(self):
+        return len(self.ops)
+
+    # ---------------- Recording ----------------
+    def record(self, op, fields):
+        if op == "move":
+            idx = self._move_index.get(fields["uid"])
+            if idx is not None:
+                # 이전 이동과 합침: 처음 위치(old)는 유지, 새 위치만 갱신
+                # (위치는 다른 연산과 독립이라 중간에 다른 연산이 있어도 결과가 같음)
+                prev = self.ops[idx][1]
+                self.ops[idx] = ("move", {"uid": prev["uid"], "pos": fields["pos"], "old": prev["old"]})
+                return
+            self._move_index[fields["uid"]] = len(self.ops)
+            entry = {"uid": fields["uid"], "pos": fields["pos"], "old": fields["old"]}
+            size = 120
+        elif op == "sequence":
+            start, removed, inserted = _seq_diff(fields["old"], fields["uids"])
+            entry = {"start": start, "old": removed, "new": inserted}
+            size = 120 + 8 * (len(removed) + len(inserted))
+        elif op in ("add", "remove", "params"):
+            entry = dict(fields)
+            size = 200 + _params_bytes(fields.get("params") or {}) + _params_bytes(fields.get("old") or {})
+        elif op in ("clear", "replace"):
+            entry = dict(fields)
+            size = 200 + _NODE_BYTES * sum(len(state[0]) for key, state in fields.items() if state)
+        elif op == "clear_connections":
+            entry = {"edges": list(fields.get("edges") or [])}
+            size = 120 + 72 * len(entry["edges"])
+        elif op == "define_module":
+            entry = dict(fields)
+            size = 200 + sum(_params_bytes(params) for layers in (fields.get("layers"), fields.get("old"))
+                             for _, params in layers or ())
+        else:
+            entry = dict(fields)
+            size = 120
+        self.ops.append((op, entry))
+        self.nbytes += size
+
+    def is_move_only(self):
+        return bool(self.ops) and all(op == "move" for op, _ in self.ops)
+
+    def moved_uids(self):
+        return {f["uid"] for op, f in self.ops if op == "move"}
+
+    def merge(self, other):
+        """other(이동만 있는 명령)를 이 명령에 합침 — 같은 레이어들을 연달아 드래그한 경우"""
+        for op, fields in other.ops:
+            self.record(op, fields)
+
+    def describe(self):
+        """명령 이름 자동 생성 (Undo/Redo 툴팁용)"""
+        if self.text:
+            return self.text
+        kinds = [op for op, _ in self.ops]
+        n_add, n_remove = kinds.count("add"), kinds.count("remove")
+        if "clear" in kinds:
+            return "Clear canvas"
+        if "replace" in kinds:
+            return "Load design"
+        if n_add:
+            return f"Add {n_add} layer{'s' if n_add > 1 else ''}"
+        if n_remove:
+            return f"Remove {n_remove} layer{'s' if n_remove > 1 else ''}"
+        if "define_module" in kinds:
+            return "Edit module"
+        if "params" in kinds:
+            return "Edit parameters"
+        if "move" in kinds:
+            return "Move"
+        if "connect" in kinds or "disconnect" in kinds or "sequence" in kinds:
+            return "Reorder / connect"
+        return "Edit"
+
+    # ---------------- Apply ----------------
+    def undo(self, graph):
+        for op, f in reversed(self.ops):
+            if op == "add":
+                if f["uid"] in graph:
+                    graph.remove_node(f["uid"])
+            elif op == "remove":
+                graph.restore_node(f["uid"], f["type"], f["params"], f["pos"], f.get("seq_index", -1))
+            elif op == "move":
+                if f["uid"] in graph:
+                    graph.set_pos(f["uid"], *f["old"])
+            elif op == "params":
+                if f["uid"] in graph:
+                    graph.set_params(f["uid"], f["old"])
+            elif op == "connect":
+                if f["src"] in graph and f["tgt"] in graph:
+                    graph.disconnect(f["src"], f["tgt"])
+            elif op == "disconnect":
+                if f["src"] in graph and f["tgt"] in graph:
+                    graph.connect(f["src"], f["tgt"], f.get("out_index"), f.get("in_index"))
+            elif op == "clear_connections":
+                for src, tgt in f["edges"]:
+                    if src in graph and tgt in graph:
+                        graph.connect(src, tgt)
+            elif op == "sequence":
+                graph.set_sequence(_apply_seq_diff(list(graph.sequence), f["start"], f["new"], f["old"]))
+            elif op == "input_shape":
+                graph.set_input_shape(f["old"])
+            elif op == "define_module":
+                graph.define_module(f["name"], f["old"])
+            elif op in ("clear", "replace"):
+                graph.restore_contents(f["old"])
+
+    def redo(self, graph):
+        for op, f in self.ops:
+            if op == "add":
+                graph.add_node(f["type"], f["params"], uid=f["uid"], pos=f["pos"], append_to_sequence=f["seq"])
+            elif op == "remove":
+                if f["uid"] in graph:
+                    graph.remove_node(f["uid"])
+            elif op == "move":
+                if f["uid"] in graph:
+                    graph.set_pos(f["uid"], *f["pos"])
+            elif op == "params":
+                if f["uid"] in graph:
+                    graph.set_params(f["uid"], f["params"])
+            elif op == "connect":
+                if f["src"] in graph and f["tgt"] in graph:
+                    graph.connect(f["src"], f["tgt"], f.get("out_index"), f.get("in_index"))
+            elif op == "disconnect":
+                if f["src"] in graph and f["tgt"] in graph:
+                    graph.disconnect(f["src"], f["tgt"])
+            elif op == "clear_connections":
+                graph.clear_connections()
+            elif op == "sequence":
+                graph.set_sequence(_apply_seq_diff(list(graph.sequence), f["start"], f["old"], f["new"]))
+            elif op == "input_shape":
+                graph.set_input_shape(f["shape"])
+            elif op == "define_module":
+                graph.define_module(f["name"], f["layers"])
+            elif op == "clear":
+                graph.clear()
+            elif op == "replace":
+                graph.restore_contents(f["new"])
+
+    def touched(self):
+        """
+        뷰 동기화에 필요한 요약
+        - uids: 추가/삭제된 레이어, moved: 위치가 바뀐 레이어, params: 파라미터가 바뀐 레이어
+        - modules: 정의가 바뀐 모듈 이름 (그 instance들의 표시/검증을 갱신)
+        - edges / sequence / input_shape / reset: 해당 부분이 바뀌었는지 (reset이면 전체 동기화)
+        """
+        t = {"uids": set(), "moved": set(), "params": set(), "modules": set(),
+             "edges": False, "sequence": False, "input_shape": False, "reset": False}
+        for op, f in self.ops:
+            if op in ("add", "remove"):
+                t["uids"].add(f["uid"])
+                t["sequence"] = True
+                t["edges"] = True
+            elif op == "move":
+                t["moved"].add(f["uid"])
+            elif op == "params":
+                t["params"].add(f["uid"])
+            elif op in ("connect", "disconnect", "clear_connections"):
+                t["edges"] = True
+            elif op == "sequence":
+                t["sequence"] = True
+            elif op == "input_shape":
+                t["input_shape"] = True
+            elif op == "define_module":
+                t["modules"].add(f["name"])
+            elif op in ("clear", "replace"):
+                t["reset"] = True
+        return t
+
+
+class UndoStack:
+    """
+    GraphCommand 스택
+    - begin()/record()/end(): 열린 명령에 graph 변경을 모음 (NetworkGraph.observer에서 record 호출)
+    - undo(graph)/redo(graph): 적용 중에는 applying=True (그동안의 graph 알림은 기록하지 않음)
+    - memory_limit: 명령들의 추정 크기 합이 넘으면 가장 오래된 명령부터 버림
+    """
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.memory_limit = memory_limit
+        self.commands = []
+        self.index = 0          # commands[:index]는 undo 가능, commands[index:]는 redo 가능
+        self.total_bytes = 0
+        self.applying = False
+        self._open = None
+
+    # ---------------- Recording ----------------
+    def is_open(self):
+        return self._open is not None
+
+    def begin(self, text=""):
+        if self._open is None:
+            self._open = GraphCommand(text)
+        return self._open
+
+    def record(self, op, fields):
+        if self.applying:
+            return
+        self.begin().record(op, fields)
+
+    def end(self, merge_moves=True):
+        """열린 명령을 스택에 push. 이전 명령과 같은 레이어들만 이동한 명령이면 합침"""
+        cmd, self._open = self._open, None
+        if cmd is None or not cmd.ops:
+            return None
+        for dropped in self.commands[self.index:]:  # redo 기록 버림
+            self.total_bytes -= dropped.nbytes
+        del self.commands[self.index:]
+        top = self.commands[-1] if self.commands else None
+        if (merge_moves and top is not None and cmd.is_move_only() and top.is_move_only()
+                and cmd.moved_uids() == top.moved_uids()):
+            self.total_bytes -= top.nbytes
+            top.merge(cmd)
+            self.total_bytes += top.nbytes
+            return top
+        self.commands.append(cmd)
+        self.index = len(self.commands)
+        self.total_bytes += cmd.nbytes
+        self._enforce_limit()
+        return cmd
+
+    def _enforce_limit(self):
+        drop = 0
+        while self.total_bytes > self.memory_limit and drop < len(self.commands) - 1:
+            self.total_bytes -= self.commands[drop].nbytes
+            drop += 1
+        if drop:
+            del self.commands[:drop]
+            self.index -= drop
+
+    def set_memory_limit(self, limit):
+        self.memory_limit = limit
+        self._enforce_limit()
+
+    def clear(self):
+        self.commands = []
+        self.index = 0
+        self.total_bytes = 0
+        self._open = None
+
+    # ---------------- Undo / Redo ----------------
+    def can_undo(self):
+        return self.index > 0
+
+    def can_redo(self):
+        return self.index < len(self.commands)
+
+    def undo_text(self):
+        return self.commands[self.index - 1].describe() if self.can_undo() else ""
+
+    def redo_text(self):
+        return self.commands[self.index].describe() if self.can_redo() else ""
+
+    def undo(self, graph):
+        """마지막 명령을 되돌리고 그 명령을 반환 (없으면 None)"""
+        self.end()
+        if not self.can_undo():
+            return None
+        cmd = self.commands[self.index - 1]
+        self.applying = True
+        try:
+            cmd.undo(graph)
+        finally:
+            self.applying = False
+        self.index -= 1
+        return cmd
+
+    def redo(self, graph):
+        self.end()
+        if not self.can_redo():
+            return None
+        cmd = self.commands[self.index]
+        self.applying = True
+        try:
+            cmd.redo(graph)
+        finally:
+            self.applying = False
+        self.index += 1
+        return cmd